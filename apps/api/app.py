@@ -1,8 +1,12 @@
+import asyncio
 import posixpath
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 
 from fastapi import FastAPI
+from pymongo.errors import PyMongoError
 
+from apps.mongo.core.mongo_connection import MongoConnection
+from apps.mongo.core.mongo_index_manager import MongoIndexManager
 from apps.tools.env import env
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -13,10 +17,27 @@ VERSION = "1.0.0"
 
 @asynccontextmanager
 async def lifespan(_: FastAPI):
+    connection = MongoConnection()
+
+    try:
+        await connection.warm_up()
+    except PyMongoError as e:
+        print(f"No se pudo preparar la conexión con MongoDB: {e}")
+
+    # los índices se crean en segundo plano para no retrasar el arranque
+    index_manager = MongoIndexManager(connection)
+    sync_indexes_task = asyncio.create_task(index_manager.sync_indexes())
+
     print("La aplicación ha iniciado correctamente...")
     yield
     print("La aplicación está cerrando...")
 
+    # el cliente no se cierra mientras se crea un índice
+    sync_indexes_task.cancel()
+    with suppress(asyncio.CancelledError):
+        await sync_indexes_task
+    await connection.close()
+
 
 app = FastAPI(
     title=APP_NAME,
@@ -33,4 +54,4 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
-)
\ No newline at end of file
+)
@@ -0,0 +1,8 @@
+from http import HTTPStatus
+
+from apps.api.config.problems.base_problem import BaseProblem
+
+
+class PaginationProblem(BaseProblem):
+    title: str = "Problemas con los parámetros de paginación"
+    status: HTTPStatus = HTTPStatus.BAD_REQUEST
@@ -3,6 +3,7 @@ from typing import (
     Any,
     Callable,
     Coroutine,
+    Optional,
     Protocol,
     Self,
     Type,
@@ -12,12 +13,15 @@ from typing import (
 
 from pydantic import BaseModel, NonNegativeInt
 
+from apps.api.config.exceptions.pagination_exception import PaginationProblem
+from apps.api.config.problems.problem_exception import Problem
 from apps.tools.dynamic_enum import dynamic_enum
 from apps.tools.paginator import (
+    CountMode,
+    InvalidCursorException,
     OrderDirection,
+    PaginationCursor,
     PaginationFilters,
-    PaginationMetadata,
-    Paginator,
 )
 
 
@@ -30,25 +34,6 @@ class Sortable(Protocol):
     def __lt__(self, other: Self) -> bool: ...
 
 
-T_PaginatorCallable = TypeVar("T_PaginatorCallable")
-T_PaginationFiltersDependency = TypeVar("T_PaginationFiltersDependency")
-
-PaginatorCallable = Callable[
-    [list[T_PaginatorCallable]], tuple[list[T_PaginatorCallable], PaginationMetadata]
-]
-
-PaginationFiltersDependency = (
-    Callable[
-        [int, int, OrderBy, OrderDirection],
-        Coroutine[Any, Any, PaginatorCallable[T_PaginationFiltersDependency]],
-    ]
-    | Callable[
-        [int, int, OrderDirection],
-        Coroutine[Any, Any, PaginatorCallable[T_PaginationFiltersDependency]],
-    ]
-)
-
-
 T = TypeVar("T", bound=BaseModel)
 
 
@@ -104,23 +89,30 @@ def get_pagination_filters(
 
 
 T_get_paginator = TypeVar("T_get_paginator", bound=BaseModel)
-T2 = TypeVar("T2")
 
 
 def get_paginator(
     model_class: Type[T_get_paginator] | None = None,
-) -> PaginationFiltersDependency[T_get_paginator]:
+) -> Callable[..., Coroutine[Any, Any, PaginationFilters]]:
     """
     Middleware to get pagination filters.
     Adds the following query parameters to the endpoint:
 
     - skip: The number of items to skip.
-    - limit: The number of items to return.
+    - limit: The number of items to return, 0 returns every item.
     - order_by: The field to order the items by.
     - order_direction: The direction to order the items by.
+    - count_mode: `exact` or `estimated`, how `total_items` is counted.
+    - cursor: The `next_cursor` of the previous page. When sent, `skip` is
+      ignored and the page starts right after the cursor (keyset pagination),
+      so deep pages cost the same as the first one.
 
     order_by will be an Enum Dynamically created with the fields of the model.
 
+    The filters are meant to be sent to `BaseMongoDAO.get_page`, which sorts,
+    skips and limits in Mongo and counts with a separate query, so only the
+    requested page is read.
+
     Args:
         model_class (Type[BaseModel]): The model class to apply pagination filters on.
 
@@ -131,25 +123,25 @@ def get_paginator(
     """
     if not model_class:
 
-        async def _get_pagination_filters_wo_model(
+        async def _get_paginator_wo_model(
             skip: NonNegativeInt = 0,
             limit: NonNegativeInt = 0,
             order_direction: OrderDirection = OrderDirection.ASC,
-        ) -> Callable[[list[T2]], tuple[list[T2], PaginationMetadata]]:
+            count_mode: CountMode = CountMode.EXACT,
+            cursor: Optional[str] = None,
+        ) -> PaginationFilters:
 
             pagination_filters = PaginationFilters(
-                skip=skip,
+                skip=0 if cursor else skip,
                 limit=limit,
                 order_direction=order_direction,
+                count_mode=count_mode,
+                cursor=_decode_cursor(cursor, None, order_direction),
             )
 
-            def paginator(items: list[T2]) -> tuple[list[T2], PaginationMetadata]:
-                paginator = Paginator(items)
-                return paginator.paginate(pagination_filters)
+            return pagination_filters
 
-            return paginator
-
-        return _get_pagination_filters_wo_model
+        return _get_paginator_wo_model
 
     allowed_order_by = model_class.model_fields
 
@@ -162,27 +154,47 @@ def get_paginator(
     class OrderBy(Enum):
         pass
 
-    async def _get_pagination_filters(
+    async def _get_paginator(
         skip: NonNegativeInt = 0,
         limit: NonNegativeInt = 0,
         order_by: OrderBy = OrderBy[[member.name for member in OrderBy][0]],
         order_direction: OrderDirection = OrderDirection.ASC,
-    ) -> Callable[
-        [list[T_get_paginator]], tuple[list[T_get_paginator], PaginationMetadata]
-    ]:
+        count_mode: CountMode = CountMode.EXACT,
+        cursor: Optional[str] = None,
+    ) -> PaginationFilters:
         pagination_filters = PaginationFilters(
-            skip=skip,
+            skip=0 if cursor else skip,
             limit=limit,
             order_by=order_by.name if order_by else None,
             order_direction=order_direction,
+            count_mode=count_mode,
+            cursor=_decode_cursor(
+                cursor, order_by.value if order_by else None, order_direction
+            ),
         )
 
-        def paginator(
-            items: list[T_get_paginator],
-        ) -> tuple[list[T_get_paginator], PaginationMetadata]:
-            paginator = Paginator(items)
-            return paginator.paginate(pagination_filters)
+        return pagination_filters
 
-        return paginator
+    return _get_paginator
 
-    return _get_pagination_filters
+
+def _decode_cursor(
+    token: Optional[str],
+    order_by: Optional[str],
+    order_direction: OrderDirection,
+) -> Optional[PaginationCursor]:
+    if not token:
+        return None
+
+    try:
+        cursor = PaginationCursor.decode(token)
+    except InvalidCursorException as e:
+        raise Problem[PaginationProblem](detail=str(e))
+
+    direction = 1 if order_direction == OrderDirection.ASC else -1
+    if cursor.order_by != (order_by or "_id") or cursor.direction != direction:
+        raise Problem[PaginationProblem](
+            detail="El cursor no corresponde con order_by/order_direction de la consulta"
+        )
+
+    return cursor
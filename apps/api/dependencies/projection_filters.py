@@ -0,0 +1,57 @@
+from enum import Enum
+from typing import Annotated, Any, Callable, Coroutine, Optional, Type, TypeVar
+
+from fastapi import Query
+
+from apps.mongo.core.base_mongo_model import BaseMongoModel
+from apps.mongo.core.projection import Projection
+from apps.tools.dynamic_enum import dynamic_enum
+
+T = TypeVar("T", bound=BaseMongoModel)
+
+
+def get_projection(
+    model_class: Type[T],
+    exclude: Optional[list[str]] = None,
+) -> Callable[..., Coroutine[Any, Any, Optional[Projection[T]]]]:
+    """
+    Dependency to select the fields returned by an endpoint.
+    Adds the following query parameter to the endpoint:
+
+    - fields: The fields to read from the database, can be repeated.
+
+    fields will be an Enum Dynamically created with the fields of the model.
+    When it is not sent the whole document is returned.
+
+    Args:
+        model_class (Type[BaseMongoModel]): The model class to project.
+        exclude (list[str]): Fields that can not be selected.
+
+    Returns:
+        Callable: A function that returns the projection to be used as a dependency.
+    """
+    if exclude is None:
+        exclude = []
+
+    enum_items = {
+        field_name: field_name
+        for field_name in model_class.model_fields
+        if field_name not in exclude
+    }
+
+    @dynamic_enum(lambda: enum_items)
+    class Fields(Enum):
+        pass
+
+    async def _get_projection(
+        fields: Annotated[Optional[list[Fields]], Query()] = None,
+    ) -> Optional[Projection[T]]:
+        if not fields:
+            return None
+
+        return Projection(
+            model_class,
+            include={field.value for field in fields},
+        )
+
+    return _get_projection
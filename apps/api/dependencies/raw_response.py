@@ -0,0 +1,51 @@
+from http import HTTPStatus
+from typing import Any, Optional
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from apps.api.dependencies.response_model import ResponseModel
+from apps.mongo.core.raw_bson import RawDocument, dumps_raw
+
+
+def raw_response(
+    data: RawDocument | list[RawDocument] | None,
+    *,
+    detail: str,
+    metadata: Optional[BaseModel] = None,
+    status: bool = True,
+    status_code: int = HTTPStatus.OK,
+) -> Response:
+    """
+    Build the `ResponseModel` envelope around raw documents.
+
+    The documents returned by the `*_raw` DAO methods are dumped straight to
+    JSON bytes, skipping the model validation and serialization that FastAPI
+    does for the `response_model`. Keep the `response_model` of the endpoint,
+    it is still used for the OpenAPI schema.
+
+    Usage:
+
+    ```python
+    empresas, pagination_metadata = await empresa_dao.get_page_raw(pagination_filters)
+
+    return raw_response(
+        empresas,
+        detail="Company retrieved successfully",
+        metadata=pagination_metadata,
+    )
+    ```
+    """
+    content: dict[str, Any] = ResponseModel(
+        status=status,
+        detail=detail,
+        metadata=metadata,
+    ).model_dump(mode="json", by_alias=True)
+    content["data"] = data
+
+    return Response(
+        content=dumps_raw(content),
+        status_code=status_code,
+        media_type=JSONResponse.media_type,
+    )
@@ -0,0 +1,132 @@
+from functools import cache
+from http import HTTPStatus
+from typing import Any, Callable, Coroutine, Optional, TypeVar
+from urllib.parse import urlencode
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+from apps.tools.cache import CacheBackend, create_cache_backend
+from apps.tools.cache_config import CacheConfig
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# headers computed again when the cached body is sent
+_SKIPPED_HEADERS = frozenset({"content-length"})
+
+
+def cache_response(cache_config: CacheConfig) -> Callable[[F], F]:
+    """
+    Attach a `CacheConfig` to an endpoint of a router with `route_class=CachedRoute`.
+
+    - A GET endpoint with `use_cache` stores its JSON response under
+      `cache_config.key` for `ttl` seconds, keyed by path and query.
+    - Any endpoint with `invalidates` evicts the responses stored under
+      those keys once it succeeds.
+
+    ```python
+    @empresa_router.get("/{id_empresa}")
+    @cache_response(CacheConfig(key="empresa", use_cache=True, ttl=30))
+    async def get_empresa_by_id(id_empresa: ObjectId): ...
+
+
+    @empresa_router.put("/{id_empresa}")
+    @cache_response(CacheConfig(invalidates=["empresa"]))
+    async def update_empresa(id_empresa: ObjectId, company: Empresa): ...
+    ```
+    """
+
+    if cache_config.use_cache and cache_config.key is None:
+        raise ValueError("A cached response needs a CacheConfig.key to be invalidated.")
+
+    def decorator(endpoint: F) -> F:
+        endpoint.__cache_config__ = cache_config  # type: ignore[attr-defined]
+        return endpoint
+
+    return decorator
+
+
+class CachedRoute(APIRoute):
+    """
+    Route that serves the responses cached by `cache_response`.
+
+    A hit sends the stored bytes without running the dependencies, the DAO
+    reads, the model building or the serialization of the endpoint. Only
+    successful (200) responses with a body are stored, streamed responses
+    are not. A response is not stored when a write endpoint of any worker
+    invalidated its key while it was built, it may hold the data from
+    before the write.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+        cache_config: Optional[CacheConfig] = getattr(
+            self.endpoint, "__cache_config__", None
+        )
+
+        if cache_config is None:
+            return handler
+
+        async def cached_route_handler(request: Request) -> Response:
+            response_cache = get_response_cache()
+            is_read = request.method == "GET" and cache_config.use_cache
+
+            if is_read:
+                cache_key = _get_response_key(cache_config, request)
+                cached = await response_cache.get_async(cache_key)
+                if cached is not None:
+                    status_code, headers, body = cached
+                    return Response(content=body, status_code=status_code, headers=headers)
+
+                # a write endpoint of any worker may invalidate the key while it is built
+                generations = await response_cache.get_generations_async(
+                    cache_config.key
+                )
+            response = await handler(request)
+
+            if response.status_code >= HTTPStatus.BAD_REQUEST:
+                return response
+
+            if is_read and response.status_code == HTTPStatus.OK:
+                body = getattr(response, "body", None)
+                if body:
+                    headers = {
+                        name: value
+                        for name, value in response.headers.items()
+                        if name not in _SKIPPED_HEADERS
+                    }
+                    await response_cache.set_async(
+                        cache_key,
+                        (response.status_code, headers, bytes(body)),
+                        ttl=cache_config.ttl,
+                        tags=(cache_config.key,),
+                        generations=generations,
+                    )
+
+            if cache_config.invalidates:
+                await response_cache.invalidate_tags_async(
+                    *cache_config.invalidates
+                )
+
+            return response
+
+        return cached_route_handler
+
+
+def _get_response_key(cache_config: CacheConfig, request: Request) -> str:
+    """the same query parameters in another order are the same response
+
+    The values of a repeated parameter keep their order, e.g. `?ids=` returns
+    the documents in the order of the ids. The query is encoded again, a
+    value holding `&` or `=` can not pass for another parameter.
+    """
+    query = urlencode(
+        sorted(request.query_params.multi_items(), key=lambda item: item[0])
+    )
+    return f"response:{cache_config.key}:{request.url.path}?{query}"
+
+
+@cache
+def get_response_cache() -> CacheBackend:
+    """The cache of the responses of every `CachedRoute`"""
+    return create_cache_backend()
@@ -0,0 +1,111 @@
+from enum import Enum
+from typing import Annotated, AsyncIterator, Optional
+
+from fastapi import Query
+from fastapi.responses import StreamingResponse
+
+from apps.api.dependencies.response_model import ResponseModel
+from apps.mongo.core.raw_bson import RawDocument, dumps_raw
+
+STREAM_BATCH_SIZE = 500
+"""Documents read from Mongo per round trip by the streamed endpoints"""
+
+_CHUNK_SIZE = 64 * 1024
+
+
+class StreamFormat(Enum):
+    NDJSON = "ndjson"
+    JSON = "json"
+
+
+async def get_stream_format(
+    stream: Annotated[Optional[StreamFormat], Query()] = None,
+) -> Optional[StreamFormat]:
+    """
+    Dependency to stream the results of a list endpoint.
+    Adds the following query parameter to the endpoint:
+
+    - stream: `ndjson` sends one document per line, `json` sends the usual
+      `ResponseModel` envelope with the documents written while they are read
+      (`metadata` is null). When it is not sent the endpoint responds as usual.
+    """
+    return stream
+
+
+def streaming_response(
+    documents: AsyncIterator[RawDocument],
+    stream_format: StreamFormat,
+    *,
+    detail: str,
+) -> StreamingResponse:
+    """
+    Send raw documents as they are read from Mongo.
+
+    Only the current batch of documents is kept in memory and the first
+    bytes are sent before the query finishes, use it for exports of many
+    documents. The response status is sent first, an error in the middle of
+    the stream closes the connection.
+
+    Usage:
+
+    ```python
+    if stream_format is not None:
+        return streaming_response(
+            periodo_contable_dao.stream_page_raw(pagination_filters, batch_size=STREAM_BATCH_SIZE),
+            stream_format,
+            detail="Periodos contables retrieved successfully",
+        )
+    ```
+    """
+    if stream_format == StreamFormat.NDJSON:
+        return StreamingResponse(
+            _buffer(_ndjson_lines(documents)),
+            media_type="application/x-ndjson",
+        )
+
+    return StreamingResponse(
+        _buffer(_json_envelope(documents, detail)),
+        media_type="application/json; charset=utf-8",
+    )
+
+
+async def _ndjson_lines(documents: AsyncIterator[RawDocument]) -> AsyncIterator[bytes]:
+    async for document in documents:
+        yield dumps_raw(document) + b"\n"
+
+
+async def _json_envelope(
+    documents: AsyncIterator[RawDocument], detail: str
+) -> AsyncIterator[bytes]:
+    envelope = ResponseModel(status=True, detail=detail).model_dump(
+        mode="json", by_alias=True
+    )
+    del envelope["data"]
+    del envelope["metadata"]
+
+    # same key order as ResponseModel: date, status, detail, data, metadata
+    yield dumps_raw(envelope)[:-1] + b',"data":['
+
+    separator = b""
+    async for document in documents:
+        yield separator + dumps_raw(document)
+        separator = b","
+
+    yield b'],"metadata":null}'
+
+
+async def _buffer(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Join small chunks, one ASGI message per document would be too many"""
+    buffer = bytearray()
+    first_chunk = True
+
+    async for chunk in chunks:
+        buffer += chunk
+        # the first chunk goes out as soon as it is ready
+        if first_chunk or len(buffer) >= _CHUNK_SIZE:
+            first_chunk = False
+            yield bytes(buffer)
+            buffer.clear()
+
+    if buffer:
+        yield bytes(buffer)
@@ -0,0 +1,142 @@
+from functools import cache
+from typing import Optional
+
+from apps.mongo.core.dao_registry import get_dao
+from apps.mongo.core.projection import Projection
+from apps.mongo.daos.empresa_dao import EmpresaDAO
+from apps.mongo.models.empresa import Empresa, StatusCompany
+from apps.tools.cache import CacheBackend, create_cache_backend
+from apps.tools.env import env
+from apps.tools.objectid import ObjectId
+
+# stored for the ids without a company, the backend returns None for a miss
+_MISSING = ""
+
+# the name is read with the status for the report, see `get_nombre`
+_STATUS_PROJECTION = Projection(Empresa, include={"status", "nombre"})
+
+
+class CompanyStatusCache:
+    """
+    Status of the companies checked by `ValidateCompanyMiddleware`.
+
+    Keeps whether a company exists, its `StatusCompany` and its name for a
+    few seconds, so the requests to `/empresa/{id_empresa}/...` skip the
+    query to Mongo and the report reuses the read of the middleware.
+    Missing companies are cached too (negative entries) with their own,
+    shorter TTL. `EmpresaManager` invalidates the entry of a company when it
+    is updated or deleted, an entry read from Mongo while it was invalidated
+    is not stored.
+
+    - COMPANY_STATUS_TTL: seconds a found company is cached (default 30).
+    - COMPANY_STATUS_NEGATIVE_TTL: seconds a missing company is cached (default 5).
+    """
+
+    def __init__(
+        self,
+        backend: Optional[CacheBackend] = None,
+        ttl: Optional[int] = None,
+        negative_ttl: Optional[int] = None,
+    ):
+        self._backend = backend if backend is not None else create_cache_backend()
+        self.ttl = ttl if ttl is not None else int(env.get("COMPANY_STATUS_TTL") or 30)
+        self.negative_ttl = (
+            negative_ttl
+            if negative_ttl is not None
+            else int(env.get("COMPANY_STATUS_NEGATIVE_TTL") or 5)
+        )
+        self._empresa_dao = get_dao(EmpresaDAO)
+
+    async def get_status(self, id_empresa: ObjectId) -> Optional[StatusCompany]:
+        """status of the company, None when it does not exist"""
+        entry = await self._get_entry(id_empresa)
+        return StatusCompany(entry[0]) if entry is not None else None
+
+    async def get_statuses(
+        self, ids_empresas: list[ObjectId]
+    ) -> dict[ObjectId, Optional[StatusCompany]]:
+        """status of several companies, the misses are read with a single query"""
+        ids_empresas = list(dict.fromkeys(ids_empresas))
+        entries: dict[ObjectId, Optional[tuple[str, str]]] = {}
+        for id_empresa in ids_empresas:
+            cached = await self._backend.get_async(self._get_key(id_empresa))
+            if cached is not None:
+                entries[id_empresa] = tuple(cached) if cached != _MISSING else None
+
+        query_ids = [
+            id_empresa for id_empresa in ids_empresas if id_empresa not in entries
+        ]
+        if query_ids:
+            keys = {id_empresa: self._get_key(id_empresa) for id_empresa in query_ids}
+            generations = await self._backend.get_generations_async(*keys.values())
+            companies, missing_ids = await self._empresa_dao.get_many_by_ids(
+                query_ids, projection=_STATUS_PROJECTION
+            )
+
+            for company in companies:
+                entries[company.id] = (company.status.value, company.nombre)
+            for id_empresa in missing_ids:
+                entries[id_empresa] = None
+
+            for id_empresa, key in keys.items():
+                entry = entries[id_empresa]
+                await self._backend.set_async(
+                    key,
+                    entry if entry is not None else _MISSING,
+                    ttl=self.ttl if entry is not None else self.negative_ttl,
+                    tags=(key,),
+                    generations={key: generations[key]},
+                )
+
+        return {
+            id_empresa: StatusCompany(entry[0]) if entry is not None else None
+            for id_empresa, entry in entries.items()
+        }
+
+    async def get_nombre(self, id_empresa: ObjectId) -> Optional[str]:
+        """name of the company, None when it does not exist"""
+        entry = await self._get_entry(id_empresa)
+        return entry[1] if entry is not None else None
+
+    async def _get_entry(self, id_empresa: ObjectId) -> Optional[tuple[str, str]]:
+        """(status, name) of the company, read from Mongo on a miss"""
+        key = self._get_key(id_empresa)
+        cached = await self._backend.get_async(key)
+
+        if cached is not None:
+            return tuple(cached) if cached != _MISSING else None
+
+        # `invalidate` of any worker during the read keeps the old status out
+        generations = await self._backend.get_generations_async(key)
+        company: Empresa | None = await self._empresa_dao.get_by_id(
+            item_id=id_empresa, projection=_STATUS_PROJECTION
+        )
+
+        if company is None:
+            await self._backend.set_async(
+                key,
+                _MISSING,
+                ttl=self.negative_ttl,
+                tags=(key,),
+                generations=generations,
+            )
+            return None
+
+        entry = (company.status.value, company.nombre)
+        await self._backend.set_async(
+            key, entry, ttl=self.ttl, tags=(key,), generations=generations
+        )
+        return entry
+
+    async def invalidate(self, id_empresa: ObjectId) -> None:
+        """forget the status of a company, call it after changing the company"""
+        await self._backend.invalidate_tags_async(self._get_key(id_empresa))
+
+    def _get_key(self, id_empresa: ObjectId) -> str:
+        return f"company:{id_empresa}"
+
+
+@cache
+def get_company_status_cache() -> CompanyStatusCache:
+    """The `CompanyStatusCache` shared by the middleware and the managers"""
+    return CompanyStatusCache()
@@ -0,0 +1,24 @@
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from apps.mongo.core.identity_map import identity_map_scope
+
+
+class IdentityMapMiddleware:
+    """
+    Give each HTTP request its own `IdentityMap`.
+
+    A `get_by_id`/`get` repeated with the same arguments and projection in a
+    request queries the database once, see `IdentityMap`. Not installed while
+    no endpoint repeats a read, each request would pay the scope for nothing.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with identity_map_scope():
+            await self.app(scope, receive, send)
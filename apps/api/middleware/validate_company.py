@@ -1,26 +1,31 @@
 from apps.api.config.exceptions.company_exception import CompanyProblem
 from apps.api.config.problems.problem_exception import Problem
-from apps.mongo.daos.empresa_dao import EmpresaDAO
-from apps.mongo.models.empresa import Empresa, StatusCompany
+from apps.api.middleware.company_status_cache import get_company_status_cache
+from apps.mongo.models.empresa import StatusCompany
 from apps.tools.objectid import ObjectId
 
 
 class ValidateCompanyMiddleware:
     def __init__(self):
-        self._empresa_dao = EmpresaDAO()
+        self._company_status_cache = get_company_status_cache()
 
     async def __call__(self, id_empresa: ObjectId) -> ObjectId:
         """
         Validate if the company exists in the database.
+
+        The status is read from the `CompanyStatusCache`, most requests do
+        not query Mongo.
         """
-        company: Empresa | None = await self._empresa_dao.get_by_id(item_id=id_empresa)
+        status: StatusCompany | None = await self._company_status_cache.get_status(
+            id_empresa
+        )
 
-        if company is None:
+        if status is None:
             raise Problem[CompanyProblem](
                 f"No hay empresa disponible con el id: {id_empresa}"
             )
 
-        if company.status == StatusCompany.INACTIVO:
+        if status == StatusCompany.INACTIVO:
             raise Problem[CompanyProblem](
                 f"La empresa con el id: {id_empresa} está inactiva"
             )
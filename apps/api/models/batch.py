@@ -0,0 +1,24 @@
+from pydantic import BaseModel
+
+from apps.tools.objectid import ObjectId
+
+# ids accepted by the `?ids=` endpoints in a single request
+BATCH_MAX_IDS = 100
+
+
+class BatchMetadata(BaseModel):
+    """
+    Metadata of the endpoints that read several documents by id.
+
+    Attributes:
+        requested (int): Distinct ids requested.
+        found (int): Documents returned, in the order of the ids.
+        missing_ids (list[ObjectId]): Ids without a document.
+        unavailable_ids (list[ObjectId]): Ids left out because their company
+            does not exist or is inactive.
+    """
+
+    requested: int
+    found: int
+    missing_ids: list[ObjectId]
+    unavailable_ids: list[ObjectId] = []
@@ -12,9 +12,11 @@ from apps.api.config.exceptions.periodo_contable_exception import (
     PeriodoContableProblem,
 )
 from apps.api.config.problems.problem_exception import Problem
+from apps.api.dependencies.response_cache import CachedRoute, cache_response
 from apps.api.dependencies.response_model import ResponseModel
 from apps.manager.balance_general_manager import BalanceGeneralManager
 from apps.mongo.models.extensions.balance_general import BalanceGeneral
+from apps.tools.cache_config import CacheConfig
 from apps.tools.env import env
 from apps.tools.objectid import ObjectId
 
@@ -22,6 +24,7 @@ balance_general_manager = BalanceGeneralManager()
 
 balance_general_router = APIRouter(
     prefix=posixpath.join(env.API_PREFIX, "periodo_contable"),
+    route_class=CachedRoute,
 )
 
 
@@ -31,6 +34,7 @@ balance_general_router = APIRouter(
     response_model=ResponseModel[BalanceGeneral, None],
     operation_id="GetBalanceGeneralByPeriodo",
 )
+@cache_response(CacheConfig(key="periodo_contable", use_cache=True, ttl=30))
 async def get_balance_general_by_periodo(
     id_periodo: ObjectId,
 ) -> ResponseModel[BalanceGeneral, None]:
@@ -61,6 +65,7 @@ async def get_balance_general_by_periodo(
     response_model=ResponseModel[BalanceGeneral, None],
     operation_id="CreateBalanceGeneral",
 )
+@cache_response(CacheConfig(invalidates=["periodo_contable"]))
 async def create_balance_general(
     id_periodo: ObjectId,
     balance_general: BalanceGeneral,
@@ -95,6 +100,7 @@ async def create_balance_general(
     response_model=ResponseModel[BalanceGeneral, None],
     operation_id="CreateBalanceGeneralByFile",
 )
+@cache_response(CacheConfig(invalidates=["periodo_contable"]))
 async def create_balance_general_by_file(id_periodo: ObjectId, file: UploadFile):
     """
     Create balance general by file.
@@ -126,6 +132,7 @@ async def create_balance_general_by_file(id_periodo: ObjectId, file: UploadFile)
     response_model=ResponseModel[BalanceGeneral, None],
     operation_id="UpdateBalanceGeneral",
 )
+@cache_response(CacheConfig(invalidates=["periodo_contable"]))
 async def update_balance_general(
     id_periodo: ObjectId,
     balance_general: BalanceGeneral,
@@ -160,6 +167,7 @@ async def update_balance_general(
     response_model=ResponseModel[None, None],
     operation_id="DeleteBalanceGeneral",
 )
+@cache_response(CacheConfig(invalidates=["periodo_contable"]))
 async def delete_balance_general(
     id_periodo: ObjectId,
 ) -> ResponseModel[None, None]:
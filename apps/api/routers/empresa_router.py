@@ -1,8 +1,9 @@
 import posixpath
 from http import HTTPStatus
-from typing import Annotated, Dict
+from typing import Annotated, Dict, Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Response
+from pydantic import SerializeAsAny
 
 from apps.api.config.exceptions.company_exception import (
     BaseCompanyException,
@@ -14,28 +15,43 @@ from apps.api.config.exceptions.mongo_dao_exceptions import (
 )
 from apps.api.config.problems.problem_exception import Problem
 from apps.api.dependencies.model_filters import get_model_filters
-from apps.api.dependencies.pagination_filters import PaginatorCallable, get_paginator
+from apps.api.dependencies.pagination_filters import get_paginator
+from apps.api.dependencies.projection_filters import get_projection
+from apps.api.dependencies.raw_response import raw_response
+from apps.api.dependencies.response_cache import CachedRoute, cache_response
 from apps.api.dependencies.response_model import ResponseModel
+from apps.api.dependencies.streaming_response import (
+    STREAM_BATCH_SIZE,
+    StreamFormat,
+    get_stream_format,
+    streaming_response,
+)
+from apps.api.models.batch import BATCH_MAX_IDS, BatchMetadata
 from apps.manager.empresa_manager import EmpresaManager
+from apps.mongo.core.dao_registry import get_dao
 from apps.mongo.daos.empresa_dao import EmpresaDAO
 from apps.mongo.models.empresa import Empresa
+from apps.mongo.core.projection import Projection
+from apps.tools.cache_config import CacheConfig
 from apps.tools.env import env
 from apps.tools.objectid import ObjectId
-from apps.tools.paginator import PaginationMetadata
+from apps.tools.paginator import PaginationFilters, PaginationMetadata
 
 empresa_manager = EmpresaManager()
 
 empresa_router = APIRouter(
     prefix=posixpath.join(env.API_PREFIX, "empresa"),
+    route_class=CachedRoute,
 )
 
 
 @empresa_router.get(
     "/",
     status_code=HTTPStatus.OK,
-    response_model=ResponseModel[list[Empresa], PaginationMetadata],
+    response_model=ResponseModel[list[SerializeAsAny[Empresa]], PaginationMetadata],
     operation_id="GetAllCompanies",
 )
+@cache_response(CacheConfig(key="empresa", use_cache=True, ttl=30))
 async def get_all_empresas(
     filters: Annotated[
         Dict,
@@ -43,22 +59,80 @@ async def get_all_empresas(
             get_model_filters(Empresa, exclude=["id", "descripcion", "fecha_creacion"]),
         ),
     ],
-    paginator: Annotated[PaginatorCallable[Empresa], Depends(get_paginator(Empresa))],
-) -> ResponseModel[list[Empresa], PaginationMetadata]:
+    pagination_filters: Annotated[
+        PaginationFilters, Depends(get_paginator(Empresa))
+    ],
+    projection: Annotated[
+        Projection[Empresa] | None, Depends(get_projection(Empresa))
+    ],
+    stream_format: Annotated[Optional[StreamFormat], Depends(get_stream_format)],
+) -> Response:
     """
     Get all companies.
     Returns a list of all companies in the database.
+    Use `stream` to receive the companies while they are read (no metadata).
     """
 
-    empresa_dao = EmpresaDAO()
-    empresas: list[Empresa] = await empresa_dao.get_all(**filters)
+    empresa_dao = get_dao(EmpresaDAO)
+
+    if stream_format is not None:
+        return streaming_response(
+            empresa_dao.stream_page_raw(
+                pagination_filters,
+                projection=projection,
+                batch_size=STREAM_BATCH_SIZE,
+                **filters,
+            ),
+            stream_format,
+            detail="Company retrieved successfully",
+        )
+
+    empresas, pagination_metadata = await empresa_dao.get_page_raw(
+        pagination_filters,
+        projection=projection,
+        **filters,
+    )
+
+    return raw_response(
+        empresas,
+        detail="Company retrieved successfully",
+        metadata=pagination_metadata,
+    )
+
+
+@empresa_router.get(
+    "/batch/",
+    status_code=HTTPStatus.OK,
+    response_model=ResponseModel[list[SerializeAsAny[Empresa]], BatchMetadata],
+    operation_id="GetCompaniesByIds",
+)
+@cache_response(CacheConfig(key="empresa", use_cache=True, ttl=30))
+async def get_empresas_by_ids(
+    ids: Annotated[list[ObjectId], Query(min_length=1, max_length=BATCH_MAX_IDS)],
+    projection: Annotated[
+        Projection[Empresa] | None, Depends(get_projection(Empresa))
+    ],
+) -> ResponseModel[list[Empresa], BatchMetadata]:
+    """
+    Get several companies by id with a single query.
+    Returns the companies in the order of `ids`, the ids without a company are in the metadata.
+    """
+
+    empresas, missing_ids = await get_dao(EmpresaDAO).get_many_by_ids(
+        ids,
+        use_cache=True,
+        projection=projection,
+    )
 
-    empresas, pagination_metadata = paginator(empresas)
     return ResponseModel(
         status=True,
-        detail="Company retrieved successfully",
+        detail="Companies retrieved successfully",
         data=empresas,
-        metadata=pagination_metadata,
+        metadata=BatchMetadata(
+            requested=len(empresas) + len(missing_ids),
+            found=len(empresas),
+            missing_ids=missing_ids,
+        ),
     )
 
 
@@ -68,6 +142,7 @@ async def get_all_empresas(
     response_model=ResponseModel[Empresa, None],
     operation_id="GetCompanyById",
 )
+@cache_response(CacheConfig(key="empresa", use_cache=True, ttl=30))
 async def get_empresa_by_id(id_empresa: ObjectId):
     """
     Get company by id.
@@ -94,6 +169,7 @@ async def get_empresa_by_id(id_empresa: ObjectId):
     response_model=ResponseModel[Empresa, None],
     operation_id="CreateCompany",
 )
+@cache_response(CacheConfig(invalidates=["empresa"]))
 async def create_empresa(company: Empresa) -> ResponseModel[Empresa, None]:
     """
     Create a new company.
@@ -115,6 +191,7 @@ async def create_empresa(company: Empresa) -> ResponseModel[Empresa, None]:
     response_model=ResponseModel[Empresa, None],
     operation_id="UpdateCompany",
 )
+@cache_response(CacheConfig(invalidates=["empresa", "periodo_contable"]))
 async def update_empresa(
     id_empresa: ObjectId,
     company: Empresa,
@@ -147,6 +224,7 @@ async def update_empresa(
     response_model=ResponseModel[None, None],
     operation_id="DeleteCompany",
 )
+@cache_response(CacheConfig(invalidates=["empresa", "periodo_contable"]))
 async def delete_empresa(id_empresa: ObjectId) -> ResponseModel[None, None]:
     """
     Delete a company by id.
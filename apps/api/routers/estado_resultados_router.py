@@ -12,9 +12,11 @@ from apps.api.config.exceptions.periodo_contable_exception import (
     PeriodoContableProblem,
 )
 from apps.api.config.problems.problem_exception import Problem
+from apps.api.dependencies.response_cache import CachedRoute, cache_response
 from apps.api.dependencies.response_model import ResponseModel
 from apps.manager.estado_resultados_manager import EstadoResultadosManager
 from apps.mongo.models.extensions.estado_resultados import EstadoResultados
+from apps.tools.cache_config import CacheConfig
 from apps.tools.env import env
 from apps.tools.objectid import ObjectId
 
@@ -22,6 +24,7 @@ estado_resultados_manager = EstadoResultadosManager()
 
 estado_resultados_router = APIRouter(
     prefix=posixpath.join(env.API_PREFIX, "periodo_contable"),
+    route_class=CachedRoute,
 )
 
 
@@ -31,6 +34,7 @@ estado_resultados_router = APIRouter(
     response_model=ResponseModel[EstadoResultados, None],
     operation_id="GetEstadoResultadosByPeriodo",
 )
+@cache_response(CacheConfig(key="periodo_contable", use_cache=True, ttl=30))
 async def get_estado_resultados_by_periodo(
     id_periodo: ObjectId,
 ) -> ResponseModel[EstadoResultados, None]:
@@ -61,6 +65,7 @@ async def get_estado_resultados_by_periodo(
     response_model=ResponseModel[EstadoResultados, None],
     operation_id="CreateEstadoResultados",
 )
+@cache_response(CacheConfig(invalidates=["periodo_contable"]))
 async def createate_estado_resultados(
     id_periodo: ObjectId,
     estado_resultados: EstadoResultados,
@@ -95,6 +100,7 @@ async def createate_estado_resultados(
     response_model=ResponseModel[EstadoResultados, None],
     operation_id="CreateEstadoResultadosByFile",
 )
+@cache_response(CacheConfig(invalidates=["periodo_contable"]))
 async def create_estado_resultados_by_file(id_periodo: ObjectId, file: UploadFile) -> ResponseModel[EstadoResultados, None]:
     """
     Create estado resultados by file.
@@ -126,6 +132,7 @@ async def create_estado_resultados_by_file(id_periodo: ObjectId, file: UploadFil
     response_model=ResponseModel[EstadoResultados, None],
     operation_id="UpdateEstadoResultados",
 )
+@cache_response(CacheConfig(invalidates=["periodo_contable"]))
 async def update_estado_resultados(
     id_periodo: ObjectId,
     estado_resultados: EstadoResultados,
@@ -160,6 +167,7 @@ async def update_estado_resultados(
     response_model=ResponseModel[None, None],
     operation_id="DeleteEstadoResultados",
 )
+@cache_response(CacheConfig(invalidates=["periodo_contable"]))
 async def delete_estado_resultados(
     id_periodo: ObjectId,
 ) -> ResponseModel[None, None]:
@@ -7,6 +7,10 @@ from apps.api.app import APP_NAME as app_name
 from apps.api.app import VERSION as api_version
 from apps.api.dependencies.response_model import ResponseModel
 from apps.api.models.health_check import HealthCheck
+from apps.mongo.core.dao_registry import get_cache_statistics
+from apps.mongo.core.mongo_connection import MongoConnection
+from apps.mongo.core.mongo_pool_stats import MongoPoolStatistics
+from apps.tools.cache import CacheStatistics
 from apps.tools.env import env
 
 health_check_router = APIRouter(
@@ -37,3 +41,43 @@ async def health_check():
         detail="Health check successful",
         data=health_check,
     )
+
+
+@health_check_router.get(
+    "/health_check/mongo_pool/",
+    status_code=HTTPStatus.OK,
+    response_model=ResponseModel[dict[str, MongoPoolStatistics], None],
+    operation_id="MongoPoolStatistics",
+)
+async def mongo_pool_statistics():
+    """
+    Mongo connection pool statistics.
+    Returns the pool usage of the async and sync Mongo clients.
+    """
+
+    pool_statistics = MongoConnection().get_pool_statistics()
+
+    return ResponseModel(
+        status=True,
+        detail="Mongo pool statistics retrieved successfully",
+        data=pool_statistics,
+    )
+
+
+@health_check_router.get(
+    "/health_check/cache/",
+    status_code=HTTPStatus.OK,
+    response_model=ResponseModel[dict[str, CacheStatistics], None],
+    operation_id="CacheStatistics",
+)
+async def cache_statistics():
+    """
+    DAO cache statistics.
+    Returns the size and the hit, miss and eviction counters of the cache of each DAO.
+    """
+
+    return ResponseModel(
+        status=True,
+        detail="Cache statistics retrieved successfully",
+        data=get_cache_statistics(),
+    )
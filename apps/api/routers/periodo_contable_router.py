@@ -1,8 +1,9 @@
 import posixpath
 from http import HTTPStatus
-from typing import Annotated, Dict
+from typing import Annotated, Dict, Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Response
+from pydantic import SerializeAsAny
 
 from apps.api.config.exceptions.mongo_dao_exceptions import (
     BaseMongoDAOException,
@@ -14,27 +15,89 @@ from apps.api.config.exceptions.periodo_contable_exception import (
 )
 from apps.api.config.problems.problem_exception import Problem
 from apps.api.dependencies.model_filters import get_model_filters
-from apps.api.dependencies.pagination_filters import PaginatorCallable, get_paginator
+from apps.api.dependencies.pagination_filters import get_paginator
+from apps.api.dependencies.projection_filters import get_projection
+from apps.api.dependencies.raw_response import raw_response
+from apps.api.dependencies.response_cache import CachedRoute, cache_response
 from apps.api.dependencies.response_model import ResponseModel
+from apps.api.dependencies.streaming_response import (
+    STREAM_BATCH_SIZE,
+    StreamFormat,
+    get_stream_format,
+    streaming_response,
+)
+from apps.api.models.batch import BATCH_MAX_IDS, BatchMetadata
 from apps.api.middleware.validate_company import ValidateCompanyMiddleware
 from apps.manager.periodo_contable_manager import PeriodoContableManager
+from apps.mongo.core.dao_registry import get_dao
 from apps.mongo.daos.periodo_contable_dao import PeriodoContableDAO
 from apps.mongo.models.periodo_contable import PeriodoContable
+from apps.mongo.core.projection import Projection
+from apps.mongo.core.raw_bson import RawDocument
+from apps.tools.cache_config import CacheConfig
 from apps.tools.env import env
 from apps.tools.objectid import ObjectId
-from apps.tools.paginator import PaginationMetadata
+from apps.tools.paginator import PaginationFilters, PaginationMetadata
 
 periodo_contable_manager = PeriodoContableManager()
 
-periodo_contable_router = APIRouter(prefix=posixpath.join(env.API_PREFIX, "empresa"))
+periodo_contable_router = APIRouter(
+    prefix=posixpath.join(env.API_PREFIX, "empresa"),
+    route_class=CachedRoute,
+)
+
+
+@periodo_contable_router.get(
+    path="/periodo_contable/batch/",
+    status_code=HTTPStatus.OK,
+    response_model=ResponseModel[
+        list[SerializeAsAny[PeriodoContable]], BatchMetadata
+    ],
+    operation_id="GetPeriodosContablesByIds",
+)
+@cache_response(CacheConfig(key="periodo_contable", use_cache=True, ttl=30))
+async def get_periodos_contables_by_ids(
+    ids: Annotated[list[ObjectId], Query(min_length=1, max_length=BATCH_MAX_IDS)],
+    projection: Annotated[
+        Projection[PeriodoContable] | None,
+        Depends(get_projection(PeriodoContable)),
+    ],
+) -> ResponseModel[list[PeriodoContable], BatchMetadata]:
+    """
+    Get several periodos contables by id with a single query, they can belong to different companies.
+    Returns the periodos in the order of `ids`. The ids without a periodo and
+    the ids of periodos whose company does not exist or is inactive are in the metadata.
+    """
+
+    periodos_contables, missing_ids, unavailable_ids = (
+        await periodo_contable_manager.get_periodos_contables_by_ids(
+            ids_periodos_contables=ids,
+            projection=projection,
+        )
+    )
+
+    return ResponseModel(
+        status=True,
+        detail="Periodos contables retrieved successfully",
+        data=periodos_contables,
+        metadata=BatchMetadata(
+            requested=len(periodos_contables)
+            + len(missing_ids)
+            + len(unavailable_ids),
+            found=len(periodos_contables),
+            missing_ids=missing_ids,
+            unavailable_ids=unavailable_ids,
+        ),
+    )
 
 
 @periodo_contable_router.get(
     path="/{id_empresa}/periodo_contable/",
     status_code=HTTPStatus.OK,
-    response_model=ResponseModel[list[PeriodoContable], PaginationMetadata],
+    response_model=ResponseModel[list[SerializeAsAny[PeriodoContable]], PaginationMetadata],
     operation_id="GetAllPeriodosContables",
 )
+@cache_response(CacheConfig(key="periodo_contable", use_cache=True, ttl=30))
 async def get_all_periodos_contables(
     id_empresa: Annotated[
         ObjectId,
@@ -51,13 +114,20 @@ async def get_all_periodos_contables(
             ),
         ),
     ],
-    paginator: Annotated[
-        PaginatorCallable[PeriodoContable], Depends(get_paginator(PeriodoContable))
+    pagination_filters: Annotated[
+        PaginationFilters, Depends(get_paginator(PeriodoContable))
     ],
-) -> ResponseModel[list[PeriodoContable], PaginationMetadata]:
+    projection: Annotated[
+        Projection[PeriodoContable] | None,
+        Depends(get_projection(PeriodoContable)),
+    ],
+    stream_format: Annotated[Optional[StreamFormat], Depends(get_stream_format)],
+) -> ResponseModel[list[PeriodoContable], PaginationMetadata] | Response:
     """
     Get all periodos contables.
     Returns a list of all periodos contables in the database.
+    Use `fields` to read only some fields, e.g. to skip the financial statements.
+    Use `stream` to export the periodos while they are read (no metadata).
     """
 
     filters = {
@@ -65,12 +135,26 @@ async def get_all_periodos_contables(
         "id_empresa": id_empresa,
     }
 
-    periodo_contable_dao = PeriodoContableDAO()
-    periodos_contables: list[PeriodoContable] = await periodo_contable_dao.get_all(
-        **filters
+    periodo_contable_dao = get_dao(PeriodoContableDAO)
+
+    if stream_format is not None:
+        return streaming_response(
+            periodo_contable_dao.stream_page_raw(
+                pagination_filters,
+                projection=projection,
+                batch_size=STREAM_BATCH_SIZE,
+                **filters,
+            ),
+            stream_format,
+            detail="Periodos contables retrieved successfully",
+        )
+
+    periodos_contables, pagination_metadata = await periodo_contable_dao.get_page(
+        pagination_filters,
+        projection=projection,
+        **filters,
     )
 
-    periodos_contables, pagination_metadata = paginator(periodos_contables)
     return ResponseModel(
         status=True,
         detail="Periodos contables retrieved successfully",
@@ -85,6 +169,7 @@ async def get_all_periodos_contables(
     response_model=ResponseModel[PeriodoContable, None],
     operation_id="GetPeriodoContableById",
 )
+@cache_response(CacheConfig(key="periodo_contable", use_cache=True, ttl=30))
 async def get_periodo_contable_by_id(
     id_periodo_contable: ObjectId,
     id_empresa: Annotated[
@@ -93,25 +178,24 @@ async def get_periodo_contable_by_id(
             ValidateCompanyMiddleware(),
         ),
     ],
-) -> ResponseModel[PeriodoContable, None]:
+) -> Response:
     """
     Get a periodo contable by its ID.
     Returns the periodo contable with the specified ID.
     """
 
     try:
-        periodo_contable: PeriodoContable = (
-            await periodo_contable_manager.get_periodo_contable_by_id(
+        periodo_contable: RawDocument = (
+            await periodo_contable_manager.get_periodo_contable_by_id_raw(
                 id_periodo_contable=id_periodo_contable
             )
         )
     except BasePeriodoContableException as e:
         raise Problem[PeriodoContableProblem](detail=str(e))
 
-    return ResponseModel(
-        status=True,
+    return raw_response(
+        periodo_contable,
         detail="Periodo contable retrieved successfully",
-        data=periodo_contable,
     )
 
 
@@ -121,6 +205,7 @@ async def get_periodo_contable_by_id(
     response_model=ResponseModel[PeriodoContable, None],
     operation_id="CreatePeriodoContable",
 )
+@cache_response(CacheConfig(invalidates=["periodo_contable"]))
 async def create_periodo_contable(
     id_empresa: Annotated[
         ObjectId,
@@ -157,6 +242,7 @@ async def create_periodo_contable(
     response_model=ResponseModel[PeriodoContable, None],
     operation_id="UpdatePeriodoContable",
 )
+@cache_response(CacheConfig(invalidates=["periodo_contable"]))
 async def update_periodo_contable(
     id_periodo_contable: ObjectId,
     id_empresa: Annotated[
@@ -198,6 +284,7 @@ async def update_periodo_contable(
     response_model=ResponseModel[None, None],
     operation_id="DeletePeriodoContable",
 )
+@cache_response(CacheConfig(invalidates=["periodo_contable"]))
 async def delete_periodo_contable(
     id_periodo_contable: ObjectId,
     id_empresa: Annotated[
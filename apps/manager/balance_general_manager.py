@@ -4,7 +4,6 @@ from typing import Set
 import pandas as pd
 from fastapi import UploadFile
 
-from apps.api.config.exceptions.mongo_dao_exceptions import MongoUpdateException
 from apps.api.config.exceptions.periodo_contable_exception import (
     InvalidNameByFileException,
     MissingColumnsByFileException,
@@ -12,6 +11,8 @@ from apps.api.config.exceptions.periodo_contable_exception import (
     NoBalanceGeneralAvailableException,
     NoPeriodoContableAvailableException,
 )
+from apps.mongo.core.conditional_write import ConditionalWriteResult
+from apps.mongo.core.dao_registry import get_dao
 from apps.mongo.daos.periodo_contable_dao import PeriodoContableDAO
 from apps.mongo.models.extensions.balance_general import BalanceGeneral
 from apps.mongo.models.periodo_contable import PeriodoContable, parse_amount
@@ -20,7 +21,7 @@ from apps.tools.objectid import ObjectId
 
 class BalanceGeneralManager:
     def __init__(self) -> None:
-        self._periodo_contable_dao = PeriodoContableDAO()
+        self._periodo_contable_dao = get_dao(PeriodoContableDAO)
 
     async def get_balance_general_by_periodo(
         self,
@@ -149,20 +150,6 @@ class BalanceGeneralManager:
         id_periodo: ObjectId,
         file: UploadFile,
     ) -> BalanceGeneral:
-        periodo_contable: PeriodoContable | None = (
-            await self._periodo_contable_dao.get_by_id(item_id=id_periodo)
-        )
-
-        if periodo_contable is None:
-            raise NoPeriodoContableAvailableException(
-                f"No hay periodo contable con el id: {id_periodo}"
-            )
-
-        if periodo_contable.balance_general is not None:
-            raise NoBalanceGeneralAvailableException(
-                f"Ya existe un balance general para el periodo contable con el id: {id_periodo}"
-            )
-
         contents = await file.read()
         filename = file.filename
 
@@ -208,18 +195,23 @@ class BalanceGeneralManager:
         balance_general = BalanceGeneral(**data_dict)
 
         # Guardar en el periodo contable
-        periodo_contable.balance_general = balance_general
-
-        updated_periodo_contable: PeriodoContable | None = (
-            await self._periodo_contable_dao.update_by_id(
+        result: ConditionalWriteResult[PeriodoContable] = (
+            await self._periodo_contable_dao.set_estado_financiero(
                 item_id=id_periodo,
-                data=periodo_contable,
+                field_name="balance_general",
+                value=balance_general,
+                exists=False,
             )
         )
 
-        if updated_periodo_contable is None:
-            raise MongoUpdateException(
-                f"No se pudo crear el balance general para el periodo contable con el id: {id_periodo}"
+        if result.not_found:
+            raise NoPeriodoContableAvailableException(
+                f"No hay periodo contable con el id: {id_periodo}"
+            )
+
+        if result.precondition_failed:
+            raise NoBalanceGeneralAvailableException(
+                f"Ya existe un balance general para el periodo contable con el id: {id_periodo}"
             )
 
         return balance_general
@@ -229,36 +221,25 @@ class BalanceGeneralManager:
         id_periodo: ObjectId,
         balance_general: BalanceGeneral,
     ) -> BalanceGeneral:
-        periodo_contable: PeriodoContable | None = (
-            await self._periodo_contable_dao.get_by_id(
+        result: ConditionalWriteResult[PeriodoContable] = (
+            await self._periodo_contable_dao.set_estado_financiero(
                 item_id=id_periodo,
+                field_name="balance_general",
+                value=balance_general,
+                exists=False,
             )
         )
 
-        if periodo_contable is None:
+        if result.not_found:
             raise NoPeriodoContableAvailableException(
                 f"No hay periodo contable con el id: {id_periodo}"
             )
 
-        if periodo_contable.balance_general is not None:
+        if result.precondition_failed:
             raise NoBalanceGeneralAvailableException(
                 f"Ya existe un balance general para el periodo contable con el id: {id_periodo}"
             )
 
-        periodo_contable.balance_general = balance_general
-
-        mongo_update: PeriodoContable | None = (
-            await self._periodo_contable_dao.update_by_id(
-                item_id=id_periodo,
-                data=periodo_contable,
-            )
-        )
-
-        if mongo_update is None:
-            raise MongoUpdateException(
-                f"No se pudo crear el balance general para el periodo contable con el id: {id_periodo}"
-            )
-
         return balance_general
 
     async def update_balance_general(
@@ -266,69 +247,43 @@ class BalanceGeneralManager:
         id_periodo: ObjectId,
         balance_general: BalanceGeneral,
     ) -> BalanceGeneral:
-        periodo_contable: PeriodoContable | None = (
-            await self._periodo_contable_dao.get_by_id(
+        result: ConditionalWriteResult[PeriodoContable] = (
+            await self._periodo_contable_dao.set_estado_financiero(
                 item_id=id_periodo,
+                field_name="balance_general",
+                value=balance_general,
+                exists=True,
             )
         )
 
-        if periodo_contable is None:
+        if result.not_found:
             raise NoPeriodoContableAvailableException(
                 f"No hay periodo contable con el id: {id_periodo}"
             )
 
-        balance: BalanceGeneral | None = periodo_contable.balance_general
-
-        if balance is None:
+        if result.precondition_failed:
             raise NoBalanceGeneralAvailableException(
                 f"No hay balance general disponible para el periodo contable con el id: {id_periodo}"
             )
 
-        periodo_contable.balance_general = balance_general
-
-        mongo_update: PeriodoContable | None = (
-            await self._periodo_contable_dao.update_by_id(
-                item_id=id_periodo,
-                data=periodo_contable,
-            )
-        )
-
-        if mongo_update is None:
-            raise MongoUpdateException(
-                f"No se pudo actualizar el balance general para el periodo contable con el id: {id_periodo}"
-            )
-
         return balance_general
 
     async def delete_balance_general(self, id_periodo: ObjectId) -> None:
-        periodo_contable: PeriodoContable | None = (
-            await self._periodo_contable_dao.get_by_id(
+        result: ConditionalWriteResult[PeriodoContable] = (
+            await self._periodo_contable_dao.set_estado_financiero(
                 item_id=id_periodo,
+                field_name="balance_general",
+                value=None,
+                exists=True,
             )
         )
 
-        if periodo_contable is None:
+        if result.not_found:
             raise NoPeriodoContableAvailableException(
                 f"No hay periodo contable con el id: {id_periodo}"
             )
 
-        balance: BalanceGeneral | None = periodo_contable.balance_general
-
-        if balance is None:
+        if result.precondition_failed:
             raise NoBalanceGeneralAvailableException(
                 f"No hay balance general disponible para el periodo contable con el id: {id_periodo}"
             )
-
-        periodo_contable.balance_general = None
-
-        mongo_update: PeriodoContable | None = (
-            await self._periodo_contable_dao.update_by_id(
-                item_id=id_periodo,
-                data=periodo_contable,
-            )
-        )
-
-        if mongo_update is None:
-            raise MongoUpdateException(
-                f"No se pudo actualizar el balance general para el periodo contable con el id: {id_periodo}"
-            )
@@ -1,5 +1,7 @@
 from apps.api.config.exceptions.company_exception import NoCompanyAvailableException
 from apps.api.config.exceptions.mongo_dao_exceptions import MongoUpdateException
+from apps.api.middleware.company_status_cache import get_company_status_cache
+from apps.mongo.core.dao_registry import get_dao
 from apps.mongo.daos.empresa_dao import EmpresaDAO
 from apps.mongo.models.empresa import Empresa, StatusCompany
 from apps.tools.objectid import ObjectId
@@ -7,7 +9,8 @@ from apps.tools.objectid import ObjectId
 
 class EmpresaManager:
     def __init__(self) -> None:
-        self._empresa_dao = EmpresaDAO()
+        self._empresa_dao = get_dao(EmpresaDAO)
+        self._company_status_cache = get_company_status_cache()
 
     async def get_empresa_by_id(self, id_empresa: ObjectId) -> Empresa:
         empresa: Empresa | None = await self._empresa_dao.get_by_id(item_id=id_empresa)
@@ -32,17 +35,20 @@ class EmpresaManager:
                 f"No hay Empresa disponible con el id: {id_empresa}"
             )
 
-        updated_empresa: Empresa | None = await self._empresa_dao.update_by_id(
+        updated_empresa: bool = await self._empresa_dao.update_diff(
             item_id=id_empresa,
-            data=company,
+            original=find_empresa,
+            updated=company,
         )
+        await self._company_status_cache.invalidate(id_empresa)
 
-        if updated_empresa is None:
+        if not updated_empresa:
             raise MongoUpdateException(
                 f"No se ha podido actualizar la empresa con el id: {id_empresa}"
             )
 
-        return updated_empresa
+        company.id = id_empresa
+        return company
 
     async def delete_empresa(self, id_empresa: ObjectId) -> None:
         find_empresa: Empresa | None = await self._empresa_dao.get_by_id(
@@ -54,14 +60,13 @@ class EmpresaManager:
                 f"No hay Empresa disponible con el id: {id_empresa}"
             )
 
-        find_empresa.status = StatusCompany.INACTIVO
-
-        updated_empresa: Empresa | None = await self._empresa_dao.update_by_id(
+        updated_empresa: bool = await self._empresa_dao.update_fields(
             item_id=id_empresa,
-            data=find_empresa,
+            fields={"status": StatusCompany.INACTIVO},
         )
+        await self._company_status_cache.invalidate(id_empresa)
 
-        if updated_empresa is None:
+        if not updated_empresa:
             raise MongoUpdateException(
                 f"No se ha podido eliminar la empresa con el id: {id_empresa}"
             )
@@ -4,7 +4,6 @@ from typing import Set
 import pandas as pd
 from fastapi import UploadFile
 
-from apps.api.config.exceptions.mongo_dao_exceptions import MongoUpdateException
 from apps.api.config.exceptions.periodo_contable_exception import (
     InvalidNameByFileException,
     MissingColumnsByFileException,
@@ -12,6 +11,8 @@ from apps.api.config.exceptions.periodo_contable_exception import (
     NoEstadoResultadosAvailableException,
     NoPeriodoContableAvailableException,
 )
+from apps.mongo.core.conditional_write import ConditionalWriteResult
+from apps.mongo.core.dao_registry import get_dao
 from apps.mongo.daos.periodo_contable_dao import PeriodoContableDAO
 from apps.mongo.models.extensions.estado_resultados import EstadoResultados
 from apps.mongo.models.periodo_contable import (
@@ -35,7 +36,7 @@ ER_CONCEPTOS_MAP = {
 
 class EstadoResultadosManager:
     def __init__(self) -> None:
-        self._periodo_contable_dao = PeriodoContableDAO()
+        self._periodo_contable_dao = get_dao(PeriodoContableDAO)
 
     async def get_estado_resultados_by_periodo(
         self,
@@ -66,20 +67,6 @@ class EstadoResultadosManager:
         id_periodo: ObjectId,
         file: UploadFile,
     ) -> EstadoResultados:
-        periodo_contable: PeriodoContable | None = (
-            await self._periodo_contable_dao.get_by_id(item_id=id_periodo)
-        )
-
-        if periodo_contable is None:
-            raise NoPeriodoContableAvailableException(
-                f"No hay periodo contable con el id: {id_periodo}"
-            )
-
-        if periodo_contable.estado_resultado is not None:
-            raise NoEstadoResultadosAvailableException(
-                f"Ya existe un estado de resultados para el periodo contable con el id: {id_periodo}"
-            )
-
         contents = await file.read()
         filename = file.filename
 
@@ -125,18 +112,23 @@ class EstadoResultadosManager:
         estado_resultados = EstadoResultados(**data_dict)
 
         # Guardar en el periodo contable
-        periodo_contable.estado_resultado = estado_resultados
-
-        updated_periodo_contable: PeriodoContable | None = (
-            await self._periodo_contable_dao.update_by_id(
+        result: ConditionalWriteResult[PeriodoContable] = (
+            await self._periodo_contable_dao.set_estado_financiero(
                 item_id=id_periodo,
-                data=periodo_contable,
+                field_name="estado_resultado",
+                value=estado_resultados,
+                exists=False,
             )
         )
 
-        if updated_periodo_contable is None:
-            raise MongoUpdateException(
-                f"No se pudo crear el estado de resultados para el periodo contable con el id: {id_periodo}"
+        if result.not_found:
+            raise NoPeriodoContableAvailableException(
+                f"No hay periodo contable con el id: {id_periodo}"
+            )
+
+        if result.precondition_failed:
+            raise NoEstadoResultadosAvailableException(
+                f"Ya existe un estado de resultados para el periodo contable con el id: {id_periodo}"
             )
 
         return estado_resultados
@@ -146,36 +138,25 @@ class EstadoResultadosManager:
         id_periodo: ObjectId,
         estado_resultados: EstadoResultados,
     ) -> EstadoResultados:
-        periodo_contable: PeriodoContable | None = (
-            await self._periodo_contable_dao.get_by_id(
+        result: ConditionalWriteResult[PeriodoContable] = (
+            await self._periodo_contable_dao.set_estado_financiero(
                 item_id=id_periodo,
+                field_name="estado_resultado",
+                value=estado_resultados,
+                exists=False,
             )
         )
 
-        if periodo_contable is None:
+        if result.not_found:
             raise NoPeriodoContableAvailableException(
                 f"No hay periodo contable con el id: {id_periodo}"
             )
 
-        if periodo_contable.estado_resultado is not None:
+        if result.precondition_failed:
             raise NoEstadoResultadosAvailableException(
                 f"Ya existe un estado de resultados para el periodo contable con el id: {id_periodo}"
             )
 
-        periodo_contable.estado_resultado = estado_resultados
-
-        updated_periodo_contable: PeriodoContable | None = (
-            await self._periodo_contable_dao.update_by_id(
-                item_id=id_periodo,
-                data=periodo_contable,
-            )
-        )
-
-        if updated_periodo_contable is None:
-            raise MongoUpdateException(
-                f"No se pudo crear el estado de resultados para el periodo contable con el id: {id_periodo}"
-            )
-
         return estado_resultados
 
     async def update_estado_resultados(
@@ -183,76 +164,46 @@ class EstadoResultadosManager:
         id_periodo: ObjectId,
         estado_resultados: EstadoResultados,
     ) -> EstadoResultados:
-        periodo_contable: PeriodoContable | None = (
-            await self._periodo_contable_dao.get_by_id(
+        result: ConditionalWriteResult[PeriodoContable] = (
+            await self._periodo_contable_dao.set_estado_financiero(
                 item_id=id_periodo,
+                field_name="estado_resultado",
+                value=estado_resultados,
+                exists=True,
             )
         )
 
-        if periodo_contable is None:
+        if result.not_found:
             raise NoPeriodoContableAvailableException(
                 f"No hay periodo contable con el id: {id_periodo}"
             )
 
-        estado_resultados_existente: EstadoResultados | None = (
-            periodo_contable.estado_resultado
-        )
-
-        if estado_resultados_existente is None:
+        if result.precondition_failed:
             raise NoEstadoResultadosAvailableException(
                 f"No hay estado de resultados disponible para el periodo contable con el id: {id_periodo}"
             )
 
-        periodo_contable.estado_resultado = estado_resultados
-
-        updated_periodo_contable: PeriodoContable | None = (
-            await self._periodo_contable_dao.update_by_id(
-                item_id=id_periodo,
-                data=periodo_contable,
-            )
-        )
-
-        if updated_periodo_contable is None:
-            raise MongoUpdateException(
-                f"No se pudo actualizar el estado de resultados para el periodo contable con el id: {id_periodo}"
-            )
-
         return estado_resultados
 
     async def delete_estado_resultados(
         self,
         id_periodo: ObjectId,
     ) -> None:
-        periodo_contable: PeriodoContable | None = (
-            await self._periodo_contable_dao.get_by_id(
+        result: ConditionalWriteResult[PeriodoContable] = (
+            await self._periodo_contable_dao.set_estado_financiero(
                 item_id=id_periodo,
+                field_name="estado_resultado",
+                value=None,
+                exists=True,
             )
         )
 
-        if periodo_contable is None:
+        if result.not_found:
             raise NoPeriodoContableAvailableException(
                 f"No hay periodo contable con el id: {id_periodo}"
             )
 
-        estado_resultados_existente: EstadoResultados | None = (
-            periodo_contable.estado_resultado
-        )
-
-        if estado_resultados_existente is None:
+        if result.precondition_failed:
             raise NoEstadoResultadosAvailableException(
                 f"No hay estado de resultados disponible para el periodo contable con el id: {id_periodo}"
             )
-
-        periodo_contable.estado_resultado = None
-
-        updated_periodo_contable: PeriodoContable | None = (
-            await self._periodo_contable_dao.update_by_id(
-                item_id=id_periodo,
-                data=periodo_contable,
-            )
-        )
-
-        if updated_periodo_contable is None:
-            raise MongoUpdateException(
-                f"No se pudo actualizar el estado de resultados para el periodo contable con el id: {id_periodo}"
-            )
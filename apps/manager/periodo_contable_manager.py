@@ -1,16 +1,25 @@
+from typing import Optional
+
+from pymongo.errors import DuplicateKeyError
+
 from apps.api.config.exceptions.mongo_dao_exceptions import MongoUpdateException
 from apps.api.config.exceptions.periodo_contable_exception import (
     NoPeriodoContableAvailableException,
 )
+from apps.api.middleware.company_status_cache import get_company_status_cache
+from apps.mongo.core.projection import Projection
+from apps.mongo.core.raw_bson import RawDocument
+from apps.mongo.core.dao_registry import get_dao
 from apps.mongo.daos.periodo_contable_dao import PeriodoContableDAO
 
+from apps.mongo.models.empresa import StatusCompany
 from apps.mongo.models.periodo_contable import PeriodoContable
 from apps.tools.objectid import ObjectId
 
 
 class PeriodoContableManager:
     def __init__(self) -> None:
-        self._periodo_contable_dao = PeriodoContableDAO()
+        self._periodo_contable_dao = get_dao(PeriodoContableDAO)
 
     async def get_periodo_contable_by_id(
         self, id_periodo_contable: ObjectId
@@ -26,6 +35,81 @@ class PeriodoContableManager:
 
         return periodo_contable
 
+    async def get_periodo_contable_by_id_raw(
+        self, id_periodo_contable: ObjectId
+    ) -> RawDocument:
+        periodo_contable: RawDocument | None = (
+            await self._periodo_contable_dao.get_by_id_raw(item_id=id_periodo_contable)
+        )
+
+        if periodo_contable is None:
+            raise NoPeriodoContableAvailableException(
+                f"No hay periodo contable disponible con el id: {id_periodo_contable}"
+            )
+
+        return periodo_contable
+
+    async def get_periodos_contables_by_ids(
+        self,
+        ids_periodos_contables: list[ObjectId],
+        projection: Optional[Projection[PeriodoContable]] = None,
+    ) -> tuple[list[PeriodoContable], list[ObjectId], list[ObjectId]]:
+        """
+        Periodos of several companies read with a single query, and the
+        companies missing from the `CompanyStatusCache` with another one.
+
+        Returns the periodos in the order of the ids, the ids without a periodo
+        and the ids left out because their company does not exist or is
+        inactive, as the endpoints of a single company reject them.
+        """
+        # the company of each periodo is read even when the client left it out
+        read_projection = (
+            projection.with_fields("id_empresa") if projection is not None else None
+        )
+
+        periodos_contables, missing_ids = (
+            await self._periodo_contable_dao.get_many_by_ids(
+                ids_periodos_contables,
+                use_cache=True,
+                projection=read_projection,
+            )
+        )
+
+        statuses = await get_company_status_cache().get_statuses(
+            [periodo.id_empresa for periodo in periodos_contables]
+        )
+        active_ids_empresas = {
+            id_empresa
+            for id_empresa, status in statuses.items()
+            if status == StatusCompany.ACTIVO
+        }
+
+        available = [
+            periodo
+            for periodo in periodos_contables
+            if periodo.id_empresa in active_ids_empresas
+        ]
+        if read_projection is not projection:
+            partial_model = projection.partial_model
+            available = [
+                partial_model.model_construct(
+                    _fields_set=periodo.model_fields_set - {"id_empresa"},
+                    **{
+                        field_name: value
+                        for field_name, value in periodo.__dict__.items()
+                        if field_name != "id_empresa"
+                    },
+                )
+                for periodo in available
+            ]
+        unavailable_ids = [
+            periodo.id
+            for periodo in periodos_contables
+            if periodo.id_empresa not in active_ids_empresas
+        ]
+
+        return available, missing_ids, unavailable_ids
+
     async def create_periodo_contable(
         self, id_empresa: ObjectId, periodo_contable: PeriodoContable
     ) -> PeriodoContable:
@@ -48,7 +132,13 @@ class PeriodoContableManager:
                 f"Ya existe un periodo contable con las fechas ingresadas: {find_periodo_contable.anio} "
             )
 
-        return await self._periodo_contable_dao.create(data=periodo_contable)
+        try:
+            return await self._periodo_contable_dao.create(data=periodo_contable)
+        except DuplicateKeyError as e:
+            # otra petición creó el mismo año después de la validación anterior
+            raise NoPeriodoContableAvailableException(
+                f"Ya existe un periodo contable con las fechas ingresadas: {periodo_contable.anio} "
+            ) from e
 
     async def update_periodo_contable(
         self,
@@ -65,19 +155,19 @@ class PeriodoContableManager:
                 f"No hay periodo contable disponible con el id: {id_periodo_contable}"
             )
 
-        updated_periodo_contable: PeriodoContable | None = (
-            await self._periodo_contable_dao.update_by_id(
-                item_id=id_periodo_contable,
-                data=periodo_contable,
-            )
+        updated_periodo_contable: bool = await self._periodo_contable_dao.update_diff(
+            item_id=id_periodo_contable,
+            original=find_periodo_contable,
+            updated=periodo_contable,
         )
 
-        if updated_periodo_contable is None:
+        if not updated_periodo_contable:
             raise MongoUpdateException(
                 f"No se ha podido actualizar el periodo contable con el id: {id_periodo_contable}"
             )
 
-        return updated_periodo_contable
+        periodo_contable.id = id_periodo_contable
+        return periodo_contable
 
     async def delete_periodo_contable(
         self,
@@ -1,25 +1,70 @@
 from io import BytesIO
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Sequence
 
+import numpy as np
 import openpyxl
 import pandas as pd
 from openpyxl.styles import Alignment, Font, PatternFill
 from openpyxl.utils import get_column_letter
 
 from apps.api.config.exceptions.company_exception import NoCompanyAvailableException
-from apps.mongo.daos.empresa_dao import EmpresaDAO
+from apps.api.middleware.company_status_cache import get_company_status_cache
+from apps.mongo.core.dao_registry import get_dao
+from apps.mongo.core.projection import Projection
 from apps.mongo.daos.periodo_contable_dao import PeriodoContableDAO
-from apps.mongo.models.empresa import Empresa
 from apps.mongo.models.extensions.balance_general import BalanceGeneral
 from apps.mongo.models.extensions.estado_resultados import EstadoResultados
 from apps.mongo.models.periodo_contable import PeriodoContable
 from apps.tools.objectid import ObjectId
 
 
+# (concepto, campo) de cada fila de los análisis, en el orden del reporte
+_CONCEPTOS_VERTICAL_BALANCE = [
+    ("ACTIVO CIRCULANTE", "total_activo_circulante"),
+    ("Efectivo y Equivalentes", "efectivo_equivalentes"),
+    ("Cuentas por Cobrar", "cuentas_por_cobrar"),
+    ("Inventarios", "inventarios"),
+    ("ACTIVO NO CIRCULANTE", "total_activo_no_circulante"),
+    ("Propiedades, Planta y Equipo", "propiedades_plantas_equipos"),
+    ("PASIVO CIRCULANTE", "total_pasivo_circulante"),
+    ("Cuentas por Pagar", "cuentas_por_pagar"),
+    ("PASIVO A LARGO PLAZO", "total_pasivo_a_largo_plazo"),
+    ("CAPITAL CONTABLE", "capital_social_y_utilidades_retenidas"),
+]
+
+_CONCEPTOS_VERTICAL_RESULTADOS = [
+    ("Ventas Netas", "ventas_netas"),
+    ("Costo de Ventas", "costo_ventas"),
+    ("Utilidad Bruta", "utilidad_bruta"),
+    ("Gastos Operativos", "gastos_operativos"),
+    ("Utilidad Operativa", "utilidad_operativa"),
+    ("Resultado Financiero", "resultado_financieros"),
+    ("Utilidad Antes de Impuestos", "utilidad_ante_impuestos"),
+    ("Impuesto sobre Utilidad", "impuesto_utilidad"),
+    ("Utilidad Neta", "utilidad_neta"),
+]
+
+_CONCEPTOS_HORIZONTAL_BALANCE = [
+    ("Efectivo y Equivalentes", "efectivo_equivalentes"),
+    ("Cuentas por Cobrar", "cuentas_por_cobrar"),
+    ("Inventarios", "inventarios"),
+    ("Total Activo Circulante", "total_activo_circulante"),
+    ("Propiedades, Planta y Equipo", "propiedades_plantas_equipos"),
+    ("Total Activo", "total_activo"),
+    ("Cuentas por Pagar", "cuentas_por_pagar"),
+    ("Total Pasivo Circulante", "total_pasivo_circulante"),
+    ("Total Pasivo a Largo Plazo", "total_pasivo_a_largo_plazo"),
+    ("Total Pasivo", "total_pasivo"),
+    ("Capital Contable", "capital_social_y_utilidades_retenidas"),
+]
+
+_CONCEPTOS_HORIZONTAL_RESULTADOS = _CONCEPTOS_VERTICAL_RESULTADOS
+
+
 class ReporteGeneralManager:
     def __init__(self) -> None:
-        self._periodo_dao = PeriodoContableDAO()
-        self._empresa_dao = EmpresaDAO()
+        self._periodo_dao = get_dao(PeriodoContableDAO)
+        self._company_status_cache = get_company_status_cache()
 
     async def get_reporte_final(
         self, id_empresa: ObjectId, anios: list[int]
@@ -30,14 +75,23 @@ class ReporteGeneralManager:
             "anio": {"$in": anios},
         }
 
-        empresa: Empresa | None = await self._empresa_dao.get_by_id(id_empresa)
+        # `ValidateCompanyMiddleware` just read the company into this cache
+        nombre_empresa: str | None = await self._company_status_cache.get_nombre(
+            id_empresa
+        )
 
-        if not empresa:
+        if nombre_empresa is None:
             raise NoCompanyAvailableException(
                 f"No hay proyecto disponible con el id: {id_empresa}"
             )
 
-        periodos: list[PeriodoContable] = await self._periodo_dao.get_all(**filters)
+        periodos: list[PeriodoContable] = await self._periodo_dao.get_all(
+            projection=Projection(
+                PeriodoContable,
+                include={"anio", "estado_resultado", "balance_general"},
+            ),
+            **filters,
+        )
 
         # Ordenar periodos por año
         periodos_ordenados: List[PeriodoContable] = sorted(
@@ -97,7 +151,7 @@ class ReporteGeneralManager:
 
         return (
             excel_buffer,
-            f"Reporte Financiero de {empresa.nombre}.xlsx",
+            f"Reporte Financiero de {nombre_empresa}.xlsx",
         )
 
     def _analisis_vertical_balance(
@@ -107,181 +161,9 @@ class ReporteGeneralManager:
         if not balances:
             return pd.DataFrame()
 
-        data = []
-        for i, balance in enumerate(balances):
-            if i < len(anios):
-                anio = anios[i]
-                total_activo = balance.total_activo
-
-                data.append(
-                    {
-                        "Concepto": "ACTIVO CIRCULANTE",
-                        "Año": anio,
-                        "Valor": balance.total_activo_circulante,
-                        "Porcentaje": round(
-                            (
-                                (balance.total_activo_circulante / total_activo * 100)
-                                if total_activo
-                                else 0
-                            ),
-                            2,
-                        ),
-                    }
-                )
-                data.append(
-                    {
-                        "Concepto": "Efectivo y Equivalentes",
-                        "Año": anio,
-                        "Valor": balance.efectivo_equivalentes,
-                        "Porcentaje": round(
-                            (
-                                (balance.efectivo_equivalentes / total_activo * 100)
-                                if total_activo
-                                else 0
-                            ),
-                            2,
-                        ),
-                    }
-                )
-                data.append(
-                    {
-                        "Concepto": "Cuentas por Cobrar",
-                        "Año": anio,
-                        "Valor": balance.cuentas_por_cobrar,
-                        "Porcentaje": round(
-                            (
-                                (balance.cuentas_por_cobrar / total_activo * 100)
-                                if total_activo
-                                else 0
-                            ),
-                            2,
-                        ),
-                    }
-                )
-                data.append(
-                    {
-                        "Concepto": "Inventarios",
-                        "Año": anio,
-                        "Valor": balance.inventarios,
-                        "Porcentaje": round(
-                            (
-                                (balance.inventarios / total_activo * 100)
-                                if total_activo
-                                else 0
-                            ),
-                            2,
-                        ),
-                    }
-                )
-                data.append(
-                    {
-                        "Concepto": "ACTIVO NO CIRCULANTE",
-                        "Año": anio,
-                        "Valor": balance.total_activo_no_circulante,
-                        "Porcentaje": round(
-                            (
-                                (
-                                    balance.total_activo_no_circulante
-                                    / total_activo
-                                    * 100
-                                )
-                                if total_activo
-                                else 0
-                            ),
-                            2,
-                        ),
-                    }
-                )
-                data.append(
-                    {
-                        "Concepto": "Propiedades, Planta y Equipo",
-                        "Año": anio,
-                        "Valor": balance.propiedades_plantas_equipos,
-                        "Porcentaje": round(
-                            (
-                                (
-                                    balance.propiedades_plantas_equipos
-                                    / total_activo
-                                    * 100
-                                )
-                                if total_activo
-                                else 0
-                            ),
-                            2,
-                        ),
-                    }
-                )
-                data.append(
-                    {
-                        "Concepto": "PASIVO CIRCULANTE",
-                        "Año": anio,
-                        "Valor": balance.total_pasivo_circulante,
-                        "Porcentaje": round(
-                            (
-                                (balance.total_pasivo_circulante / total_activo * 100)
-                                if total_activo
-                                else 0
-                            ),
-                            2,
-                        ),
-                    }
-                )
-                data.append(
-                    {
-                        "Concepto": "Cuentas por Pagar",
-                        "Año": anio,
-                        "Valor": balance.cuentas_por_pagar,
-                        "Porcentaje": round(
-                            (
-                                (balance.cuentas_por_pagar / total_activo * 100)
-                                if total_activo
-                                else 0
-                            ),
-                            2,
-                        ),
-                    }
-                )
-                data.append(
-                    {
-                        "Concepto": "PASIVO A LARGO PLAZO",
-                        "Año": anio,
-                        "Valor": balance.total_pasivo_a_largo_plazo,
-                        "Porcentaje": round(
-                            (
-                                (
-                                    balance.total_pasivo_a_largo_plazo
-                                    / total_activo
-                                    * 100
-                                )
-                                if total_activo
-                                else 0
-                            ),
-                            2,
-                        ),
-                    }
-                )
-                data.append(
-                    {
-                        "Concepto": "CAPITAL CONTABLE",
-                        "Año": anio,
-                        "Valor": balance.capital_social_y_utilidades_retenidas,
-                        "Porcentaje": round(
-                            (
-                                (
-                                    balance.capital_social_y_utilidades_retenidas
-                                    / total_activo
-                                    * 100
-                                )
-                                if total_activo
-                                else 0
-                            ),
-                            2,
-                        ),
-                    }
-                )
-
-        df = pd.DataFrame(data)
-        return df.pivot(index="Concepto", columns="Año", values=["Valor", "Porcentaje"])
+        return _analisis_vertical(
+            balances, anios, _CONCEPTOS_VERTICAL_BALANCE, "total_activo"
+        )
 
     def _analisis_vertical_resultados(
         self, estados: List[EstadoResultados], anios: List[int]
@@ -290,143 +172,13 @@ class ReporteGeneralManager:
         if not estados:
             return pd.DataFrame()
 
-        data = []
-        for i, estado in enumerate(estados):
-            if i < len(anios):
-                anio = anios[i]
-                ventas_netas = estado.ventas_netas
-
-                data.append(
-                    {
-                        "Concepto": "Ventas Netas",
-                        "Año": anio,
-                        "Valor": estado.ventas_netas,
-                        "Porcentaje": 100.0,
-                    }
-                )
-                data.append(
-                    {
-                        "Concepto": "Costo de Ventas",
-                        "Año": anio,
-                        "Valor": estado.costo_ventas,
-                        "Porcentaje": round(
-                            (
-                                (estado.costo_ventas / ventas_netas * 100)
-                                if ventas_netas
-                                else 0
-                            ),
-                            2,
-                        ),
-                    }
-                )
-                data.append(
-                    {
-                        "Concepto": "Utilidad Bruta",
-                        "Año": anio,
-                        "Valor": estado.utilidad_bruta,
-                        "Porcentaje": round(
-                            (
-                                (estado.utilidad_bruta / ventas_netas * 100)
-                                if ventas_netas
-                                else 0
-                            ),
-                            2,
-                        ),
-                    }
-                )
-                data.append(
-                    {
-                        "Concepto": "Gastos Operativos",
-                        "Año": anio,
-                        "Valor": estado.gastos_operativos,
-                        "Porcentaje": round(
-                            (
-                                (estado.gastos_operativos / ventas_netas * 100)
-                                if ventas_netas
-                                else 0
-                            ),
-                            2,
-                        ),
-                    }
-                )
-                data.append(
-                    {
-                        "Concepto": "Utilidad Operativa",
-                        "Año": anio,
-                        "Valor": estado.utilidad_operativa,
-                        "Porcentaje": round(
-                            (
-                                (estado.utilidad_operativa / ventas_netas * 100)
-                                if ventas_netas
-                                else 0
-                            ),
-                            2,
-                        ),
-                    }
-                )
-                data.append(
-                    {
-                        "Concepto": "Resultado Financiero",
-                        "Año": anio,
-                        "Valor": estado.resultado_financieros,
-                        "Porcentaje": round(
-                            (
-                                (estado.resultado_financieros / ventas_netas * 100)
-                                if ventas_netas
-                                else 0
-                            ),
-                            2,
-                        ),
-                    }
-                )
-                data.append(
-                    {
-                        "Concepto": "Utilidad Antes de Impuestos",
-                        "Año": anio,
-                        "Valor": estado.utilidad_ante_impuestos,
-                        "Porcentaje": round(
-                            (
-                                (estado.utilidad_ante_impuestos / ventas_netas * 100)
-                                if ventas_netas
-                                else 0
-                            ),
-                            2,
-                        ),
-                    }
-                )
-                data.append(
-                    {
-                        "Concepto": "Impuesto sobre Utilidad",
-                        "Año": anio,
-                        "Valor": estado.impuesto_utilidad,
-                        "Porcentaje": round(
-                            (
-                                (estado.impuesto_utilidad / ventas_netas * 100)
-                                if ventas_netas
-                                else 0
-                            ),
-                            2,
-                        ),
-                    }
-                )
-                data.append(
-                    {
-                        "Concepto": "Utilidad Neta",
-                        "Año": anio,
-                        "Valor": estado.utilidad_neta,
-                        "Porcentaje": round(
-                            (
-                                (estado.utilidad_neta / ventas_netas * 100)
-                                if ventas_netas
-                                else 0
-                            ),
-                            2,
-                        ),
-                    }
-                )
-
-        df = pd.DataFrame(data)
-        return df.pivot(index="Concepto", columns="Año", values=["Valor", "Porcentaje"])
+        return _analisis_vertical(
+            estados,
+            anios,
+            _CONCEPTOS_VERTICAL_RESULTADOS,
+            "ventas_netas",
+            conceptos_base={"Ventas Netas"},
+        )
 
     def _analisis_horizontal_balance(
         self, balances: List[BalanceGeneral], anios: List[int]
@@ -435,49 +187,7 @@ class ReporteGeneralManager:
         if len(balances) < 2:
             return pd.DataFrame()
 
-        data = []
-        conceptos = [
-            ("Efectivo y Equivalentes", "efectivo_equivalentes"),
-            ("Cuentas por Cobrar", "cuentas_por_cobrar"),
-            ("Inventarios", "inventarios"),
-            ("Total Activo Circulante", "total_activo_circulante"),
-            ("Propiedades, Planta y Equipo", "propiedades_plantas_equipos"),
-            ("Total Activo", "total_activo"),
-            ("Cuentas por Pagar", "cuentas_por_pagar"),
-            ("Total Pasivo Circulante", "total_pasivo_circulante"),
-            ("Total Pasivo a Largo Plazo", "total_pasivo_a_largo_plazo"),
-            ("Total Pasivo", "total_pasivo"),
-            ("Capital Contable", "capital_social_y_utilidades_retenidas"),
-        ]
-
-        for concepto_nombre, campo in conceptos:
-            row = {"Concepto": concepto_nombre}
-
-            for i in range(len(balances)):
-                if i < len(anios):
-                    valor_actual = getattr(balances[i], campo)
-                    row[f"{anios[i]}"] = valor_actual
-
-                    if i > 0:  # Calcular variación respecto al año anterior
-                        valor_anterior = getattr(balances[i - 1], campo)
-                        variacion_absoluta = valor_actual - valor_anterior
-                        variacion_porcentual = round(
-                            (
-                                (variacion_absoluta / valor_anterior * 100)
-                                if valor_anterior != 0
-                                else 0
-                            ),
-                            2,
-                        )
-
-                        row[f"Var. {anios[i-1]}-{anios[i]} ($)"] = variacion_absoluta
-                        row[f"Var. {anios[i-1]}-{anios[i]} (%)"] = str(
-                            variacion_porcentual
-                        )
-
-            data.append(row)
-
-        return pd.DataFrame(data)
+        return _analisis_horizontal(balances, anios, _CONCEPTOS_HORIZONTAL_BALANCE)
 
     def _analisis_horizontal_resultados(
         self, estados: List[EstadoResultados], anios: List[int]
@@ -486,47 +196,7 @@ class ReporteGeneralManager:
         if len(estados) < 2:
             return pd.DataFrame()
 
-        data = []
-        conceptos = [
-            ("Ventas Netas", "ventas_netas"),
-            ("Costo de Ventas", "costo_ventas"),
-            ("Utilidad Bruta", "utilidad_bruta"),
-            ("Gastos Operativos", "gastos_operativos"),
-            ("Utilidad Operativa", "utilidad_operativa"),
-            ("Resultado Financiero", "resultado_financieros"),
-            ("Utilidad Antes de Impuestos", "utilidad_ante_impuestos"),
-            ("Impuesto sobre Utilidad", "impuesto_utilidad"),
-            ("Utilidad Neta", "utilidad_neta"),
-        ]
-
-        for concepto_nombre, campo in conceptos:
-            row = {"Concepto": concepto_nombre}
-
-            for i in range(len(estados)):
-                if i < len(anios):
-                    valor_actual = getattr(estados[i], campo)
-                    row[f"{anios[i]}"] = valor_actual
-
-                    if i > 0:  # Calcular variación respecto al año anterior
-                        valor_anterior = getattr(estados[i - 1], campo)
-                        variacion_absoluta = valor_actual - valor_anterior
-                        variacion_porcentual = round(
-                            (
-                                (variacion_absoluta / valor_anterior * 100)
-                                if valor_anterior != 0
-                                else 0
-                            ),
-                            2,
-                        )
-
-                        row[f"Var. {anios[i-1]}-{anios[i]} ($)"] = variacion_absoluta
-                        row[f"Var. {anios[i-1]}-{anios[i]} (%)"] = str(
-                            variacion_porcentual
-                        )
-
-            data.append(row)
-
-        return pd.DataFrame(data)
+        return _analisis_horizontal(estados, anios, _CONCEPTOS_HORIZONTAL_RESULTADOS)
 
     def _analisis_razones_liquidez(
         self, periodos: List[PeriodoContable]
@@ -1273,3 +943,98 @@ class ReporteGeneralManager:
         excel_buffer.seek(0)
 
         return excel_buffer
+
+
+def _get_matriz(
+    estados: Sequence[Any], campos: List[str], periodos: int
+) -> np.ndarray:
+    """Matriz periodos × campos con los valores de los primeros `periodos` estados"""
+    return np.array(
+        [[getattr(estado, campo) for campo in campos] for estado in estados[:periodos]],
+        dtype=np.float64,
+    ).reshape(periodos, len(campos))
+
+
+def _redondear(valores: np.ndarray) -> list[float]:
+    """
+    Redondea a 2 decimales con `round` de Python.
+
+    `np.round` redondea algunos valores a la mitad de forma distinta
+    (escala por 100), se mantiene `round` para que el reporte no cambie.
+    """
+    return [round(valor, 2) for valor in valores.tolist()]
+
+
+def _analisis_vertical(
+    estados: Sequence[Any],
+    anios: List[int],
+    conceptos: List[tuple[str, str]],
+    campo_base: str,
+    conceptos_base: Optional[set[str]] = None,
+) -> pd.DataFrame:
+    """
+    Cada partida como % de `campo_base` en su año, calculado sobre la matriz
+    años × partidas. Con base 0 el porcentaje es 0 y las partidas de
+    `conceptos_base` son siempre 100.0.
+    """
+    periodos = min(len(estados), len(anios))
+    nombres = [nombre for nombre, _ in conceptos]
+
+    valores = _get_matriz(estados, [campo for _, campo in conceptos], periodos)
+    base = _get_matriz(estados, [campo_base], periodos)
+
+    porcentajes = np.zeros_like(valores)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        np.divide(valores, base, out=porcentajes, where=base != 0)
+    porcentajes *= 100
+
+    if conceptos_base:
+        porcentajes[:, [nombre in conceptos_base for nombre in nombres]] = 100.0
+
+    df = pd.DataFrame(
+        {
+            "Concepto": np.tile(np.array(nombres, dtype=object), periodos),
+            "Año": np.repeat(np.array(anios[:periodos]), len(nombres)),
+            "Valor": valores.ravel(),
+            "Porcentaje": _redondear(porcentajes.ravel()),
+        }
+    )
+    return df.pivot(index="Concepto", columns="Año", values=["Valor", "Porcentaje"])
+
+
+def _analisis_horizontal(
+    estados: Sequence[Any], anios: List[int], conceptos: List[tuple[str, str]]
+) -> pd.DataFrame:
+    """
+    Valor de cada partida por año y su variación respecto al año anterior,
+    calculada para todas las partidas a la vez. Con valor anterior 0 la
+    variación porcentual es "0".
+    """
+    periodos = min(len(estados), len(anios))
+
+    valores = _get_matriz(estados, [campo for _, campo in conceptos], periodos)
+    anteriores = valores[:-1]
+    variaciones = valores[1:] - anteriores
+
+    variaciones_porcentuales = np.zeros_like(variaciones)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        np.divide(
+            variaciones, anteriores, out=variaciones_porcentuales, where=anteriores != 0
+        )
+    variaciones_porcentuales *= 100
+
+    columnas: Dict[str, Any] = {"Concepto": [nombre for nombre, _ in conceptos]}
+    for i in range(periodos):
+        columnas[f"{anios[i]}"] = valores[i]
+
+        if i > 0:  # Variación respecto al año anterior
+            columnas[f"Var. {anios[i-1]}-{anios[i]} ($)"] = variaciones[i - 1]
+            columnas[f"Var. {anios[i-1]}-{anios[i]} (%)"] = [
+                str(variacion) if anterior != 0 else "0"
+                for variacion, anterior in zip(
+                    _redondear(variaciones_porcentuales[i - 1]),
+                    anteriores[i - 1].tolist(),
+                )
+            ]
+
+    return pd.DataFrame(columnas)
@@ -1,20 +1,67 @@
+import asyncio
+import functools
+import time
 import typing
 from enum import Enum
 from types import UnionType
-from typing import Any, Generic, Optional, Tuple, Type, TypeVar, get_args, get_origin
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Generic,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    get_args,
+    get_origin,
+)
 
 from bson import CodecOptions
 from bson.codec_options import TypeEncoder, TypeRegistry
+from pydantic import BaseModel
+from pymongo import ASCENDING, DESCENDING, InsertOne, UpdateOne, WriteConcern
+from pymongo.errors import BulkWriteError
 from typing_extensions import get_original_bases
 
 from apps.mongo.core.base_mongo_model import BaseMongoModel
+from apps.mongo.core.bulk_write import (
+    DEFAULT_BULK_BATCH_SIZE,
+    BulkItemStatus,
+    BulkOperation,
+    BulkWriteResult,
+)
+from apps.mongo.core.cache_key import get_cache_key
+from apps.mongo.core.conditional_write import (
+    ConditionalWriteResult,
+    ConditionalWriteStatus,
+)
+from apps.mongo.core.identity_map import MISSING, get_identity_map
 from apps.mongo.core.mongo_collection import MongoCollection
 from apps.mongo.core.mongo_connection import MongoConnection
-from apps.tools.cache import CacheMap
+from apps.mongo.core.projection import Projection
+from apps.mongo.core.raw_bson import RawDocument
+from apps.tools.cache import (
+    CacheBackend,
+    CachedValue,
+    CacheStatistics,
+    create_cache_backend,
+)
+from apps.tools.cache_config import CacheConfig
 from apps.tools.objectid import ObjectId
+from apps.tools.paginator import (
+    CountMode,
+    OrderDirection,
+    PaginationCursor,
+    PaginationFilters,
+    PaginationMetadata,
+)
 
 T = TypeVar("T", bound=BaseMongoModel)
 
+_NO_CACHE = CacheConfig()
+_USE_CACHE = CacheConfig(use_cache=True)
+
 
 class BaseMongoDAO(Generic[T]):
     """
@@ -40,26 +87,49 @@ class BaseMongoDAO(Generic[T]):
 
     retrieved_fruit = await dao.get_by_id(saved_fruit.id)
     ```
+
+    Reads can skip the full pydantic validation of the documents with
+    `trusted_reads` (see `MongoCollection`), either for every read of a DAO
+    (`FruitsDAO(trusted_reads=True)` or `trusted_reads = True` in the
+    subclass) or per call with `trusted=True`.
+
+    The reads with `use_cache=True` are kept in a bounded cache (see
+    `CacheMap`). `cache_scope` names the field that groups the documents
+    (e.g. `id_empresa`): the cached reads are tagged with it and a write
+    only invalidates the reads of its scope, plus the reads that span
+    several scopes.
     """
 
     _collection: MongoCollection[T]
+    trusted_reads: bool = False
+    cache_scope: Optional[str] = None
 
     def __init__(
         self,
         connection: MongoConnection = MongoConnection(),
+        trusted_reads: Optional[bool] = None,
     ) -> None:
+        if trusted_reads is not None:
+            self.trusted_reads = trusted_reads
 
         db = connection.db
         model_class = self._get_model_class()
         collection_name = self._get_collection_name(model_class)
         codec_options = self._get_codec_options()
         collection = db.get_collection(collection_name, codec_options=codec_options)
-        self._caching = CacheMap()
-
-        class TypedCollection(MongoCollection[model_class]):
-            pass
-
-        self._collection = TypedCollection(collection=collection)
+        async_collection = connection.async_db.get_collection(
+            collection_name, codec_options=codec_options
+        )
+        self._collection_name = collection_name
+        self._caching: CacheBackend = create_cache_backend()
+        # reads being fetched, concurrent misses of a key wait for the same one
+        self._in_flight: dict[str, asyncio.Future] = {}
+
+        self._collection = get_typed_collection_class(model_class)(
+            collection=collection,
+            async_collection=async_collection,
+            trusted_reads=self.trusted_reads,
+        )
 
     async def get_all(
         self,
@@ -67,35 +137,171 @@ class BaseMongoDAO(Generic[T]):
         page: Optional[int] = None,
         page_size: Optional[int] = None,
         use_cache: Optional[bool] = False,
+        cache_config: Optional[CacheConfig] = None,
+        projection: Optional[Projection[T]] = None,
+        trusted: Optional[bool] = None,
         **filters: Any,
     ) -> list[T]:
-        """retrieve all documents from the collection that match the filters"""
-        cache_key = self._get_cache_key("get_all", page, page_size, **filters)
+        """retrieve all documents from the collection that match the filters
 
-        if use_cache:
-            cached_result = self._get_from_cache(cache_key)
+        When a `projection` is given only those fields are read and the
+        documents are returned as its partial model.
+        """
+        cache_key = self._get_cache_key(
+            "get_all", page, page_size, projection, **filters
+        )
 
-            if cached_result is not None:
-                return cached_result
+        return await self._read_through(
+            cache_key,
+            self._get_cache_config(use_cache, cache_config),
+            fetch=lambda: self._collection.find_many(
+                filters=filters,
+                page=page,
+                page_size=page_size,
+                projection=projection,
+                trusted=trusted,
+            ),
+            get_scope=lambda _: self._get_cache_scope(filters),
+        )
 
-        result = await self._collection.find_many(
-            filters=filters,
-            page=page,
-            page_size=page_size,
+    async def get_page(
+        self,
+        pagination_filters: PaginationFilters,
+        *,
+        use_cache: Optional[bool] = False,
+        cache_config: Optional[CacheConfig] = None,
+        projection: Optional[Projection[T]] = None,
+        trusted: Optional[bool] = None,
+        **filters: Any,
+    ) -> tuple[list[T], PaginationMetadata]:
+        """retrieve one page of the documents that match the filters
+
+        Sorting, skip and limit are applied by Mongo and `total_items` comes
+        from a separate count query, so only the requested page is read.
+
+        When the filters carry a `cursor` the page starts right after it
+        (keyset pagination on `order_by` + `_id`) instead of skipping
+        documents. Pages with a limit return the `next_cursor` of the
+        following page.
+        """
+        cache_key = self._get_cache_key(
+            "get_page", pagination_filters, projection, **filters
         )
-        self._set_cache(cache_key, result)
 
-        return result
+        return await self._read_through(
+            cache_key,
+            self._get_cache_config(use_cache, cache_config),
+            fetch=lambda: self._find_page(
+                pagination_filters,
+                projection,
+                filters,
+                find_many=functools.partial(
+                    self._collection.find_many, trusted=trusted
+                ),
+                get_value=getattr,
+            ),
+            get_scope=lambda _: self._get_cache_scope(filters),
+        )
+
+    async def get_page_raw(
+        self,
+        pagination_filters: PaginationFilters,
+        *,
+        use_cache: Optional[bool] = False,
+        cache_config: Optional[CacheConfig] = None,
+        projection: Optional[Projection[T]] = None,
+        **filters: Any,
+    ) -> tuple[list[RawDocument], PaginationMetadata]:
+        """`get_page` without building the models
+
+        The documents are returned as dicts shaped like the JSON of the model,
+        to be sent as is with `dumps_raw` by read only endpoints.
+        """
+        cache_key = self._get_cache_key(
+            "get_page_raw", pagination_filters, projection, **filters
+        )
+
+        return await self._read_through(
+            cache_key,
+            self._get_cache_config(use_cache, cache_config),
+            fetch=lambda: self._find_page(
+                pagination_filters,
+                projection,
+                filters,
+                find_many=self._collection.find_many_raw,
+                get_value=lambda document, field_name: document.get(
+                    self._get_field_alias(field_name)
+                ),
+            ),
+            get_scope=lambda _: self._get_cache_scope(filters),
+        )
+
+    async def _find_page(
+        self,
+        pagination_filters: PaginationFilters,
+        projection: Optional[Projection[T]],
+        filters: dict[str, Any],
+        find_many: Callable[..., Awaitable[list[Any]]],
+        get_value: Callable[[Any, str], Any],
+    ) -> tuple[list[Any], PaginationMetadata]:
+        order_by = pagination_filters.order_by or "id"
+        if projection is not None:
+            projection = projection.with_fields(order_by)
+
+        sort = self._get_sort(pagination_filters)
+        limit = pagination_filters.limit
+
+        items, (total_items, total_is_estimate) = await asyncio.gather(
+            find_many(
+                filters=self._get_page_filters(pagination_filters, filters),
+                projection=projection,
+                sort=sort,
+                skip=pagination_filters.skip,
+                # one extra item tells if there is a next page
+                limit=limit + 1 if limit else 0,
+            ),
+            self._count(pagination_filters, filters),
+        )
+
+        has_next: Optional[bool] = None
+        next_cursor: Optional[str] = None
+        if limit:
+            has_next = len(items) > limit
+            items = items[:limit]
+
+            if has_next:
+                order_by_field, direction = sort[0]
+                next_cursor = PaginationCursor(
+                    order_by=order_by_field,
+                    direction=direction,
+                    value=self._get_cursor_value(get_value(items[-1], order_by)),
+                    last_id=get_value(items[-1], "id"),
+                ).encode()
+
+        return (
+            items,
+            PaginationMetadata.from_filters(
+                total_items=total_items,
+                pagination_filters=pagination_filters,
+                total_is_estimate=total_is_estimate,
+                next_cursor=next_cursor,
+                has_next=has_next,
+            ),
+        )
 
     def get_all_sync(
         self,
         page: Optional[int] = None,
         page_size: Optional[int] = None,
         use_cache: Optional[bool] = False,
+        projection: Optional[Projection[T]] = None,
+        trusted: Optional[bool] = None,
         **filters: Any,
     ) -> list[T]:
         """retrieve all documents from the collection that match the filters"""
-        cache_key = self._get_cache_key("get_all_sync", page, page_size, **filters)
+        cache_key = self._get_cache_key(
+            "get_all_sync", page, page_size, projection, **filters
+        )
 
         if use_cache:
             cached_result = self._get_from_cache(cache_key)
@@ -107,8 +313,11 @@ class BaseMongoDAO(Generic[T]):
             filters=filters,
             page=page,
             page_size=page_size,
+            projection=projection,
+            trusted=trusted,
         )
-        self._set_cache(cache_key, result)
+        if use_cache:
+            self._set_cache(cache_key, result, self._get_cache_scope(filters))
 
         return result
 
@@ -117,41 +326,163 @@ class BaseMongoDAO(Generic[T]):
         *,
         page: Optional[int] = None,
         page_size: Optional[int] = None,
+        projection: Optional[Projection[T]] = None,
+        trusted: Optional[bool] = None,
+        batch_size: Optional[int] = None,
         **filters: Any,
     ) -> typing.AsyncGenerator[T, None]:
-        """retrieve all documents from the collection that match the filters"""
-        return self._collection.find_many_generator(
+        """iterate the documents that match the filters, `batch_size` at a time from Mongo
+
+        ```python
+        async for periodo in dao.get_all_generator(batch_size=500, id_empresa=id_empresa):
+            ...
+        ```
+        """
+        async for item in self._collection.find_many_generator(
             page=page,
             page_size=page_size,
             filters=filters,
-        )
+            projection=projection,
+            trusted=trusted,
+            batch_size=batch_size,
+        ):
+            yield item
+
+    async def stream_page_raw(
+        self,
+        pagination_filters: PaginationFilters,
+        *,
+        projection: Optional[Projection[T]] = None,
+        batch_size: Optional[int] = None,
+        **filters: Any,
+    ) -> typing.AsyncGenerator[RawDocument, None]:
+        """iterate the documents of `get_page_raw` without loading the page in memory
+
+        There is no count and nothing is cached, meant for streamed responses
+        (e.g. `limit=0` to export every document).
+        """
+        async for document in self._collection.find_many_raw_generator(
+            filters=self._get_page_filters(pagination_filters, filters),
+            projection=projection,
+            sort=self._get_sort(pagination_filters),
+            skip=pagination_filters.skip,
+            limit=pagination_filters.limit,
+            batch_size=batch_size,
+        ):
+            yield document
 
     async def get_by_id(
         self,
         item_id: ObjectId,
-        use_cache: Optional[bool] = False,
+        use_cache: Optional[bool] = None,
+        cache_config: Optional[CacheConfig] = None,
+        projection: Optional[Projection[T]] = None,
+        trusted: Optional[bool] = None,
     ) -> Optional[T]:
-        """retrieve a document by its id"""
-        cache_key = self._get_cache_key("get_by_id", item_id)
-
-        if use_cache:
-            cached_result = self._get_from_cache(cache_key)
+        """retrieve a document by its id
+
+        `use_cache=False` also skips the reads of the current `IdentityMap`.
+        """
+        cache_key = self._get_cache_key("get_by_id", item_id, projection)
+
+        return await self._read_identity_map(
+            cache_key,
+            use_cache,
+            read=lambda: self._read_through(
+                cache_key,
+                self._get_cache_config(use_cache, cache_config),
+                fetch=lambda: self._collection.find_one(
+                    {"_id": item_id}, projection, trusted
+                ),
+                get_scope=lambda result: self._get_cache_scope(
+                    {"_id": item_id}, result
+                ),
+            ),
+        )
 
-            if cached_result is not None:
-                return cached_result
+    async def get_many_by_ids(
+        self,
+        item_ids: list[ObjectId],
+        use_cache: Optional[bool] = False,
+        cache_config: Optional[CacheConfig] = None,
+        projection: Optional[Projection[T]] = None,
+        trusted: Optional[bool] = None,
+    ) -> tuple[list[T], list[ObjectId]]:
+        """retrieve the documents of several ids with a single `$in` query
+
+        Returns the documents in the order of `item_ids` (a repeated id once)
+        and the ids that were not found. With the cache the documents are
+        read from and stored in the entries of `get_by_id`, only the ids
+        missing from the cache are queried.
+        """
+        cache_config = self._get_cache_config(use_cache, cache_config)
+        item_ids = list(dict.fromkeys(item_ids))
+
+        found: dict[ObjectId, T] = {}
+        cache_keys: dict[ObjectId, str] = {}
+        if cache_config.use_cache:
+            for item_id in item_ids:
+                cache_keys[item_id] = self._get_cache_key(
+                    "get_by_id", item_id, projection
+                )
+                cached = await self._get_from_cache_async(cache_keys[item_id])
+                if cached is not None:
+                    found[item_id] = cached
+
+        query_ids = [item_id for item_id in item_ids if item_id not in found]
+        if query_ids:
+            if cache_config.use_cache:
+                generations = await self._get_cache_generations()
+            documents: list[T] = await self._collection.find_many(
+                filters={"_id": {"$in": query_ids}},
+                projection=projection,
+                trusted=trusted,
+            )
 
-        result = await self._collection.find_one({"_id": item_id})
+            for document in documents:
+                found[document.id] = document
+
+            if cache_config.use_cache:
+                for document in documents:
+                    await self._set_cache_async(
+                        cache_keys[document.id],
+                        document,
+                        self._get_cache_scope({"_id": document.id}, document),
+                        cache_config,
+                        generations,
+                    )
+
+        return (
+            [found[item_id] for item_id in item_ids if item_id in found],
+            [item_id for item_id in item_ids if item_id not in found],
+        )
 
-        self._set_cache(cache_key, result)
-        return result
+    async def get_by_id_raw(
+        self,
+        item_id: ObjectId,
+        use_cache: Optional[bool] = False,
+        cache_config: Optional[CacheConfig] = None,
+        projection: Optional[Projection[T]] = None,
+    ) -> Optional[RawDocument]:
+        """retrieve a document by its id without building the model, see `get_page_raw`"""
+        cache_key = self._get_cache_key("get_by_id_raw", item_id, projection)
+
+        return await self._read_through(
+            cache_key,
+            self._get_cache_config(use_cache, cache_config),
+            fetch=lambda: self._collection.find_one_raw({"_id": item_id}, projection),
+            get_scope=lambda result: self._get_cache_scope({"_id": item_id}, result),
+        )
 
     def get_by_id_sync(
         self,
         item_id: ObjectId,
         use_cache: Optional[bool] = False,
+        projection: Optional[Projection[T]] = None,
+        trusted: Optional[bool] = None,
     ) -> Optional[T]:
         """retrieve a document by its id"""
-        cache_key = self._get_cache_key("get_by_id", item_id)
+        cache_key = self._get_cache_key("get_by_id", item_id, projection)
 
         if use_cache:
             cached_result = self._get_from_cache(cache_key)
@@ -159,33 +490,48 @@ class BaseMongoDAO(Generic[T]):
             if cached_result is not None:
                 return cached_result
 
-        result = self._collection.find_one_sync({"_id": item_id})
+        result = self._collection.find_one_sync({"_id": item_id}, projection, trusted)
 
-        self._set_cache(cache_key, result)
+        if use_cache:
+            self._set_cache(
+                cache_key, result, self._get_cache_scope({"_id": item_id}, result)
+            )
         return result
 
     async def get(
-        self, use_cache: Optional[bool] = False, **filters: Any
+        self,
+        use_cache: Optional[bool] = None,
+        cache_config: Optional[CacheConfig] = None,
+        projection: Optional[Projection[T]] = None,
+        trusted: Optional[bool] = None,
+        **filters: Any,
     ) -> Optional[T]:
-        """retrieve a document that matches the filters"""
-        cache_key = self._get_cache_key("get", **filters)
-
-        if use_cache:
-            cached_result = self._get_from_cache(cache_key)
-
-            if cached_result is not None:
-                return cached_result
-
-        result = await self._collection.find_one(filters)
-
-        self._set_cache(cache_key, result)
-        return result
+        """retrieve a document that matches the filters
+
+        `use_cache=False` also skips the reads of the current `IdentityMap`.
+        """
+        cache_key = self._get_cache_key("get", projection, **filters)
+
+        return await self._read_identity_map(
+            cache_key,
+            use_cache,
+            read=lambda: self._read_through(
+                cache_key,
+                self._get_cache_config(use_cache, cache_config),
+                fetch=lambda: self._collection.find_one(filters, projection, trusted),
+                get_scope=lambda result: self._get_cache_scope(filters, result),
+            ),
+        )
 
     def get_sync(
-        self, use_cache: Optional[bool] = False, **filters: Any
+        self,
+        use_cache: Optional[bool] = False,
+        projection: Optional[Projection[T]] = None,
+        trusted: Optional[bool] = None,
+        **filters: Any,
     ) -> Optional[T]:
         """retrieve a document that matches the filters"""
-        cache_key = self._get_cache_key("get", **filters)
+        cache_key = self._get_cache_key("get", projection, **filters)
 
         if use_cache:
             cached_result = self._get_from_cache(cache_key)
@@ -193,15 +539,16 @@ class BaseMongoDAO(Generic[T]):
             if cached_result is not None:
                 return cached_result
 
-        result = self._collection.find_one_sync(filters)
+        result = self._collection.find_one_sync(filters, projection, trusted)
 
-        self._set_cache(cache_key, result)
+        if use_cache:
+            self._set_cache(cache_key, result, self._get_cache_scope(filters, result))
         return result
 
     async def create(self, data: T) -> T:
         """create a new document in the collection"""
         result = await self._collection.insert_one(data)
-        self._caching.cache.clear()
+        await self._invalidate_cache(self._get_cache_scope({}, result))
         return result
 
     async def update_by_id(self, item_id: ObjectId, data: T) -> Optional[T]:
@@ -210,15 +557,103 @@ class BaseMongoDAO(Generic[T]):
         updated = await self._collection.update_one({"_id": item_id}, data)
         if updated:
             updated.id = item_id
-            self._caching.cache.clear()
+            await self._invalidate_cache(
+                self._get_cache_scope({"_id": item_id}, data)
+            )
+        return updated
+
+    async def update_fields(self, item_id: ObjectId, fields: dict[str, Any]) -> bool:
+        """update only the given fields of a document, nested fields with dots
+
+        Only the given paths are sent in the `$set`, concurrent updates of
+        other fields of the same document are kept.
+
+        ```python
+        await periodo_contable_dao.update_fields(
+            periodo_id, {"balance_general": balance_general}
+        )
+        ```
+        """
+        if not fields:
+            return False
+
+        updated = await self._collection.update_fields({"_id": item_id}, fields)
+        if updated:
+            await self._invalidate_cache(
+                self._get_fields_scope({"_id": item_id}, fields)
+            )
         return updated
 
+    async def update_diff(self, item_id: ObjectId, original: T, updated: T) -> bool:
+        """update only the fields that changed between two versions of a document
+
+        Without changes nothing is sent to Mongo and it returns False.
+        """
+        fields = get_changed_fields(original, updated, exclude={"id"})
+        if not fields:
+            return False
+
+        result = await self._collection.update_fields({"_id": item_id}, fields)
+        if result:
+            # the scope may have changed, both are invalidated
+            await self._invalidate_cache(
+                self._get_cache_scope({"_id": item_id}, original),
+                self._get_cache_scope({"_id": item_id}, updated),
+            )
+        return result
+
+    async def update_fields_if(
+        self,
+        item_id: ObjectId,
+        fields: dict[str, Any],
+        condition: dict[str, Any],
+        projection: Optional[Projection[T]] = None,
+    ) -> ConditionalWriteResult[T]:
+        """update some fields of a document only if it matches `condition`
+
+        The check and the write are a single `find_one_and_update`, there is
+        no window between them for a concurrent write. Only when it is not
+        applied a second query tells a missing document from a failed
+        condition.
+
+        ```python
+        result = await periodo_contable_dao.update_fields_if(
+            periodo_id,
+            {"balance_general": balance_general},
+            condition={"balance_general": None},  # create if absent
+            projection=Projection(PeriodoContable, include={"id"}),
+        )
+        if result.precondition_failed:
+            ...
+        ```
+        """
+        if projection is not None and self.cache_scope is not None:
+            projection = projection.with_fields(self.cache_scope)
+
+        document = await self._collection.find_one_and_update_fields(
+            {**condition, "_id": item_id}, fields, projection
+        )
+
+        if document is not None:
+            await self._invalidate_cache(
+                self._get_cache_scope({"_id": item_id}, document)
+            )
+            return ConditionalWriteResult(
+                status=ConditionalWriteStatus.UPDATED, document=document
+            )
+
+        if await self._collection.count({"_id": item_id}, limit=1):
+            return ConditionalWriteResult(
+                status=ConditionalWriteStatus.PRECONDITION_FAILED
+            )
+        return ConditionalWriteResult(status=ConditionalWriteStatus.NOT_FOUND)
+
     async def update(self, data: T, **filters: Any) -> Optional[T]:
         """update a document in the collection"""
         del data.id
         updated = await self._collection.update_one(filters, data)
         if updated:
-            self._caching.cache.clear()
+            await self._invalidate_cache(self._get_cache_scope(filters, data))
             return data
         return None
 
@@ -227,7 +662,190 @@ class BaseMongoDAO(Generic[T]):
         result = await self._collection.update(filters, data)
 
         if result:
-            self._caching.cache.clear()
+            await self._invalidate_cache(self._get_fields_scope(filters, data))
+        return result
+
+    async def aggregate(self, pipeline: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """run an aggregation pipeline on the collection, the results are not validated"""
+        return await self._collection.aggregate(pipeline)
+
+    async def create_many(
+        self,
+        items: list[T],
+        *,
+        batch_size: int = DEFAULT_BULK_BATCH_SIZE,
+        ordered: bool = False,
+        write_concern: Optional[WriteConcern] = None,
+    ) -> BulkWriteResult:
+        """create many documents, sending `batch_size` inserts per round trip
+
+        The batches are unordered by default: a failed insert (e.g. a
+        duplicated key) does not stop the others. The result has one item per
+        input, the inserted items get their `id`.
+        """
+        operations: list[BulkOperation] = []
+        ids: list[Optional[ObjectId]] = []
+        for item in items:
+            document = self._collection.to_document(item)
+            document["_id"] = ObjectId()
+            operations.append(InsertOne(document))
+            ids.append(document["_id"])
+
+        result = await self._bulk_write(
+            operations,
+            [BulkItemStatus.INSERTED] * len(operations),
+            ids,
+            batch_size=batch_size,
+            ordered=ordered,
+            write_concern=write_concern,
+        )
+
+        for item, item_result in zip(items, result.items):
+            if item_result.status == BulkItemStatus.INSERTED:
+                item.id = item_result.id
+
+        return result
+
+    async def upsert_many(
+        self,
+        items: list[T],
+        *,
+        key_fields: Optional[list[str]] = None,
+        batch_size: int = DEFAULT_BULK_BATCH_SIZE,
+        ordered: bool = False,
+        write_concern: Optional[WriteConcern] = None,
+    ) -> BulkWriteResult:
+        """update or insert many documents, sending `batch_size` operations per round trip
+
+        Each item is matched by its `id`, or by `key_fields` when given (e.g.
+        `["id_empresa", "anio"]`). Matched documents get the item fields with
+        `$set`, the rest are inserted and reported as `upserted` with their id.
+        """
+        operations: list[BulkOperation] = []
+        for item in items:
+            document = self._collection.to_document(item)
+
+            if key_fields is None:
+                if item.id is None:
+                    raise ValueError(
+                        "upsert_many needs the id of every item, or the key_fields to match them."
+                    )
+                key_filter = {"_id": item.id}
+            else:
+                key_filter = {}
+                for field_name in key_fields:
+                    alias = self._get_field_alias(field_name)
+                    key_filter[alias] = item.id if alias == "_id" else document[alias]
+
+            operations.append(UpdateOne(key_filter, {"$set": document}, upsert=True))
+
+        result = await self._bulk_write(
+            operations,
+            [BulkItemStatus.APPLIED] * len(operations),
+            [None] * len(operations),
+            batch_size=batch_size,
+            ordered=ordered,
+            write_concern=write_concern,
+        )
+
+        for item, item_result in zip(items, result.items):
+            if item_result.status == BulkItemStatus.UPSERTED:
+                item.id = item_result.id
+
+        return result
+
+    async def bulk_apply(
+        self,
+        operations: list[BulkOperation],
+        *,
+        batch_size: int = DEFAULT_BULK_BATCH_SIZE,
+        ordered: bool = False,
+        write_concern: Optional[WriteConcern] = None,
+    ) -> BulkWriteResult:
+        """run pymongo write operations, sending `batch_size` operations per round trip
+
+        The operations are sent as they are (no model validation), use
+        `create_many`/`upsert_many` to write models.
+        """
+        statuses = [
+            (
+                BulkItemStatus.INSERTED
+                if isinstance(operation, InsertOne)
+                else BulkItemStatus.APPLIED
+            )
+            for operation in operations
+        ]
+
+        return await self._bulk_write(
+            operations,
+            statuses,
+            [None] * len(operations),
+            batch_size=batch_size,
+            ordered=ordered,
+            write_concern=write_concern,
+        )
+
+    async def _bulk_write(
+        self,
+        operations: list[BulkOperation],
+        statuses: list[BulkItemStatus],
+        ids: list[Optional[Any]],
+        *,
+        batch_size: int,
+        ordered: bool,
+        write_concern: Optional[WriteConcern],
+    ) -> BulkWriteResult:
+        if batch_size < 1:
+            raise ValueError("batch_size must be greater than 0.")
+
+        result = BulkWriteResult()
+        stopped = False
+
+        try:
+            for offset in range(0, len(operations), batch_size):
+                batch = slice(offset, offset + batch_size)
+
+                if stopped:
+                    # an ordered write stops at the first failure
+                    not_executed = len(operations[batch])
+                    result.add_batch(
+                        offset,
+                        [BulkItemStatus.NOT_EXECUTED] * not_executed,
+                        [None] * not_executed,
+                    )
+                    continue
+
+                try:
+                    batch_result = await self._collection.bulk_write(
+                        operations[batch],
+                        ordered=ordered,
+                        write_concern=write_concern,
+                    )
+                except BulkWriteError as e:
+                    result.add_batch(
+                        offset,
+                        statuses[batch],
+                        ids[batch],
+                        details=e.details,
+                        ordered=ordered,
+                    )
+                    stopped = ordered
+                else:
+                    result.add_batch(
+                        offset,
+                        statuses[batch],
+                        ids[batch],
+                        result=batch_result,
+                    )
+        except Exception:
+            # a failed round trip may have written part of its batch
+            await self._invalidate_cache()
+            raise
+
+        # one invalidation for the whole write
+        if result.written:
+            await self._invalidate_cache()
+
         return result
 
     async def delete(self, **filters: Any) -> bool:
@@ -235,7 +853,7 @@ class BaseMongoDAO(Generic[T]):
         result = await self._collection.delete_many(filters)
 
         if result:
-            self._caching.cache.clear()
+            await self._invalidate_cache(self._get_cache_scope(filters))
         return result
 
     async def delete_by_id(self, item_id: ObjectId) -> bool:
@@ -243,9 +861,70 @@ class BaseMongoDAO(Generic[T]):
         result = await self._collection.delete_one({"_id": item_id})
 
         if result:
-            self._caching.cache.clear()
+            await self._invalidate_cache(self._get_cache_scope({"_id": item_id}))
         return result
 
+    def _get_sort(self, pagination_filters: PaginationFilters) -> list[tuple[str, int]]:
+        direction = (
+            DESCENDING
+            if pagination_filters.order_direction == OrderDirection.DESC
+            else ASCENDING
+        )
+
+        order_by = "_id"
+        if pagination_filters.order_by:
+            order_by = self._get_field_alias(pagination_filters.order_by)
+
+        sort = [(order_by, direction)]
+        if order_by != "_id":
+            # _id as tie breaker keeps pages stable when order_by has duplicates
+            sort.append(("_id", direction))
+
+        return sort
+
+    def _get_page_filters(
+        self, pagination_filters: PaginationFilters, filters: dict[str, Any]
+    ) -> dict[str, Any]:
+        if pagination_filters.cursor is None:
+            return filters
+
+        cursor_filter = pagination_filters.cursor.to_filter()
+        if not filters:
+            return cursor_filter
+        return {"$and": [filters, cursor_filter]}
+
+    def _get_cursor_value(self, value: Any) -> Any:
+        if isinstance(value, Enum):
+            return value.value
+        if isinstance(value, BaseModel):
+            return value.model_dump()
+        return value
+
+    def _get_field_alias(self, field_name: str) -> str:
+        for model_class in self._collect_model_classes(self._get_model_class()):
+            field = model_class.model_fields.get(field_name)
+            if field is not None:
+                return field.alias or field_name
+        return field_name
+
+    async def _count(
+        self, pagination_filters: PaginationFilters, filters: dict[str, Any]
+    ) -> tuple[int, bool]:
+        """count the documents for the pagination metadata, returns the total and if it is an estimate"""
+        if pagination_filters.count_mode == CountMode.EXACT:
+            return await self._collection.count(filters), False
+
+        if not filters:
+            return await self._collection.estimated_count(), True
+
+        if not pagination_filters.limit:
+            return await self._collection.count(filters), False
+
+        # counting one item past the current page is enough to know if there is a next page
+        count_limit = pagination_filters.skip + pagination_filters.limit + 1
+        total_items = await self._collection.count(filters, limit=count_limit)
+        return total_items, total_items == count_limit
+
     def _get_collection_name(self, model_class: Type[T] | Tuple[Type[T], ...]) -> str:
         model_candidates = self._collect_model_classes(model_class)
 
@@ -296,45 +975,271 @@ class BaseMongoDAO(Generic[T]):
                 candidates.append(model_class)
         return candidates
 
-    def _get_codec_options(self):
-        # Add custom encoders for user defined classes
-        encoders = []
+    def _get_codec_options(self) -> CodecOptions:
+        # built once per set of user defined enums, shared by every DAO
+        return get_codec_options(tuple(get_user_defined_enums(["models"])))
 
-        encoders.extend(self._get_enum_encoders())
+    def _get_cache_key(self, method: str, *args: Any, **kwargs: Any) -> str:
+        dao_class = type(self)
+        return get_cache_key(
+            f"{dao_class.__module__}.{dao_class.__qualname__}", method, *args, **kwargs
+        )
 
-        type_registry = TypeRegistry(encoders)
-        codec_options = CodecOptions(type_registry=type_registry)
-        return codec_options
+    def _get_from_cache(self, key: str) -> Optional[Any]:
+        cached = self._caching.get(key)
+        if isinstance(cached, CachedValue) and cached.is_fresh():
+            return cached.value
+        return None
 
-    def _get_enum_encoders(self):
-        encoders = []
+    def _set_cache(
+        self,
+        key: str,
+        value: Any,
+        scope: Optional[Any] = None,
+        cache_config: CacheConfig = _NO_CACHE,
+    ) -> None:
+        # kept for the grace window after its ttl, only returned as stale inside it
+        self._caching.set(
+            key,
+            CachedValue(value, time.time() + cache_config.ttl),
+            ttl=cache_config.ttl + cache_config.stale_ttl,
+            tags=self._get_cache_tags(scope),
+        )
 
-        user_defined_enums = get_user_defined_enums(["models"])
+    async def _get_from_cache_async(self, key: str) -> Optional[Any]:
+        cached = await self._caching.get_async(key)
+        if isinstance(cached, CachedValue) and cached.is_fresh():
+            return cached.value
+        return None
 
-        for subclass in user_defined_enums:
+    async def _set_cache_async(
+        self,
+        key: str,
+        value: Any,
+        scope: Optional[Any] = None,
+        cache_config: CacheConfig = _NO_CACHE,
+        generations: Optional[dict] = None,
+    ) -> None:
+        # not stored when a write of any process invalidated the collection since `generations`
+        await self._caching.set_async(
+            key,
+            CachedValue(value, time.time() + cache_config.ttl),
+            ttl=cache_config.ttl + cache_config.stale_ttl,
+            tags=self._get_cache_tags(scope),
+            generations=generations,
+        )
+
+    async def _get_cache_generations(self) -> dict:
+        """snapshot of the invalidations of the collection, taken before a read
 
-            class EnumEncoder(TypeEncoder):
-                bson_type = str
-                python_type = subclass  # type: ignore
+        Every write invalidates one of these two tags, see `_invalidate_cache`.
+        """
+        return await self._caching.get_generations_async(
+            self._collection_name, f"{self._collection_name}:*"
+        )
 
-                def transform_python(self, value):
-                    return value.value
+    def _get_cache_config(
+        self, use_cache: Optional[bool], cache_config: Optional[CacheConfig]
+    ) -> CacheConfig:
+        if cache_config is not None:
+            return cache_config
+        return _USE_CACHE if use_cache else _NO_CACHE
 
-                def transform_bson(self, value: str):
-                    return value
+    async def _read_identity_map(
+        self,
+        cache_key: str,
+        use_cache: Optional[bool],
+        read: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """return the result of a read already done in the current request, see `IdentityMap`
+
+        A caller that passes `use_cache=False` asks for a fresh read, the map
+        is neither read nor filled.
+        """
+        identity_map = get_identity_map()
+        if identity_map is None or use_cache is False:
+            return await read()
+
+        result = identity_map.get(self._collection_name, cache_key)
+        if result is not MISSING:
+            return result
+
+        generations = await self._get_cache_generations()
+        result = await read()
+        # a write of any process during the read may have changed the document
+        if generations == await self._get_cache_generations():
+            identity_map.set(self._collection_name, cache_key, result)
+        return result
 
-            encoders.append(EnumEncoder())
+    async def _read_through(
+        self,
+        cache_key: str,
+        cache_config: CacheConfig,
+        fetch: Callable[[], Awaitable[Any]],
+        get_scope: Callable[[Any], Optional[Any]],
+    ) -> Any:
+        """read from the cache, or fetch and cache the result
+
+        With `stale_ttl` a value past its `ttl` is returned while a single
+        background task refreshes it. With `single_flight` concurrent misses
+        of the key wait for one fetch.
+        """
+        if not cache_config.use_cache:
+            # nothing reads the entry of an uncached read, it is not stored
+            return await fetch()
+
+        cached = await self._caching.get_async(cache_key)
+        if isinstance(cached, CachedValue):
+            if cached.is_fresh():
+                return cached.value
+
+            if cache_config.stale_ttl:
+                # still inside the grace window, it would have expired otherwise
+                self._fetch_once(cache_key, cache_config, fetch, get_scope)
+                return cached.value
+
+        if not cache_config.single_flight:
+            return await self._fetch_and_cache(cache_key, cache_config, fetch, get_scope)
+
+        return await asyncio.shield(
+            self._fetch_once(cache_key, cache_config, fetch, get_scope)
+        )
 
-        return encoders
+    def _fetch_once(
+        self,
+        cache_key: str,
+        cache_config: CacheConfig,
+        fetch: Callable[[], Awaitable[Any]],
+        get_scope: Callable[[Any], Optional[Any]],
+    ) -> asyncio.Future:
+        """the fetch in flight for the key, started when there is none"""
+        in_flight = self._in_flight.get(cache_key)
+        if in_flight is not None and not in_flight.done():
+            return in_flight
+
+        in_flight = asyncio.ensure_future(
+            self._fetch_and_cache(cache_key, cache_config, fetch, get_scope)
+        )
+        self._in_flight[cache_key] = in_flight
 
-    def _get_cache_key(self, method: str, *args: Any, **kwargs: Any) -> str:
-        return f"{__class__}.{method}.{args}.{kwargs}"
+        def done(future: asyncio.Future) -> None:
+            if self._in_flight.get(cache_key) is future:
+                del self._in_flight[cache_key]
+            # a failed background refresh has nobody waiting for it
+            if not future.cancelled():
+                future.exception()
 
-    def _get_from_cache(self, key: str) -> Optional[Any]:
-        return self._caching.get(key)
+        in_flight.add_done_callback(done)
+        return in_flight
 
-    def _set_cache(self, key: str, value: Any) -> None:
-        self._caching.set(key, value)
+    async def _fetch_and_cache(
+        self,
+        cache_key: str,
+        cache_config: CacheConfig,
+        fetch: Callable[[], Awaitable[Any]],
+        get_scope: Callable[[Any], Optional[Any]],
+    ) -> Any:
+        generations = await self._get_cache_generations()
+        result = await fetch()
+
+        await self._set_cache_async(
+            cache_key, result, get_scope(result), cache_config, generations
+        )
+        return result
+
+    def cache_statistics(self) -> CacheStatistics:
+        return self._caching.statistics()
+
+    def _get_cache_tags(self, scope: Optional[Any]) -> tuple[str, ...]:
+        """tags of a cached read, `scope` is None for reads that span several scopes"""
+        if scope is None:
+            return (self._collection_name, f"{self._collection_name}:*")
+        return (self._collection_name, f"{self._collection_name}:{scope}")
+
+    async def _invalidate_cache(self, *scopes: Optional[Any]) -> None:
+        """invalidate the reads of the scopes of a write
+
+        Without scopes, or when one is unknown (None), every read of the
+        collection is invalidated.
+        """
+        self._in_flight.clear()
+
+        identity_map = get_identity_map()
+        if identity_map is not None:
+            identity_map.invalidate(self._collection_name)
+
+        if not scopes or any(scope is None for scope in scopes):
+            await self._caching.invalidate_tags_async(self._collection_name)
+            return
+
+        await self._caching.invalidate_tags_async(
+            f"{self._collection_name}:*",
+            *(f"{self._collection_name}:{scope}" for scope in scopes),
+        )
+
+    def _get_cache_scope(
+        self, filters: dict[str, Any], item: Optional[Any] = None
+    ) -> Optional[Any]:
+        """value of `cache_scope` in the filters, or in the document when it is not filtered"""
+        if self.cache_scope is None:
+            return None
+
+        alias = self._get_field_alias(self.cache_scope)
+        for key in (self.cache_scope, alias):
+            value = filters.get(key)
+            # only a plain value selects a single scope (not `{"$in": [...]}`)
+            if value is not None and not isinstance(value, dict):
+                return value
+
+        if isinstance(item, dict):
+            return item.get(alias, item.get(self.cache_scope))
+        if item is not None:
+            return getattr(item, self.cache_scope, None)
+        return None
+
+    def _get_fields_scope(
+        self, filters: dict[str, Any], fields: dict[str, Any]
+    ) -> Optional[Any]:
+        """scope of an update of some fields, unknown when the update moves the documents to another scope"""
+        if self.cache_scope is None:
+            return None
+        alias = self._get_field_alias(self.cache_scope)
+        if self.cache_scope in fields or alias in fields:
+            return None
+        return self._get_cache_scope(filters)
+
+
+@functools.cache
+def get_codec_options(enum_classes: Tuple[Type[Enum], ...]) -> CodecOptions:
+    """Codec options with an encoder for each enum class (stored by value)"""
+    encoders = [_get_enum_encoder(enum_class) for enum_class in enum_classes]
+
+    type_registry = TypeRegistry(encoders)
+    return CodecOptions(type_registry=type_registry)
+
+
+def _get_enum_encoder(enum_class: Type[Enum]) -> TypeEncoder:
+    class EnumEncoder(TypeEncoder):
+        bson_type = str
+        python_type = enum_class  # type: ignore
+
+        def transform_python(self, value):
+            return value.value
+
+        def transform_bson(self, value: str):
+            return value
+
+    return EnumEncoder()
+
+
+@functools.cache
+def get_typed_collection_class(model_class: Type[T]) -> Type[MongoCollection[T]]:
+    """`MongoCollection` subclass of a model, created once per model class"""
+
+    class TypedCollection(MongoCollection[model_class]):
+        pass
+
+    return TypedCollection
 
 
 def get_user_defined_enums(app_modules: list[str]):
@@ -342,3 +1247,40 @@ def get_user_defined_enums(app_modules: list[str]):
         lambda enum_class: enum_class.__module__.startswith(tuple(app_modules)),
         Enum.__subclasses__(),
     )
+
+
+def get_changed_fields(
+    original: BaseModel,
+    updated: BaseModel,
+    exclude: Optional[set[str]] = None,
+    prefix: str = "",
+) -> dict[str, Any]:
+    """
+    Field paths whose value differs between two instances of a model.
+
+    Nested models of the same class are compared field by field, any other
+    value (lists, dicts, a nested model that was None) is replaced whole.
+    """
+    changed_fields: dict[str, Any] = {}
+
+    for field_name in type(updated).model_fields:
+        if exclude and field_name in exclude:
+            continue
+
+        original_value = getattr(original, field_name, None)
+        updated_value = getattr(updated, field_name, None)
+        if original_value == updated_value:
+            continue
+
+        path = f"{prefix}{field_name}"
+        if (
+            isinstance(original_value, BaseModel)
+            and type(original_value) is type(updated_value)
+        ):
+            changed_fields.update(
+                get_changed_fields(original_value, updated_value, prefix=f"{path}.")
+            )
+        else:
+            changed_fields[path] = updated_value
+
+    return changed_fields
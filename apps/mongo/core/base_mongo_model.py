@@ -4,6 +4,7 @@ from typing import Annotated, Callable, Optional, Self, Type, TypeVar
 import inflect
 from pydantic import BaseModel, Field
 
+from apps.mongo.core.mongo_index import MongoIndex
 from apps.tools.objectid import ObjectId
 
 
@@ -14,6 +15,7 @@ class BaseMongoModel(BaseModel):
 
     __collection_name__: Optional[str] = None
     __schema_version__: Optional[int] = None
+    __indexes__: list[MongoIndex] = []
 
     id: Annotated[
         Optional[ObjectId],
@@ -40,10 +42,13 @@ class BaseMongoModel(BaseModel):
 
 T = TypeVar("T", bound=BaseMongoModel)
 
+registered_models: list[Type[BaseMongoModel]] = []
+
 
 def mongo_model(
     collection_name: Optional[str] = None,
     schema_version: int = 1,
+    indexes: Optional[list[MongoIndex]] = None,
 ) -> Callable[[Type[T]], Type[T]]:
     """
     Decorator function for MongoDB models.
@@ -54,9 +59,12 @@ def mongo_model(
 
     This decorator is also necessary when using `MongoMigrationManager` to manage schema migrations.
 
+    The `indexes` are created at startup by `MongoIndexManager` when they are missing in the collection.
+
     Args:
         collection_name (Optional[str]): The name of the MongoDB collection.
         schema_version (int, optional): The version of the schema. Defaults to 1.
+        indexes (Optional[list[MongoIndex]]): Indexes the collection must have.
 
     Usage:
 
@@ -86,8 +94,11 @@ def mongo_model(
 
         model_class.__collection_name__ = collection
         model_class.__schema_version__ = schema_version
+        model_class.__indexes__ = indexes or []
         model_class.__name__ = model_class.__name__
 
+        registered_models.append(model_class)
+
         return model_class
 
     return _mongo_model
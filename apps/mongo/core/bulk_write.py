@@ -0,0 +1,143 @@
+from enum import Enum
+from typing import Any, Optional
+
+from pydantic import BaseModel
+from pymongo import DeleteMany, DeleteOne, InsertOne, ReplaceOne, UpdateMany, UpdateOne
+from pymongo.results import BulkWriteResult as PyMongoBulkWriteResult
+
+from apps.tools.objectid import ObjectId
+
+DEFAULT_BULK_BATCH_SIZE = 1000
+
+BulkOperation = InsertOne | DeleteOne | UpdateOne | DeleteMany | ReplaceOne | UpdateMany
+
+
+class BulkItemStatus(Enum):
+    INSERTED = "inserted"
+    UPSERTED = "upserted"
+    APPLIED = "applied"
+    FAILED = "failed"
+    NOT_EXECUTED = "not_executed"
+
+
+class BulkItemResult(BaseModel):
+    """
+    Result of one operation of a bulk write, in the same position as the input.
+
+    Attributes:
+        index (int): Position of the item in the input.
+        status (BulkItemStatus): `inserted`/`upserted` for new documents,
+            `applied` for updates, replaces and deletes (Mongo only reports
+            their totals), `failed` when the server rejected the operation
+            and `not_executed` for the operations after a failure of an
+            ordered write.
+        id (Optional[ObjectId]): Id of the inserted or upserted document.
+        error_code (Optional[int]): Mongo error code of a failed operation.
+        error (Optional[str]): Mongo error message of a failed operation.
+    """
+
+    index: int
+    status: BulkItemStatus
+    id: Optional[ObjectId] = None
+    error_code: Optional[int] = None
+    error: Optional[str] = None
+
+
+class BulkWriteResult(BaseModel):
+    """
+    Result of `BaseMongoDAO.create_many`, `upsert_many` and `bulk_apply`.
+
+    The totals are the sum of every batch sent to Mongo. With an
+    unacknowledged write concern (`w=0`) Mongo does not report anything:
+    `acknowledged` is False and the items keep their expected status.
+    """
+
+    items: list[BulkItemResult] = []
+    acknowledged: bool = True
+    inserted_count: int = 0
+    matched_count: int = 0
+    modified_count: int = 0
+    upserted_count: int = 0
+    deleted_count: int = 0
+
+    @property
+    def failed(self) -> list[BulkItemResult]:
+        return [
+            item
+            for item in self.items
+            if item.status in (BulkItemStatus.FAILED, BulkItemStatus.NOT_EXECUTED)
+        ]
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed
+
+    @property
+    def written(self) -> bool:
+        return not self.acknowledged or bool(
+            self.inserted_count
+            or self.modified_count
+            or self.upserted_count
+            or self.deleted_count
+        )
+
+    def add_batch(
+        self,
+        offset: int,
+        statuses: list[BulkItemStatus],
+        ids: list[Optional[Any]],
+        result: Optional[PyMongoBulkWriteResult] = None,
+        details: Optional[dict[str, Any]] = None,
+        ordered: bool = False,
+    ) -> None:
+        """
+        Add the results of a batch that starts at `offset` of the input.
+
+        Args:
+            statuses: The status of each operation of the batch when it succeeds.
+            ids: The `_id` of the documents inserted by the batch (None for other operations).
+            result: The result of `bulk_write` when the whole batch succeeded.
+            details: `BulkWriteError.details` when some operations failed.
+            ordered: If the batch was ordered, the operations after the first
+                failure were not executed.
+        """
+        if result is not None and not result.acknowledged:
+            self.acknowledged = False
+            totals = {}
+        elif result is not None:
+            # same keys as the details of a BulkWriteError
+            totals = result.bulk_api_result
+        else:
+            totals = details or {}
+
+        self.inserted_count += totals.get("nInserted", 0)
+        self.matched_count += totals.get("nMatched", 0)
+        self.modified_count += totals.get("nModified", 0)
+        self.upserted_count += totals.get("nUpserted", 0)
+        self.deleted_count += totals.get("nRemoved", 0)
+
+        upserted_ids = {
+            upserted["index"]: upserted["_id"] for upserted in totals.get("upserted", [])
+        }
+        write_errors = {
+            write_error["index"]: write_error
+            for write_error in totals.get("writeErrors", [])
+        }
+        first_error = min(write_errors) if write_errors else None
+
+        for index, status in enumerate(statuses):
+            item = BulkItemResult(index=offset + index, status=status, id=ids[index])
+
+            if index in write_errors:
+                item.status = BulkItemStatus.FAILED
+                item.id = None
+                item.error_code = write_errors[index].get("code")
+                item.error = write_errors[index].get("errmsg")
+            elif ordered and first_error is not None and index > first_error:
+                item.status = BulkItemStatus.NOT_EXECUTED
+                item.id = None
+            elif index in upserted_ids:
+                item.status = BulkItemStatus.UPSERTED
+                item.id = upserted_ids[index]
+
+            self.items.append(item)
@@ -0,0 +1,119 @@
+import hashlib
+import struct
+from datetime import date, datetime
+from enum import Enum
+from typing import Any
+
+import bson
+from pydantic import BaseModel
+
+from apps.mongo.core.projection import Projection
+from apps.tools.objectid import ObjectId
+
+# operators whose list is a set, `{"$in": [a, b]}` and `{"$in": [b, a]}` select the same documents
+_SET_OPERATORS = frozenset({"$in", "$nin", "$all"})
+
+_OBJECT_ID_TYPES = (bson.ObjectId, ObjectId)
+
+
+def get_cache_key(namespace: str, method: str, *args: Any, **kwargs: Any) -> str:
+    """
+    Canonical cache key of a DAO read.
+
+    The arguments are encoded with a type tag and dicts sorted by key, so
+    `{"a": 1, "b": 2}` and `{"b": 2, "a": 1}` give the same key while `1`,
+    `1.0`, `"1"` and `True` give different ones. The encoding is hashed
+    with blake2b while it is written, big `$in` filters are never turned
+    into a string.
+
+    ```python
+    get_cache_key("apps.mongo.daos.empresa_dao.EmpresaDAO", "get_by_id", item_id, projection)
+    # "apps.mongo.daos.empresa_dao.EmpresaDAO.get_by_id:3f1c..."
+    ```
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    _encode(hasher, args)
+    _encode(hasher, kwargs)
+    return f"{namespace}.{method}:{hasher.hexdigest()}"
+
+
+def _encode(hasher: Any, value: Any) -> None:
+    if value is None:
+        hasher.update(b"N")
+    elif isinstance(value, bool):
+        hasher.update(b"T" if value else b"F")
+    elif isinstance(value, Enum):
+        _write(hasher, b"E", f"{type(value).__module__}.{type(value).__qualname__}")
+        _encode(hasher, value.value)
+    elif isinstance(value, int):
+        _write(hasher, b"I", str(value))
+    elif isinstance(value, float):
+        hasher.update(b"D" + struct.pack(">d", value))
+    elif isinstance(value, str):
+        _write(hasher, b"S", value)
+    elif isinstance(value, bytes):
+        _write(hasher, b"B", value)
+    elif isinstance(value, bson.ObjectId):
+        hasher.update(b"O" + value.binary)
+    elif isinstance(value, datetime):
+        # `Date` and `datetime` with the same value are the same key
+        _write(hasher, b"t", value.isoformat())
+    elif isinstance(value, date):
+        _write(hasher, b"d", value.isoformat())
+    elif isinstance(value, dict):
+        _encode_dict(hasher, value)
+    elif isinstance(value, (list, tuple)):
+        hasher.update(b"L" + struct.pack(">Q", len(value)))
+        for item in value:
+            _encode(hasher, item)
+    elif isinstance(value, (set, frozenset)):
+        _encode_unordered(hasher, value)
+    elif isinstance(value, Projection):
+        _write(hasher, b"P", _get_class_name(value.model_class))
+        _encode(hasher, value.to_mongo())
+    elif isinstance(value, BaseModel):
+        _write(hasher, b"M", _get_class_name(type(value)))
+        _encode_dict(
+            hasher,
+            {field_name: getattr(value, field_name) for field_name in type(value).model_fields},
+        )
+    else:
+        _write(hasher, b"R", f"{_get_class_name(type(value))}:{value!r}")
+
+
+def _encode_dict(hasher: Any, value: dict) -> None:
+    items = sorted(value.items(), key=lambda item: str(item[0]))
+    hasher.update(b"{" + struct.pack(">Q", len(items)))
+    for key, item in items:
+        _encode(hasher, key)
+        if key in _SET_OPERATORS and isinstance(item, (list, tuple)):
+            _encode_unordered(hasher, item)
+        else:
+            _encode(hasher, item)
+
+
+def _encode_unordered(hasher: Any, values: Any) -> None:
+    if values and all(type(item) in _OBJECT_ID_TYPES for item in values):
+        # the usual `{"_id": {"$in": [...]}}`, the ids are sorted as they are
+        binaries = sorted(item.binary for item in values)
+        hasher.update(b"V" + struct.pack(">Q", len(binaries)) + b"".join(binaries))
+        return
+
+    digests = []
+    for item in values:
+        item_hasher = hashlib.blake2b(digest_size=16)
+        _encode(item_hasher, item)
+        digests.append(item_hasher.digest())
+
+    hasher.update(b"U" + struct.pack(">Q", len(digests)))
+    for digest in sorted(digests):
+        hasher.update(digest)
+
+
+def _write(hasher: Any, tag: bytes, value: str | bytes) -> None:
+    data = value.encode("utf-8") if isinstance(value, str) else value
+    hasher.update(tag + struct.pack(">Q", len(data)) + data)
+
+
+def _get_class_name(cls: type) -> str:
+    return f"{cls.__module__}.{cls.__qualname__}"
@@ -0,0 +1,43 @@
+from enum import Enum
+from typing import Generic, Optional, TypeVar
+
+from pydantic import BaseModel
+
+from apps.mongo.core.base_mongo_model import BaseMongoModel
+
+T = TypeVar("T", bound=BaseMongoModel)
+
+
+class ConditionalWriteStatus(Enum):
+    UPDATED = "updated"
+    NOT_FOUND = "not_found"
+    PRECONDITION_FAILED = "precondition_failed"
+
+
+class ConditionalWriteResult(BaseModel, Generic[T]):
+    """
+    Result of `BaseMongoDAO.update_fields_if`.
+
+    Attributes:
+        status (ConditionalWriteStatus): `updated` when the write was applied,
+            `not_found` when there is no document with the id and
+            `precondition_failed` when the document exists but the condition
+            did not match, nothing is written in both cases.
+        document (Optional[T]): The document after the update (with the
+            projection of the call), None when it was not updated.
+    """
+
+    status: ConditionalWriteStatus
+    document: Optional[T] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status == ConditionalWriteStatus.UPDATED
+
+    @property
+    def not_found(self) -> bool:
+        return self.status == ConditionalWriteStatus.NOT_FOUND
+
+    @property
+    def precondition_failed(self) -> bool:
+        return self.status == ConditionalWriteStatus.PRECONDITION_FAILED
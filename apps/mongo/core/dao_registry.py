@@ -0,0 +1,52 @@
+from threading import Lock
+from typing import Optional, Type, TypeVar
+
+from apps.mongo.core.base_mongo_dao import BaseMongoDAO
+from apps.mongo.core.mongo_connection import MongoConnection
+from apps.tools.cache import CacheStatistics
+
+D = TypeVar("D", bound=BaseMongoDAO)
+
+_daos: dict[tuple[Type[BaseMongoDAO], MongoConnection], BaseMongoDAO] = {}
+_lock = Lock()
+
+
+def get_dao(dao_class: Type[D], connection: Optional[MongoConnection] = None) -> D:
+    """
+    Shared instance of a DAO, built once per process and connection.
+
+    Building a DAO creates its collections, codec options and cache, use this
+    instead of `EmpresaDAO()` in routers, managers and middlewares so every
+    request reuses the same instance (and its cache).
+
+    ```python
+    empresa_dao = get_dao(EmpresaDAO)
+    ```
+    """
+    if connection is None:
+        connection = MongoConnection()
+
+    key = (dao_class, connection)
+    dao = _daos.get(key)
+    if dao is None:
+        with _lock:
+            dao = _daos.get(key)
+            if dao is None:
+                dao = dao_class(connection=connection)
+                _daos[key] = dao
+
+    return dao  # type: ignore[return-value]
+
+
+def get_cache_statistics() -> dict[str, CacheStatistics]:
+    """Counters of the cache of each shared DAO, by DAO class name"""
+    with _lock:
+        daos = list(_daos.values())
+
+    return {type(dao).__name__: dao.cache_statistics() for dao in daos}
+
+
+def clear_daos() -> None:
+    """Forget the shared instances, e.g. after replacing the connection"""
+    with _lock:
+        _daos.clear()
@@ -0,0 +1,70 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, Optional
+
+# returned by `IdentityMap.get` for a read that was not done, None is a result
+MISSING = object()
+
+
+class IdentityMap:
+    """
+    Documents read during one unit of work, usually one HTTP request.
+
+    `BaseMongoDAO.get_by_id` and `BaseMongoDAO.get` look here before the
+    cache and the database. Only identical reads are collapsed: the same DAO
+    method with the same arguments and projection returns the instance read
+    first. A `get_by_id` with a projection and another without it are two
+    reads, and a read with `use_cache=False` skips the map. A write through
+    a DAO forgets the reads of its collection.
+
+    The endpoints of this API read each document once per request (the
+    company checked by `ValidateCompanyMiddleware` is shared with the report
+    through `CompanyStatusCache`), so `IdentityMapMiddleware` is not installed
+    in the app. Add it, or open an `identity_map_scope`, for a unit of work
+    that repeats a read.
+    """
+
+    def __init__(self) -> None:
+        self._documents: dict[str, dict[str, Any]] = {}
+
+    def get(self, collection_name: str, key: str) -> Any:
+        """the result of a read, `MISSING` when it was not read"""
+        return self._documents.get(collection_name, {}).get(key, MISSING)
+
+    def set(self, collection_name: str, key: str, value: Any) -> None:
+        self._documents.setdefault(collection_name, {})[key] = value
+
+    def invalidate(self, collection_name: str) -> None:
+        self._documents.pop(collection_name, None)
+
+    def clear(self) -> None:
+        self._documents.clear()
+
+
+_identity_map: ContextVar[Optional[IdentityMap]] = ContextVar(
+    "identity_map", default=None
+)
+
+
+def get_identity_map() -> Optional[IdentityMap]:
+    """The identity map of the current unit of work, None outside of one"""
+    return _identity_map.get()
+
+
+@contextmanager
+def identity_map_scope() -> Iterator[IdentityMap]:
+    """
+    Start a unit of work with an empty identity map.
+
+    ```python
+    with identity_map_scope():
+        await empresa_dao.get_by_id(id_empresa)  # queries Mongo
+        await empresa_dao.get_by_id(id_empresa)  # same instance, no query
+    ```
+    """
+    identity_map = IdentityMap()
+    token = _identity_map.set(identity_map)
+    try:
+        yield identity_map
+    finally:
+        _identity_map.reset(token)
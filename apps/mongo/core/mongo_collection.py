@@ -1,7 +1,9 @@
 import enum
 import typing
+from functools import cache
 from types import UnionType
 from typing import (
+    Annotated,
     Any,
     AsyncGenerator,
     Generic,
@@ -10,17 +12,35 @@ from typing import (
     Tuple,
     Type,
     TypeVar,
+    Union,
     get_args,
     get_origin,
 )
 from uuid import UUID
 
-from pydantic import BaseModel
-from pymongo import DeleteMany, DeleteOne, InsertOne, ReplaceOne, UpdateMany, UpdateOne
+from pydantic import BaseModel, Discriminator, Field, Tag, TypeAdapter, ValidationError
+from pymongo import (
+    DeleteMany,
+    DeleteOne,
+    InsertOne,
+    ReplaceOne,
+    ReturnDocument,
+    UpdateMany,
+    UpdateOne,
+    WriteConcern,
+)
+from pymongo.asynchronous.collection import AsyncCollection
 from pymongo.collection import Collection
+from pymongo.results import BulkWriteResult
 from typing_extensions import get_original_bases
 
 from apps.mongo.core.base_mongo_model import BaseMongoModel
+from apps.mongo.core.projection import Projection
+from apps.mongo.core.raw_bson import RawDocument, get_raw_document_encoder
+from apps.mongo.core.trusted_constructor import (
+    TrustedConstructorError,
+    get_trusted_constructor,
+)
 
 T = TypeVar("T", bound=BaseMongoModel)
 
@@ -44,6 +64,23 @@ class MongoCollection(Generic[T]):
 
     usuarios_collection = MongoCollection(collection, Usuario)
 
+    usuario = usuarios_collection.find_one_sync({"email": "user@example.com"})
+
+    ```
+
+    The `async` methods need an `AsyncCollection` (PyMongo's asyncio client),
+    the `*_sync` methods use the blocking `Collection`:
+
+    ```python
+    from pymongo import AsyncMongoClient
+
+    async_client = AsyncMongoClient("mongodb://localhost:27017/")
+    async_collection = async_client["test"]["usuarios"]
+
+    usuarios_collection = MongoCollection(
+        collection, Usuario, async_collection=async_collection
+    )
+
     usuario = await usuarios_collection.find_one({"email": "user@example.com"})
 
     ```
@@ -57,63 +94,116 @@ class MongoCollection(Generic[T]):
     class UsuariosCollection(MongoCollection[Usuario]):
         pass # No implementation needed
 
-    usuarios_collection = UsuariosCollection(collection) # when subclassing, the model class is inferred
+    usuarios_collection = UsuariosCollection(collection, async_collection=async_collection) # when subclassing, the model class is inferred
 
     usuario = await usuarios_collection.find_one({"email": "user@example.com"})
 
+    ```
+
+    With `trusted_reads=True` the documents whose `schema_version` matches the
+    model are built with a fast constructor instead of being fully validated
+    (they were validated when written). Documents with another version, or
+    that do not fit the constructor, are still validated. The read methods
+    accept `trusted` to override it per call. Writes are always validated.
     """
 
     _collection: Collection
+    _async_collection: Optional[AsyncCollection]
     _model_class: Type[T] | Tuple[Type[T], ...]
+    _trusted_reads: bool
 
-    def __init__(self, collection, model_class: Optional[Type[T]] = None):
+    def __init__(
+        self,
+        collection,
+        model_class: Optional[Type[T]] = None,
+        async_collection: Optional[AsyncCollection] = None,
+        trusted_reads: bool = False,
+    ):
         self._collection = collection
+        self._async_collection = async_collection
+        self._trusted_reads = trusted_reads
 
         if model_class is not None:
             self._model_class = model_class
         else:
             self._model_class = self._get_model_class()
 
+        # built once per collection instead of once per document
+        self._model_candidates = tuple(
+            self._collect_model_classes_mongo(self._model_class)
+        )
+        self._model_adapters = get_model_adapters(self._model_candidates)
+
     def _get_model_class(self) -> Type[T]:
         bases = get_original_bases(self.__class__)
         args = get_args(bases[0])
         return args[0]
 
+    @property
+    def async_collection(self) -> AsyncCollection:
+        if self._async_collection is None:
+            raise AsyncCollectionNotConfiguredException(
+                "This MongoCollection was created without an async collection, use the *_sync methods instead"
+            )
+        return self._async_collection
+
     def find_many_sync(
         self,
         filters: Optional[dict] = None,
         page: Optional[int] = None,
         page_size: Optional[int] = None,
+        projection: Optional[Projection] = None,
+        trusted: Optional[bool] = None,
     ) -> List[T]:
         if filters is None:
             filters = {}
 
-        result = self._collection.find(filters)
+        result = self._collection.find(filters, self._get_projection(projection))
 
         if page is not None and page_size is not None:
             result = result.skip(page * page_size).limit(page_size)
 
-        items: List[T] = [self._parse_model_validator(item) for item in result]
+        items: List[T] = self._parse_many_model_validator(
+            list(result), projection, self._is_trusted(trusted)
+        )
         return items
 
-    async def find_one(self, filters: dict[str, Any]) -> Optional[T]:
+    async def find_one(
+        self,
+        filters: dict[str, Any],
+        projection: Optional[Projection] = None,
+        trusted: Optional[bool] = None,
+    ) -> Optional[T]:
         """Find one document in the collection
 
         Args:
             `filter: dict`  Filter to find the document
+            `projection: Projection`  Fields to read, the document is returned as the partial model
+            `trusted: bool`  Override `trusted_reads` for this call
 
         Returns:
             `Optional[T]` The document found or None
         """
-        result = self._collection.find_one(filters)
+        result = await self.async_collection.find_one(
+            filters, self._get_projection(projection)
+        )
         if result:
-            return self._parse_model_validator(result)
+            return self._parse_model_validator(
+                result, projection, self._is_trusted(trusted)
+            )
         return None
 
-    def find_one_sync(self, filters: dict[str, Any]) -> Optional[T]:
-        result = self._collection.find_one(filters)
+    def find_one_sync(
+        self,
+        filters: dict[str, Any],
+        projection: Optional[Projection] = None,
+        trusted: Optional[bool] = None,
+    ) -> Optional[T]:
+        result = self._collection.find_one(filters, self._get_projection(projection))
         if result:
-            return self._parse_model_validator(result)
+            return self._parse_model_validator(
+                result, projection, self._is_trusted(trusted)
+            )
         return None
 
     async def find_many(
@@ -121,30 +211,93 @@ class MongoCollection(Generic[T]):
         filters: Optional[dict] = None,
         page: Optional[int] = None,
         page_size: Optional[int] = None,
+        projection: Optional[Projection] = None,
+        sort: Optional[List[Tuple[str, int]]] = None,
+        skip: int = 0,
+        limit: int = 0,
+        trusted: Optional[bool] = None,
     ) -> List[T]:
         """Find many documents in the collection
 
         Args:
             `filter: dict`  Filter to find the documents
+            `projection: Projection`  Fields to read, the documents are returned as the partial model
+            `sort: list[tuple[str, int]]`  Sort specification, e.g. `[("anio", DESCENDING)]`
+            `skip: int`  Documents to skip, applied by Mongo
+            `limit: int`  Max documents to return, 0 means no limit
+            `trusted: bool`  Override `trusted_reads` for this call
 
         Returns:
             `List[T]` The documents found
         """
         if filters is None:
             filters = {}
-        result = self._collection.find(filters)
+        result = self.async_collection.find(filters, self._get_projection(projection))
+
+        if sort:
+            result = result.sort(sort)
 
         if page is not None and page_size is not None:
             result = result.skip(page * page_size).limit(page_size)
+        else:
+            result = result.skip(skip).limit(limit)
 
-        items: List[T] = [self._parse_model_validator(item) for item in result]
+        items: List[T] = self._parse_many_model_validator(
+            await result.to_list(), projection, self._is_trusted(trusted)
+        )
         return items
 
+    async def find_one_raw(
+        self,
+        filters: dict[str, Any],
+        projection: Optional[Projection] = None,
+    ) -> Optional[RawDocument]:
+        """Find one document without building the model
+
+        The document is returned shaped like the JSON of the model (see
+        `RawDocumentEncoder`), ready to be dumped with `dumps_raw`.
+        """
+        result = await self.async_collection.find_one(
+            filters, self._get_projection(projection)
+        )
+        if result:
+            return self._encode_raw(result, projection)
+        return None
+
+    async def find_many_raw(
+        self,
+        filters: Optional[dict] = None,
+        projection: Optional[Projection] = None,
+        sort: Optional[List[Tuple[str, int]]] = None,
+        skip: int = 0,
+        limit: int = 0,
+    ) -> List[RawDocument]:
+        """Find many documents without building the models, see `find_one_raw`"""
+        if filters is None:
+            filters = {}
+        result = self.async_collection.find(filters, self._get_projection(projection))
+
+        if sort:
+            result = result.sort(sort)
+
+        result = result.skip(skip).limit(limit)
+
+        return [
+            self._encode_raw(document, projection)
+            for document in await result.to_list()
+        ]
+
     async def find_many_generator(
         self,
         filters: Optional[dict] = None,
         page: Optional[int] = None,
         page_size: Optional[int] = None,
+        projection: Optional[Projection] = None,
+        trusted: Optional[bool] = None,
+        sort: Optional[List[Tuple[str, int]]] = None,
+        skip: int = 0,
+        limit: int = 0,
+        batch_size: Optional[int] = None,
     ) -> AsyncGenerator[T, None]:
         """Find many documents in the collection
 
@@ -152,19 +305,70 @@ class MongoCollection(Generic[T]):
 
         Args:
             `filter: dict`  Filter to find the documents
+            `projection: Projection`  Fields to read, the documents are returned as the partial model
+            `trusted: bool`  Override `trusted_reads` for this call
+            `sort: list[tuple[str, int]]`  Sort specification, e.g. `[("anio", DESCENDING)]`
+            `skip: int`  Documents to skip, applied by Mongo
+            `limit: int`  Max documents to return, 0 means no limit
+            `batch_size: int`  Documents fetched from Mongo per round trip
 
         Returns:
             `AsyncGenerator[T, None]` The documents found
         """
+        trusted = self._is_trusted(trusted)
+
+        async for item in self._iterate(
+            filters, projection, sort, skip, limit, batch_size, page, page_size
+        ):
+            yield self._parse_model_validator(item, projection, trusted)
+
+    async def find_many_raw_generator(
+        self,
+        filters: Optional[dict] = None,
+        projection: Optional[Projection] = None,
+        sort: Optional[List[Tuple[str, int]]] = None,
+        skip: int = 0,
+        limit: int = 0,
+        batch_size: Optional[int] = None,
+    ) -> AsyncGenerator[RawDocument, None]:
+        """`find_many_generator` without building the models, see `find_one_raw`"""
+        async for item in self._iterate(
+            filters, projection, sort, skip, limit, batch_size
+        ):
+            yield self._encode_raw(item, projection)
+
+    async def _iterate(
+        self,
+        filters: Optional[dict],
+        projection: Optional[Projection],
+        sort: Optional[List[Tuple[str, int]]],
+        skip: int,
+        limit: int,
+        batch_size: Optional[int],
+        page: Optional[int] = None,
+        page_size: Optional[int] = None,
+    ) -> AsyncGenerator[dict, None]:
         if filters is None:
             filters = {}
-        result = self._collection.find(filters)
+        result = self.async_collection.find(filters, self._get_projection(projection))
+
+        if sort:
+            result = result.sort(sort)
 
         if page is not None and page_size is not None:
             result = result.skip(page * page_size).limit(page_size)
+        else:
+            result = result.skip(skip).limit(limit)
+
+        if batch_size:
+            result = result.batch_size(batch_size)
 
-        for item in result:
-            yield self._parse_model_validator(item)
+        try:
+            async for item in result:
+                yield item
+        finally:
+            # the consumer may stop early (e.g. a client disconnecting)
+            await result.close()
 
     async def insert_one(self, model: T) -> T:
         """Insert one document in the collection
@@ -175,12 +379,9 @@ class MongoCollection(Generic[T]):
                 Returns:
                     `T` The document inserted
         """
-        self._parse_model_validator(model)
-        model_dump = self._get_model_dump(model)
-        model_dump["schema_version"] = self._get_schema_version(model)
-        model_dump = self._enum_to_value(model_dump)
+        model_dump = self.to_document(model)
 
-        result = self._collection.insert_one(model_dump)
+        result = await self.async_collection.insert_one(model_dump)
         model.id = result.inserted_id
         return model
 
@@ -193,18 +394,9 @@ class MongoCollection(Generic[T]):
         Returns:
             `List[T]` The documents inserted
         """
-        json_models: List[dict] = []
-        for model in models:
-            self._parse_model_validator(model)
-            json_model = self._get_model_dump(model)
-            json_model["schema_version"] = self._get_schema_version(model)
-            json_model = self._enum_to_value(json_model)
-            if isinstance(json_model, dict):
-                json_models.append(json_model)
-            else:
-                raise TypeError("Expected json_model to be a dictionary")
-
-        result = self._collection.insert_many(json_models)
+        json_models: List[dict] = [self.to_document(model) for model in models]
+
+        result = await self.async_collection.insert_many(json_models)
         for i, model in enumerate(models):
             model.id = result.inserted_ids[i]
         return models
@@ -224,12 +416,9 @@ class MongoCollection(Generic[T]):
         Returns:
             `Optional[T]` The document updated or None
         """
-        self._parse_model_validator(model)
-        model_dump = self._get_model_dump(model)
-        model_dump["schema_version"] = self._get_schema_version(model)
-        model_dump = self._enum_to_value(model_dump)
+        model_dump = self.to_document(model)
 
-        result = self._collection.update_one(
+        result = await self.async_collection.update_one(
             filters, {"$set": model_dump}, upsert=upsert
         )
         if result.matched_count == 0:
@@ -238,6 +427,71 @@ class MongoCollection(Generic[T]):
             return model
         return None
 
+    async def update_fields(
+        self,
+        filters: dict,
+        fields: dict[str, Any],
+    ) -> bool:
+        """Update only some fields of one document
+
+        Args:
+            `filter: dict`  Filter to find the document
+            `fields: dict[str, Any]`  Field path to new value, nested fields with dots
+                (e.g. `{"balance_general": balance, "estado_resultado.ventas_netas": 100.0}`).
+                The values are validated against the type of the field.
+
+        Returns:
+            `bool` True if the document was modified
+        """
+        result = await self.async_collection.update_one(
+            filters, {"$set": self.to_fields_update(fields)}
+        )
+
+        if result.matched_count == 0:
+            raise DocumentNotFoundException("No document found to update")
+        return result.modified_count == 1
+
+    async def find_one_and_update_fields(
+        self,
+        filters: dict,
+        fields: dict[str, Any],
+        projection: Optional[Projection] = None,
+        trusted: Optional[bool] = None,
+    ) -> Optional[T]:
+        """Update some fields of the first document that matches, in one round trip
+
+        The filter is the precondition of the write: when no document matches
+        nothing is written.
+
+        Args:
+            `filter: dict`  Filter (and precondition) of the document to update
+            `fields: dict[str, Any]`  Field path to new value, as in `update_fields`
+            `projection: Projection`  Fields to return, the document is returned as the partial model
+
+        Returns:
+            `Optional[T]` The document after the update, or None when no document matched
+        """
+        result = await self.async_collection.find_one_and_update(
+            filters,
+            {"$set": self.to_fields_update(fields)},
+            projection=self._get_projection(projection),
+            return_document=ReturnDocument.AFTER,
+        )
+        if result:
+            return self._parse_model_validator(
+                result, projection, self._is_trusted(trusted)
+            )
+        return None
+
+    def to_fields_update(self, fields: dict[str, Any]) -> dict[str, Any]:
+        """Validate the field paths and their values and dump them as the `$set` of an update"""
+        update_dump: dict[str, Any] = {}
+        for path, value in fields.items():
+            mongo_path, validated_value = self._validate_field_path(path, value)
+            update_dump[mongo_path] = validated_value
+
+        return self._enum_to_value(self._get_model_dump(update_dump))
+
     async def update(
         self,
         filters: Optional[dict] = None,
@@ -261,7 +515,7 @@ class MongoCollection(Generic[T]):
         update_dump = self._get_model_dump(update)
         update_dump = self._enum_to_value(update_dump)
 
-        result = self._collection.update_many(filters, update_dump)
+        result = await self.async_collection.update_many(filters, update_dump)
 
         if result.matched_count == 0:
             raise DocumentNotFoundException("No document found to update")
@@ -270,34 +524,43 @@ class MongoCollection(Generic[T]):
         return False
 
     async def delete_one(self, filters: dict) -> bool:
-        result = self._collection.delete_one(filters)
+        result = await self.async_collection.delete_one(filters)
         if result.deleted_count == 1:
             return True
         return False
 
     async def delete_many(self, filters: dict) -> bool:
-        result = self._collection.delete_many(filters)
+        result = await self.async_collection.delete_many(filters)
         if result.deleted_count > 0:
             return True
         return False
 
     async def purge(self) -> bool:
-        result = self._collection.delete_many({})
+        result = await self.async_collection.delete_many({})
         if result.deleted_count > 0:
             return True
         return False
 
-    async def count(self, filters: dict) -> int:
-        result = self._collection.count_documents(filters)
+    async def count(self, filters: dict, limit: Optional[int] = None) -> int:
+        """Count the documents that match the filters, stopping at `limit` when given"""
+        if limit:
+            result = await self.async_collection.count_documents(filters, limit=limit)
+        else:
+            result = await self.async_collection.count_documents(filters)
+        return result
+
+    async def estimated_count(self) -> int:
+        """Count every document of the collection using its metadata"""
+        result = await self.async_collection.estimated_document_count()
         return result
 
     async def aggregate(self, pipeline: List[dict]) -> List[dict]:
-        result = self._collection.aggregate(pipeline)
-        result_list = list(result)
+        result = await self.async_collection.aggregate(pipeline)
+        result_list = await result.to_list()
         return result_list
 
     async def distinct(self, field: str, filters: dict) -> List[dict]:
-        result = self._collection.distinct(field, filters)
+        result = await self.async_collection.distinct(field, filters)
         return result
 
     async def bulk_write(
@@ -305,10 +568,32 @@ class MongoCollection(Generic[T]):
         operations: List[
             InsertOne | DeleteOne | UpdateOne | DeleteMany | ReplaceOne | UpdateMany
         ],
-    ) -> Any:
-        result = self._collection.bulk_write(operations)
+        ordered: bool = True,
+        write_concern: Optional[WriteConcern] = None,
+    ) -> BulkWriteResult:
+        """Send the operations in one `bulk_write`
+
+        Raises `BulkWriteError` when some operations fail, its `details` have
+        the totals and the `writeErrors` with the index of each failed operation.
+        """
+        collection = self.async_collection
+        if write_concern is not None:
+            collection = collection.with_options(write_concern=write_concern)
+
+        result = await collection.bulk_write(operations, ordered=ordered)
         return result
 
+    def to_document(self, model: T) -> dict[str, Any]:
+        """Validate the model and dump it as the document stored in Mongo (without `_id`)"""
+        self._parse_model_validator(model)
+        model_dump = self._get_model_dump(model)
+        model_dump["schema_version"] = self._get_schema_version(model)
+        model_dump = self._enum_to_value(model_dump)
+
+        if not isinstance(model_dump, dict):
+            raise TypeError("Expected json_model to be a dictionary")
+        return model_dump
+
     def _get_schema_version(self, model: T | dict) -> int:
         schema_version: Optional[int] = None
 
@@ -359,19 +644,119 @@ class MongoCollection(Generic[T]):
 
         return model_dump
 
-    def _parse_model_validator(self, model: dict | T) -> T:
-        model_class_candidates = self._collect_model_classes_mongo(self._model_class)
+    def _get_projection(self, projection: Optional[Projection]) -> Optional[dict]:
+        if projection is None:
+            return None
+        return projection.to_mongo()
+
+    def _encode_raw(
+        self, document: dict, projection: Optional[Projection]
+    ) -> RawDocument:
+        if projection is not None:
+            return get_raw_document_encoder(projection.partial_model).encode(document)
+
+        model_class = self._model_candidates[0]
+        schema_version = document.get("schema_version")
+        for candidate in self._model_candidates:
+            if schema_version == (candidate.__schema_version__ or 1):
+                model_class = candidate
+                break
 
-        try_errors: dict[Type[T], Exception] = {}
+        return get_raw_document_encoder(model_class).encode(document)
 
-        for model_class in model_class_candidates:
+    def _validate_field_path(self, path: str, value: Any) -> Tuple[str, Any]:
+        """Validate the value of a field path, returns the path with the Mongo aliases"""
+        for model_class in self._model_candidates:
             try:
-                parsed_item = model_class.model_validate(model)
-                return parsed_item
-            except Exception as e:
-                try_errors[model_class] = e
+                mongo_path, annotation = get_field_path(model_class, path)
+            except ValueError:
+                continue
+
+            try:
+                return mongo_path, get_type_adapter(annotation).validate_python(value)
+            except ValidationError as e:
+                raise ModelParsingException(
+                    f"Unable to validate field {path}", {model_class: e}
+                ) from e
+
+        raise ValueError(f"Unknown field {path} for {self._model_class}")
 
-        raise ModelParsingException("Unable to validate model", try_errors)
+    def _is_trusted(self, trusted: Optional[bool]) -> bool:
+        if trusted is None:
+            return self._trusted_reads
+        return trusted
+
+    def _parse_model_validator(
+        self,
+        model: dict | T,
+        projection: Optional[Projection] = None,
+        trusted: bool = False,
+    ) -> T:
+        if trusted and isinstance(model, dict):
+            trusted_model = self._construct_trusted(model, projection)
+            if trusted_model is not None:
+                return trusted_model
+
+        adapters = self._get_model_adapters(projection)
+
+        try:
+            return adapters.validate_one(model)
+        except Exception as e:
+            raise ModelParsingException(
+                "Unable to validate model", {adapters.model_class: e}
+            ) from e
+
+    def _parse_many_model_validator(
+        self,
+        models: List[dict],
+        projection: Optional[Projection] = None,
+        trusted: bool = False,
+    ) -> List[T]:
+        """Validate a batch of documents with a single `validate_python` call"""
+        if trusted:
+            return [
+                self._parse_model_validator(model, projection, trusted)
+                for model in models
+            ]
+
+        adapters = self._get_model_adapters(projection)
+
+        try:
+            return adapters.validate_many(models)
+        except Exception as e:
+            raise ModelParsingException(
+                "Unable to validate model", {adapters.model_class: e}
+            ) from e
+
+    def _construct_trusted(
+        self, document: dict, projection: Optional[Projection]
+    ) -> Optional[T]:
+        """Build the model without validating, None when the document must be validated"""
+        if projection is not None:
+            candidates: Tuple[Type[T], ...] = (projection.partial_model,)
+        else:
+            candidates = self._model_candidates
+
+        schema_version = document.get("schema_version")
+        for candidate in candidates:
+            if schema_version != (candidate.__schema_version__ or 1):
+                continue
+
+            constructor = get_trusted_constructor(candidate)
+            if constructor is None:
+                return None
+
+            try:
+                return constructor(document)
+            except (TrustedConstructorError, TypeError, ValueError):
+                return None
+
+        return None
+
+    def _get_model_adapters(self, projection: Optional[Projection]) -> "ModelAdapters":
+        if projection is not None:
+            return get_model_adapters((projection.partial_model,))
+        return self._model_adapters
 
     def _collect_model_classes_mongo(self, model_class: Type[T] | Tuple[Type[T], ...]):
         """Recursively collects candidate model classes from nested Unions and Tuples."""
@@ -401,6 +786,121 @@ class MongoCollection(Generic[T]):
         return data
 
 
+class ModelAdapters:
+    """
+    Pydantic `TypeAdapter`s for the candidate model classes of a collection.
+
+    With a single candidate the class itself is validated. With several
+    candidates that have different `__schema_version__` the union is
+    discriminated by the `schema_version` stored in each document, otherwise
+    (or when the discriminator can not pick a class) the candidates are tried
+    left to right, as `model_validate` over each class did before.
+    """
+
+    def __init__(self, candidates: Tuple[Type[BaseMongoModel], ...]) -> None:
+        if not candidates:
+            raise ValueError("At least one model class is required")
+
+        self.model_class = candidates[0] if len(candidates) == 1 else Union[candidates]
+        self._discriminated: Optional[TypeAdapter] = None
+        self._discriminated_many: Optional[TypeAdapter] = None
+
+        if len(candidates) == 1:
+            item_type: Any = candidates[0]
+        else:
+            item_type = Annotated[
+                Union[tuple(candidates)], Field(union_mode="left_to_right")
+            ]
+
+            schema_versions = [candidate.__schema_version__ for candidate in candidates]
+            if len(set(schema_versions)) == len(candidates):
+                discriminated_type = Annotated[
+                    Union[
+                        tuple(
+                            Annotated[candidate, Tag(str(candidate.__schema_version__))]
+                            for candidate in candidates
+                        )
+                    ],
+                    Discriminator(_get_schema_version_tag),
+                ]
+                self._discriminated = TypeAdapter(discriminated_type)
+                self._discriminated_many = TypeAdapter(list[discriminated_type])
+
+        self._adapter = TypeAdapter(item_type)
+        self._many_adapter = TypeAdapter(list[item_type])
+
+    def validate_one(self, model: Any) -> Any:
+        if self._discriminated is not None:
+            try:
+                return self._discriminated.validate_python(model)
+            except ValidationError:
+                pass
+        return self._adapter.validate_python(model)
+
+    def validate_many(self, models: List[Any]) -> List[Any]:
+        if self._discriminated_many is not None:
+            try:
+                return self._discriminated_many.validate_python(models)
+            except ValidationError:
+                pass
+        return self._many_adapter.validate_python(models)
+
+
+@cache
+def get_model_adapters(
+    candidates: Tuple[Type[BaseMongoModel], ...],
+) -> ModelAdapters:
+    return ModelAdapters(candidates)
+
+
+@cache
+def get_type_adapter(annotation: Any) -> TypeAdapter:
+    return TypeAdapter(annotation)
+
+
+def get_field_path(model_class: Type[BaseModel], path: str) -> Tuple[str, Any]:
+    """
+    Resolve a dotted field path of a model.
+
+    Returns the path with the aliases used in Mongo and the annotation of the
+    last field. Raises ValueError when a field does not exist.
+    """
+    mongo_path: list[str] = []
+    annotation: Any = model_class
+
+    for field_name in path.split("."):
+        current_model = _get_model_type(annotation)
+        if current_model is None or field_name not in current_model.model_fields:
+            raise ValueError(f"Unknown field {path} for {model_class.__name__}")
+
+        field = current_model.model_fields[field_name]
+        mongo_path.append(field.alias or field_name)
+        annotation = field.annotation
+
+    return ".".join(mongo_path), annotation
+
+
+def _get_model_type(annotation: Any) -> Optional[Type[BaseModel]]:
+    """The model of an annotation, unwrapping `Optional[Model]`"""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+
+    if get_origin(annotation) in (Union, UnionType):
+        models = [arg for arg in get_args(annotation) if arg is not type(None)]
+        if len(models) == 1:
+            return _get_model_type(models[0])
+
+    return None
+
+
+def _get_schema_version_tag(value: Any) -> Optional[str]:
+    if isinstance(value, dict):
+        return str(value.get("schema_version") or 1)
+    if isinstance(value, BaseMongoModel):
+        return str(value.__class__.__schema_version__ or 1)
+    return None
+
+
 class ModelParsingException(Exception, Generic[T]):
     errors: dict[Type[T], Exception]
 
@@ -414,3 +914,7 @@ class ModelParsingException(Exception, Generic[T]):
 
 class DocumentNotFoundException(Exception):
     pass
+
+
+class AsyncCollectionNotConfiguredException(Exception):
+    pass
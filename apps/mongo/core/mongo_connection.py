@@ -1,15 +1,72 @@
-from typing import Optional, Self
+import asyncio
+from typing import Any, Optional, Self
 
-from pymongo import MongoClient
+from pymongo import AsyncMongoClient, MongoClient
+from pymongo.asynchronous.database import AsyncDatabase
 from pymongo.database import Database
 
+from apps.mongo.core.mongo_pool_stats import MongoPoolStatistics, MongoPoolStatsListener
 from apps.tools.env import env
 
+# seconds between two checks of the pool while `warm_up` waits for it
+_WARM_UP_POLL_INTERVAL = 0.05
+
+
+def get_pool_options() -> dict[str, Any]:
+    """
+    Build the pool options of the Mongo clients from the environment.
+
+    - MONGO_MAX_POOL_SIZE: maximum connections per server (default 100).
+    - MONGO_MIN_POOL_SIZE: connections kept open even when idle (default 0).
+    - MONGO_MAX_IDLE_TIME_MS: close connections idle for longer than this.
+    - MONGO_WAIT_QUEUE_TIMEOUT_MS: max wait for a free connection before failing.
+    - MONGO_COMPRESSORS: comma separated wire compressors, e.g. "zstd,snappy,zlib".
+    - MONGO_SERVER_SELECTION_TIMEOUT_MS: server selection timeout (default 5000).
+    """
+    options: dict[str, Any] = {
+        "maxPoolSize": int(env.get("MONGO_MAX_POOL_SIZE") or 100),
+        "minPoolSize": int(env.get("MONGO_MIN_POOL_SIZE") or 0),
+        "serverSelectionTimeoutMS": int(
+            env.get("MONGO_SERVER_SELECTION_TIMEOUT_MS") or 5000
+        ),
+    }
+
+    max_idle_time_ms = env.get("MONGO_MAX_IDLE_TIME_MS")
+    if max_idle_time_ms:
+        options["maxIdleTimeMS"] = int(max_idle_time_ms)
+
+    wait_queue_timeout_ms = env.get("MONGO_WAIT_QUEUE_TIMEOUT_MS")
+    if wait_queue_timeout_ms:
+        options["waitQueueTimeoutMS"] = int(wait_queue_timeout_ms)
+
+    compressors = env.get("MONGO_COMPRESSORS")
+    if compressors:
+        options["compressors"] = compressors
+
+    return options
+
 
 class MongoConnection:
+    """
+    Holds the Mongo clients used by the application.
+
+    `client`/`db` are the blocking pymongo objects, kept for scripts and the
+    `*_sync` methods. `async_client`/`async_db` are backed by PyMongo's native
+    asyncio client and are the ones used by every `async def` in the DAOs, so
+    network round trips never block the event loop.
+
+    Pool settings are read from the environment (see `get_pool_options`), the
+    FastAPI `lifespan` calls `warm_up` before accepting traffic and `close` on
+    shutdown.
+    """
+
     __instance: Optional[Self] = None
     client: MongoClient
     db: Database
+    async_client: AsyncMongoClient
+    async_db: AsyncDatabase
+    pool_stats: MongoPoolStatsListener
+    async_pool_stats: MongoPoolStatsListener
 
     def __new__(cls) -> Self:
         if not cls.__instance:
@@ -21,14 +78,13 @@ class MongoConnection:
             DB_PORT = int(env.get("DB_PORT") or 27017)
 
             cls.__instance = object.__new__(cls)
-            cls.__instance.client = MongoClient(
+            cls.__instance._init_clients(
+                database=DB_NAME,
                 host=DB_HOST,
                 port=DB_PORT,
                 # username=DB_USER,
                 # password=DB_PWD,
-                serverSelectionTimeoutMS=5000,
             )
-            cls.__instance.db = cls.__instance.client.get_database(DB_NAME)
         return cls.__instance
 
     @classmethod
@@ -42,18 +98,77 @@ class MongoConnection:
         password: str = "",
     ) -> Self:
         new_instance = object.__new__(cls)
-        new_instance.client = MongoClient(
+        new_instance._init_clients(
+            database=database,
             host=host,
             port=port,
             username=username,
             password=password,
-            serverSelectionTimeoutMS=5000,
         )
-        new_instance.db = new_instance.client.get_database(database)
         return new_instance
 
+    def _init_clients(self, database: str, **client_kwargs: Any) -> None:
+        pool_options = get_pool_options()
+
+        self.pool_stats = MongoPoolStatsListener(
+            max_pool_size=pool_options["maxPoolSize"],
+            min_pool_size=pool_options["minPoolSize"],
+        )
+        self.async_pool_stats = MongoPoolStatsListener(
+            max_pool_size=pool_options["maxPoolSize"],
+            min_pool_size=pool_options["minPoolSize"],
+        )
+
+        self.client = MongoClient(
+            **client_kwargs,
+            **pool_options,
+            event_listeners=[self.pool_stats],
+        )
+        self.db = self.client.get_database(database)
+        self.async_client = AsyncMongoClient(
+            **client_kwargs,
+            **pool_options,
+            event_listeners=[self.async_pool_stats],
+        )
+        self.async_db = self.async_client.get_database(database)
+
+    async def warm_up(self, timeout: float = 10.0) -> None:
+        """
+        Ping the server and wait until the async pool opened `minPoolSize` connections.
+
+        The driver opens the `minPoolSize` connections in the background (a
+        few at a time, see `maxConnecting`), waiting for them here avoids
+        paying the TCP/TLS handshake on the first requests. Gives up after
+        `timeout` seconds, the pool keeps filling while serving traffic.
+        """
+        await self.async_client.admin.command("ping")
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while loop.time() < deadline:
+            statistics = self.async_pool_stats.snapshot()
+            if statistics.open_connections >= statistics.min_pool_size:
+                return
+            await asyncio.sleep(_WARM_UP_POLL_INTERVAL)
+
+    def get_pool_statistics(self) -> dict[str, MongoPoolStatistics]:
+        return {
+            "async": self.async_pool_stats.snapshot(),
+            "sync": self.pool_stats.snapshot(),
+        }
+
+    async def close(self) -> None:
+        await self.async_client.close()
+        self.client.close()
+
     def __enter__(self) -> Self:
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
         self.client.close()
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
@@ -0,0 +1,80 @@
+from typing import Any, Optional
+
+from pymongo import ASCENDING, IndexModel
+
+
+class MongoIndex:
+    """
+    Declarative definition of a Mongo index, used by `mongo_model(indexes=[...])`.
+
+    Args:
+        keys (str | list[tuple[str, int | str]]): Field name for a single ascending
+            index, or a list of (field, direction) for compound indexes.
+        name (Optional[str]): Index name, defaults to the Mongo generated name
+            (e.g. `id_empresa_1_anio_1`).
+        unique (bool): Reject documents with repeated keys.
+        partial_filter (Optional[dict]): Only index documents matching this filter.
+        expire_after_seconds (Optional[int]): TTL index, documents are removed
+            this many seconds after the date stored in the (single) key.
+
+    Usage:
+
+    ```python
+    @mongo_model(
+        collection_name="periodo_contable",
+        indexes=[MongoIndex([("id_empresa", ASCENDING), ("anio", ASCENDING)], unique=True)],
+    )
+    class PeriodoContable(BaseMongoModel): ...
+    ```
+    """
+
+    keys: list[tuple[str, int | str]]
+    name: str
+    unique: bool
+    partial_filter: Optional[dict[str, Any]]
+    expire_after_seconds: Optional[int]
+
+    def __init__(
+        self,
+        keys: str | list[tuple[str, int | str]],
+        *,
+        name: Optional[str] = None,
+        unique: bool = False,
+        partial_filter: Optional[dict[str, Any]] = None,
+        expire_after_seconds: Optional[int] = None,
+    ) -> None:
+        if isinstance(keys, str):
+            keys = [(keys, ASCENDING)]
+
+        if expire_after_seconds is not None and len(keys) != 1:
+            raise ValueError("TTL indexes must have a single key.")
+
+        self.keys = keys
+        self.name = name or "_".join(f"{field}_{direction}" for field, direction in keys)
+        self.unique = unique
+        self.partial_filter = partial_filter
+        self.expire_after_seconds = expire_after_seconds
+
+    def to_index_model(self) -> IndexModel:
+        options: dict[str, Any] = {"name": self.name}
+
+        if self.unique:
+            options["unique"] = True
+        if self.partial_filter is not None:
+            options["partialFilterExpression"] = self.partial_filter
+        if self.expire_after_seconds is not None:
+            options["expireAfterSeconds"] = self.expire_after_seconds
+
+        return IndexModel(self.keys, **options)
+
+    def matches(self, index_info: dict[str, Any]) -> bool:
+        """Check if an entry of `list_indexes()` is this same index"""
+        return (
+            list(index_info["key"].items()) == self.keys
+            and bool(index_info.get("unique", False)) == self.unique
+            and index_info.get("partialFilterExpression") == self.partial_filter
+            and index_info.get("expireAfterSeconds") == self.expire_after_seconds
+        )
+
+    def __repr__(self) -> str:
+        return f"MongoIndex({self.name})"
@@ -0,0 +1,85 @@
+from typing import Optional, Type
+
+from pymongo.errors import PyMongoError
+
+from apps.mongo.core.base_mongo_model import BaseMongoModel, registered_models
+from apps.mongo.core.mongo_connection import MongoConnection
+from apps.mongo.core.mongo_index import MongoIndex
+
+
+class MongoIndexManager:
+    """
+    Reconciles the indexes declared with `mongo_model(indexes=[...])` with the database.
+
+    For every model it reads `list_indexes()` of the collection and creates the
+    declared indexes that are missing. Existing indexes are never dropped or
+    modified: an index with the same name but different keys/options is only
+    reported, so it can be fixed by hand.
+
+    Usage:
+
+    ```python
+    index_manager = MongoIndexManager()
+    created = await index_manager.sync_indexes()
+    ```
+    """
+
+    def __init__(self, connection: Optional[MongoConnection] = None) -> None:
+        self._connection = connection or MongoConnection()
+
+    async def sync_indexes(
+        self,
+        models: Optional[list[Type[BaseMongoModel]]] = None,
+    ) -> list[str]:
+        """Create the missing indexes, returns the names of the indexes created"""
+        if models is None:
+            models = registered_models
+
+        created: list[str] = []
+
+        for model_class in models:
+            if not model_class.__indexes__ or not model_class.__collection_name__:
+                continue
+
+            try:
+                created.extend(
+                    await self._sync_collection_indexes(
+                        model_class.__collection_name__, model_class.__indexes__
+                    )
+                )
+            except PyMongoError as e:
+                print(
+                    f"No se pudieron crear los índices de {model_class.__collection_name__}: {e}"
+                )
+
+        return created
+
+    async def _sync_collection_indexes(
+        self, collection_name: str, indexes: list[MongoIndex]
+    ) -> list[str]:
+        collection = self._connection.async_db.get_collection(collection_name)
+
+        cursor = await collection.list_indexes()
+        existing_indexes = {index["name"]: index for index in await cursor.to_list()}
+
+        missing_indexes: list[MongoIndex] = []
+        for index in indexes:
+            existing_index = existing_indexes.get(index.name)
+
+            if existing_index is None:
+                missing_indexes.append(index)
+            elif not index.matches(existing_index):
+                print(
+                    f"El índice {index.name} de {collection_name} no coincide con su definición, no se modificará"
+                )
+
+        created: list[str] = []
+        for index in missing_indexes:
+            # one by one, so an index that can not be built (e.g. unique with
+            # repeated data) does not prevent the others
+            try:
+                created.extend(await collection.create_indexes([index.to_index_model()]))
+            except PyMongoError as e:
+                print(f"No se pudo crear el índice {index.name} de {collection_name}: {e}")
+
+        return created
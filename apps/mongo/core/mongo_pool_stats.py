@@ -0,0 +1,107 @@
+from threading import Lock
+
+from pydantic import BaseModel
+from pymongo import monitoring
+
+
+class MongoPoolStatistics(BaseModel):
+    """
+    Snapshot of the connection pool of a Mongo client.
+
+    Attributes:
+        max_pool_size (int): Configured `maxPoolSize` of the client.
+        min_pool_size (int): Configured `minPoolSize` of the client.
+        open_connections (int): Connections currently open (idle + in use).
+        in_use_connections (int): Connections currently checked out by an operation.
+        waiting_checkouts (int): Operations waiting for a free connection.
+        total_checkouts (int): Successful checkouts since the client was created.
+        failed_checkouts (int): Checkouts that failed (timeout, pool closed, ...).
+        pools_cleared (int): Times a pool was cleared because of a network error.
+    """
+
+    max_pool_size: int
+    min_pool_size: int
+    open_connections: int = 0
+    in_use_connections: int = 0
+    waiting_checkouts: int = 0
+    total_checkouts: int = 0
+    failed_checkouts: int = 0
+    pools_cleared: int = 0
+
+
+class MongoPoolStatsListener(monitoring.ConnectionPoolListener):
+    """
+    Connection pool listener that keeps counters about pool usage.
+
+    Register it through the `event_listeners` option of the client, the
+    counters can be read at any time with `snapshot`.
+    """
+
+    def __init__(self, max_pool_size: int, min_pool_size: int) -> None:
+        self._lock = Lock()
+        self._max_pool_size = max_pool_size
+        self._min_pool_size = min_pool_size
+        self._open_connections = 0
+        self._in_use_connections = 0
+        self._waiting_checkouts = 0
+        self._total_checkouts = 0
+        self._failed_checkouts = 0
+        self._pools_cleared = 0
+
+    def snapshot(self) -> MongoPoolStatistics:
+        with self._lock:
+            return MongoPoolStatistics(
+                max_pool_size=self._max_pool_size,
+                min_pool_size=self._min_pool_size,
+                open_connections=self._open_connections,
+                in_use_connections=self._in_use_connections,
+                waiting_checkouts=self._waiting_checkouts,
+                total_checkouts=self._total_checkouts,
+                failed_checkouts=self._failed_checkouts,
+                pools_cleared=self._pools_cleared,
+            )
+
+    def pool_created(self, event: monitoring.PoolCreatedEvent) -> None: ...
+
+    def pool_ready(self, event: monitoring.PoolReadyEvent) -> None: ...
+
+    def pool_cleared(self, event: monitoring.PoolClearedEvent) -> None:
+        with self._lock:
+            self._pools_cleared += 1
+
+    def pool_closed(self, event: monitoring.PoolClosedEvent) -> None: ...
+
+    def connection_created(self, event: monitoring.ConnectionCreatedEvent) -> None:
+        with self._lock:
+            self._open_connections += 1
+
+    def connection_ready(self, event: monitoring.ConnectionReadyEvent) -> None: ...
+
+    def connection_closed(self, event: monitoring.ConnectionClosedEvent) -> None:
+        with self._lock:
+            self._open_connections -= 1
+
+    def connection_check_out_started(
+        self, event: monitoring.ConnectionCheckOutStartedEvent
+    ) -> None:
+        with self._lock:
+            self._waiting_checkouts += 1
+
+    def connection_check_out_failed(
+        self, event: monitoring.ConnectionCheckOutFailedEvent
+    ) -> None:
+        with self._lock:
+            self._waiting_checkouts -= 1
+            self._failed_checkouts += 1
+
+    def connection_checked_out(
+        self, event: monitoring.ConnectionCheckedOutEvent
+    ) -> None:
+        with self._lock:
+            self._waiting_checkouts -= 1
+            self._in_use_connections += 1
+            self._total_checkouts += 1
+
+    def connection_checked_in(self, event: monitoring.ConnectionCheckedInEvent) -> None:
+        with self._lock:
+            self._in_use_connections -= 1
@@ -0,0 +1,131 @@
+from functools import cache
+from typing import Any, Generic, Iterable, Optional, Type, TypeVar
+
+from pydantic import create_model
+
+from apps.mongo.core.base_mongo_model import BaseMongoModel
+
+T = TypeVar("T", bound=BaseMongoModel)
+
+
+class Projection(Generic[T]):
+    """
+    Selects the fields read from Mongo and the partial model used to validate them.
+
+    Only one of `include` or `exclude` can be given. `id` is always read.
+
+    The documents are validated with `partial_model`, a subclass of the model
+    where every field left out of the projection becomes `Optional[...] = None`.
+    The results are still instances of the model class (properties and methods
+    keep working), but only the projected fields are sent over the wire and
+    validated.
+
+    Example:
+
+    ```python
+    projection = Projection(PeriodoContable, exclude={"estado_resultado", "balance_general"})
+
+    periodos = await periodo_contable_dao.get_all(projection=projection, id_empresa=id_empresa)
+    ```
+    """
+
+    model_class: Type[T]
+    fields: frozenset[str]
+
+    def __init__(
+        self,
+        model_class: Type[T],
+        include: Optional[Iterable[str]] = None,
+        exclude: Optional[Iterable[str]] = None,
+    ) -> None:
+        if include is not None and exclude is not None:
+            raise ValueError("Projection accepts either include or exclude, not both.")
+
+        self.model_class = model_class
+        self._include = include is not None
+
+        model_fields = set(model_class.model_fields)
+        requested = set(include if include is not None else exclude or [])
+
+        unknown_fields = requested - model_fields
+        if unknown_fields:
+            raise ValueError(
+                f"Unknown fields for {model_class.__name__}: {sorted(unknown_fields)}"
+            )
+
+        if self._include:
+            self.fields = frozenset(requested | {"id"})
+        else:
+            self.fields = frozenset(model_fields - (requested - {"id"}))
+
+    def with_fields(self, *fields: str) -> "Projection[T]":
+        """Copy of the projection that also reads `fields`"""
+        if set(fields) <= self.fields:
+            return self
+        return Projection(self.model_class, include=self.fields | set(fields))
+
+    @property
+    def partial_model(self) -> Type[T]:
+        return get_partial_model(self.model_class, self.fields)
+
+    def to_mongo(self) -> dict[str, int]:
+        """Projection document for `Collection.find`"""
+        if self._include:
+            projection = {self._get_alias(field): 1 for field in sorted(self.fields)}
+            # needed to build the partial model with trusted reads
+            projection["schema_version"] = 1
+            return projection
+
+        excluded = set(self.model_class.model_fields) - self.fields
+        return {self._get_alias(field): 0 for field in sorted(excluded)}
+
+    def _get_alias(self, field_name: str) -> str:
+        field = self.model_class.model_fields[field_name]
+        return field.alias or field_name
+
+    def __repr__(self) -> str:
+        return f"Projection({self.model_class.__name__}, fields={sorted(self.fields)})"
+
+
+@cache
+def get_partial_model(model_class: Type[T], fields: frozenset[str]) -> Type[T]:
+    """
+    Create (once) the subclass of `model_class` used to validate projected documents.
+    """
+    if fields >= set(model_class.model_fields):
+        return model_class
+
+    missing_fields: dict[str, Any] = {
+        field_name: (Optional[field.annotation], None)
+        for field_name, field in model_class.model_fields.items()
+        if field_name not in fields
+    }
+
+    partial_model = create_model(  # type: ignore[call-overload]
+        f"Partial{model_class.__name__}",
+        __base__=model_class,
+        __module__=model_class.__module__,
+        **missing_fields,
+    )
+    partial_model.__collection_name__ = model_class.__collection_name__
+    partial_model.__schema_version__ = model_class.__schema_version__
+    # the class is not importable by name, its instances are pickled (e.g. by
+    # `SQLiteCache`) with the model class and fields it is rebuilt from
+    partial_model.__partial_of__ = (model_class, fields)
+    partial_model.__reduce__ = _reduce_partial_model
+
+    return partial_model
+
+
+def _reduce_partial_model(model: BaseMongoModel) -> tuple:
+    model_class, fields = type(model).__partial_of__  # type: ignore[attr-defined]
+    return (_rebuild_partial_model, (model_class, fields, model.__getstate__()))
+
+
+def _rebuild_partial_model(
+    model_class: Type[T], fields: frozenset[str], state: dict[str, Any]
+) -> T:
+    partial_model = get_partial_model(model_class, fields)
+    model = partial_model.__new__(partial_model)
+    model.__setstate__(state)
+    return model
@@ -0,0 +1,246 @@
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Union
+
+Operand = Union["RatioExpression", int, float]
+
+
+class RatioExpression(ABC):
+    """
+    Arithmetic expression over the fields of a model.
+
+    The same definition is evaluated in Python over a model (the properties
+    of the models use it) and translated to a Mongo aggregation expression
+    (`to_mongo`), so the ratios can be computed inside `$project` without
+    reading the documents.
+
+    ```python
+    RAZON_CORRIENTE = safe_div(
+        field("total_activo_circulante"), field("total_pasivo_circulante")
+    )
+
+    RAZON_CORRIENTE.evaluate(balance_general)  # 1.5
+    RAZON_CORRIENTE.prefixed("balance_general").to_mongo()
+    # {"$cond": [{"$eq": ["$balance_general.total_pasivo_circulante", 0]}, 0.0, {"$divide": [...]}]}
+    ```
+    """
+
+    @abstractmethod
+    def evaluate(self, model: Any) -> Any:
+        """Value of the expression over a model"""
+
+    @abstractmethod
+    def to_mongo(self) -> Any:
+        """Mongo aggregation expression"""
+
+    @abstractmethod
+    def prefixed(self, prefix: str) -> "RatioExpression":
+        """The same expression over the fields of the sub document `prefix`"""
+
+    def __add__(self, other: Operand) -> "RatioExpression":
+        return _Operation("$add", lambda a, b: a + b, self, other)
+
+    def __sub__(self, other: Operand) -> "RatioExpression":
+        return _Operation("$subtract", lambda a, b: a - b, self, other)
+
+    def __mul__(self, other: Operand) -> "RatioExpression":
+        return _Operation("$multiply", lambda a, b: a * b, self, other)
+
+
+class _Field(RatioExpression):
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def evaluate(self, model: Any) -> Any:
+        value = model
+        for name in self.path.split("."):
+            value = getattr(value, name)
+        return value
+
+    def to_mongo(self) -> Any:
+        return f"${self.path}"
+
+    def prefixed(self, prefix: str) -> RatioExpression:
+        return _Field(f"{prefix}.{self.path}")
+
+
+class _Constant(RatioExpression):
+    def __init__(self, value: int | float) -> None:
+        self.value = value
+
+    def evaluate(self, model: Any) -> Any:
+        return self.value
+
+    def to_mongo(self) -> Any:
+        return {"$literal": self.value}
+
+    def prefixed(self, prefix: str) -> RatioExpression:
+        return self
+
+
+class _Operation(RatioExpression):
+    def __init__(
+        self,
+        operator: str,
+        function: Callable[[Any, Any], Any],
+        left: Operand,
+        right: Operand,
+    ) -> None:
+        self.operator = operator
+        self.function = function
+        self.left = _as_expression(left)
+        self.right = _as_expression(right)
+
+    def evaluate(self, model: Any) -> Any:
+        return self.function(self.left.evaluate(model), self.right.evaluate(model))
+
+    def to_mongo(self) -> Any:
+        return {self.operator: [self.left.to_mongo(), self.right.to_mongo()]}
+
+    def prefixed(self, prefix: str) -> RatioExpression:
+        return _Operation(
+            self.operator,
+            self.function,
+            self.left.prefixed(prefix),
+            self.right.prefixed(prefix),
+        )
+
+
+class _SafeDivision(RatioExpression):
+    def __init__(
+        self, numerator: Operand, denominator: Operand, on_zero: float
+    ) -> None:
+        self.numerator = _as_expression(numerator)
+        self.denominator = _as_expression(denominator)
+        self.on_zero = on_zero
+
+    def evaluate(self, model: Any) -> Any:
+        denominator = self.denominator.evaluate(model)
+        if denominator == 0:
+            return self.on_zero
+        return self.numerator.evaluate(model) / denominator
+
+    def to_mongo(self) -> Any:
+        denominator = self.denominator.to_mongo()
+        return {
+            "$cond": [
+                {"$eq": [denominator, 0]},
+                {"$literal": self.on_zero},
+                {"$divide": [self.numerator.to_mongo(), denominator]},
+            ]
+        }
+
+    def prefixed(self, prefix: str) -> RatioExpression:
+        return _SafeDivision(
+            self.numerator.prefixed(prefix),
+            self.denominator.prefixed(prefix),
+            self.on_zero,
+        )
+
+
+class _Expenses(RatioExpression):
+    """abs(min(value, 0)): the negative part of a value, as a positive number"""
+
+    def __init__(self, value: Operand) -> None:
+        self.value = _as_expression(value)
+
+    def evaluate(self, model: Any) -> Any:
+        return abs(min(self.value.evaluate(model), 0))
+
+    def to_mongo(self) -> Any:
+        return {"$abs": {"$min": [self.value.to_mongo(), 0]}}
+
+    def prefixed(self, prefix: str) -> RatioExpression:
+        return _Expenses(self.value.prefixed(prefix))
+
+
+class _Requires(RatioExpression):
+    def __init__(
+        self, expression: Operand, fields: tuple[str, ...], default: float
+    ) -> None:
+        self.expression = _as_expression(expression)
+        self.fields = fields
+        self.default = default
+
+    def evaluate(self, model: Any) -> Any:
+        for field_path in self.fields:
+            if not _Field(field_path).evaluate(model):
+                return self.default
+        return self.expression.evaluate(model)
+
+    def to_mongo(self) -> Any:
+        return {
+            "$cond": [
+                {"$and": [f"${field_path}" for field_path in self.fields]},
+                self.expression.to_mongo(),
+                {"$literal": self.default},
+            ]
+        }
+
+    def prefixed(self, prefix: str) -> RatioExpression:
+        return _Requires(
+            self.expression.prefixed(prefix),
+            tuple(f"{prefix}.{field_path}" for field_path in self.fields),
+            self.default,
+        )
+
+
+def field(path: str) -> RatioExpression:
+    """A field of the model, nested fields with dots (e.g. `balance_general.total_activo`)"""
+    return _Field(path)
+
+
+def safe_div(
+    numerator: Operand, denominator: Operand, on_zero: float = 0.0
+) -> RatioExpression:
+    """numerator / denominator, or `on_zero` when the denominator is 0"""
+    return _SafeDivision(numerator, denominator, on_zero)
+
+
+def expenses(value: Operand) -> RatioExpression:
+    """abs(min(value, 0)), e.g. the financial expenses of a negative result"""
+    return _Expenses(value)
+
+
+def requires(expression: Operand, *fields: str, default: float = 0.0) -> RatioExpression:
+    """`expression`, or `default` when any of the `fields` is missing (None)"""
+    return _Requires(expression, fields, default)
+
+
+class RatioGroup:
+    """
+    Named group of ratios that is only computed when the `requires` fields exist.
+
+    Used to build `PeriodoContable.get_razones_financieras` and the equivalent
+    `$project` stage.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ratios: dict[str, RatioExpression],
+        requires: tuple[str, ...],
+    ) -> None:
+        self.name = name
+        self.ratios = ratios
+        self.requires = requires
+
+    def applies(self, model: Any) -> bool:
+        return all(_Field(field_path).evaluate(model) for field_path in self.requires)
+
+    def evaluate(self, model: Any) -> dict[str, Any]:
+        return {name: ratio.evaluate(model) for name, ratio in self.ratios.items()}
+
+    def to_mongo(self) -> Any:
+        return {
+            "$cond": [
+                {"$and": [f"${field_path}" for field_path in self.requires]},
+                {name: ratio.to_mongo() for name, ratio in self.ratios.items()},
+                "$$REMOVE",
+            ]
+        }
+
+
+def _as_expression(value: Operand) -> RatioExpression:
+    if isinstance(value, RatioExpression):
+        return value
+    return _Constant(value)
@@ -0,0 +1,96 @@
+import json
+from datetime import datetime
+from enum import Enum
+from functools import cache
+from typing import Any, Type
+
+import bson
+from pydantic import BaseModel
+from pydantic_core import PydanticUndefined, to_jsonable_python
+
+RawDocument = dict[str, Any]
+
+
+class RawDocumentEncoder:
+    """
+    Shapes documents read from Mongo like the JSON of their model, without building the model.
+
+    Only the top level is touched: the keys are emitted in the order of the
+    model fields (with their serialization alias, e.g. `_id`), missing fields
+    get their default and keys that are not fields (e.g. `schema_version`)
+    are dropped. Nested values are left as decoded by pymongo, `ObjectId` and
+    dates are converted by `bson_json_default` when dumping.
+
+    Usage:
+
+    ```python
+    encoder = get_raw_document_encoder(Empresa)
+    content = dumps_raw(encoder.encode(document))
+    ```
+    """
+
+    def __init__(self, model_class: Type[BaseModel]) -> None:
+        self._fields: list[tuple[str, str, str, Any]] = []
+
+        for field_name, field in model_class.model_fields.items():
+            if field.default_factory is not None:
+                default: Any = field.default_factory
+            elif field.default is PydanticUndefined:
+                default = PydanticUndefined
+            else:
+                default = to_jsonable_python(field.default)
+
+            self._fields.append(
+                (
+                    field_name,
+                    field.alias or field_name,
+                    field.serialization_alias or field.alias or field_name,
+                    default,
+                )
+            )
+
+    def encode(self, document: dict[str, Any]) -> RawDocument:
+        encoded: RawDocument = {}
+
+        for field_name, key, serialization_key, default in self._fields:
+            if key in document:
+                encoded[serialization_key] = document[key]
+            elif field_name in document:
+                encoded[serialization_key] = document[field_name]
+            elif callable(default):
+                encoded[serialization_key] = to_jsonable_python(default())
+            elif default is not PydanticUndefined:
+                encoded[serialization_key] = default
+
+        return encoded
+
+
+@cache
+def get_raw_document_encoder(model_class: Type[BaseModel]) -> RawDocumentEncoder:
+    return RawDocumentEncoder(model_class)
+
+
+def bson_json_default(value: Any) -> Any:
+    """`default` of `json.dumps` for the values decoded by pymongo"""
+    if isinstance(value, bson.ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        # same format as `Date`, which keeps second precision
+        return value.replace(microsecond=0, tzinfo=None).isoformat() + "Z"
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json", by_alias=True)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps_raw(content: Any) -> bytes:
+    """Dump raw documents with the same options as the API responses"""
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+        default=bson_json_default,
+    ).encode("utf-8")
@@ -0,0 +1,190 @@
+import typing
+from datetime import datetime
+from enum import Enum
+from functools import cache
+from types import NoneType, UnionType
+from typing import Any, Callable, Optional, Type, TypeVar, get_args, get_origin
+
+import bson
+from pydantic import BaseModel
+
+from apps.tools.date import Date
+
+M = TypeVar("M", bound=BaseModel)
+
+Converter = Callable[[Any], Any]
+
+
+class TrustedConstructorError(Exception):
+    """The document does not have the shape expected by the trusted constructor"""
+
+
+@cache
+def get_trusted_constructor(model_class: Type[M]) -> Optional[Callable[[dict], M]]:
+    """
+    Fast constructor for documents read from our own collections.
+
+    The constructor skips pydantic validation: it only converts the values
+    that are stored differently in BSON (nested models, enums, `Date`, ints in
+    float fields) and builds the model with `model_construct`. It is compiled
+    once per model class from its fields.
+
+    Returns None when the model has a field type that can not be converted
+    without validating (e.g. a Union of several types), those models must be
+    validated as usual.
+
+    The constructor raises `TrustedConstructorError` when a required field is
+    missing or a non nullable field is None.
+    """
+    try:
+        return _get_model_converter(model_class)
+    except TrustedConstructorError:
+        return None
+
+
+@cache
+def _get_model_converter(model_class: Type[M]) -> Callable[[dict], M]:
+    fields: list[tuple[str, str, Converter, bool, bool]] = []
+
+    for field_name, field in model_class.model_fields.items():
+        key = field.alias or field_name
+        nullable, converter = _get_converter(field.annotation)
+        fields.append((field_name, key, converter, nullable, field.is_required()))
+
+    def construct(data: Any) -> M:
+        if isinstance(data, model_class):
+            return data
+        if not isinstance(data, dict):
+            raise TrustedConstructorError(
+                f"Expected a dict for {model_class.__name__}, got {type(data).__name__}"
+            )
+
+        values: dict[str, Any] = {}
+        fields_set: set[str] = set()
+
+        for field_name, key, converter, nullable, required in fields:
+            if key in data:
+                value = data[key]
+            elif field_name in data:
+                value = data[field_name]
+            elif required:
+                raise TrustedConstructorError(
+                    f"Missing field {field_name} for {model_class.__name__}"
+                )
+            else:
+                continue
+
+            if value is None:
+                if not nullable:
+                    raise TrustedConstructorError(
+                        f"Field {field_name} of {model_class.__name__} can not be None"
+                    )
+                values[field_name] = None
+            else:
+                values[field_name] = converter(value)
+            fields_set.add(field_name)
+
+        return model_class.model_construct(_fields_set=fields_set, **values)
+
+    return construct
+
+
+def _get_converter(annotation: Any) -> tuple[bool, Converter]:
+    """Returns if the annotation accepts None and the converter of its values"""
+    origin = get_origin(annotation)
+    args = get_args(annotation)
+
+    if origin is typing.Annotated:
+        return _get_converter(args[0])
+
+    if origin is typing.Union or origin is UnionType:
+        not_none = [arg for arg in args if arg is not NoneType]
+        if len(not_none) != 1:
+            raise TrustedConstructorError(f"Unsupported union {annotation}")
+        _, converter = _get_converter(not_none[0])
+        return len(not_none) != len(args), converter
+
+    if origin in (list, typing.List):
+        _, item_converter = _get_converter(args[0] if args else Any)
+        if item_converter is _identity:
+            return False, _identity
+        return False, lambda value: [
+            None if item is None else item_converter(item) for item in value
+        ]
+
+    if origin in (dict, typing.Dict):
+        _, value_converter = _get_converter(args[1] if len(args) == 2 else Any)
+        if value_converter is _identity:
+            return False, _identity
+        return False, lambda value: {
+            key: None if item is None else value_converter(item)
+            for key, item in value.items()
+        }
+
+    if origin is not None:
+        raise TrustedConstructorError(f"Unsupported type {annotation}")
+
+    if annotation is Any:
+        return True, _identity
+
+    if annotation is NoneType:
+        return True, _identity
+
+    if not isinstance(annotation, type):
+        raise TrustedConstructorError(f"Unsupported type {annotation}")
+
+    if issubclass(annotation, Date):
+        return False, _to_date
+
+    if issubclass(annotation, bool):
+        return False, _identity
+
+    if issubclass(annotation, float):
+        return False, _to_float
+
+    if issubclass(annotation, (str, int, bson.ObjectId)):
+        return False, _identity
+
+    if issubclass(annotation, Enum):
+        return False, _get_enum_converter(annotation)
+
+    if issubclass(annotation, BaseModel):
+        return False, _get_model_converter(annotation)
+
+    raise TrustedConstructorError(f"Unsupported type {annotation}")
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def _to_float(value: Any) -> Any:
+    # BSON keeps whole numbers written as int, pydantic returns them as float
+    if type(value) is int:
+        return float(value)
+    return value
+
+
+def _to_date(value: Any) -> Any:
+    if isinstance(value, datetime):
+        # same precision as the Date validator
+        return Date(
+            value.year,
+            value.month,
+            value.day,
+            value.hour,
+            value.minute,
+            value.second,
+        )
+    if isinstance(value, str):
+        return Date(value)
+    raise TrustedConstructorError(f"Invalid date {value!r}")
+
+
+def _get_enum_converter(enum_class: Type[Enum]) -> Converter:
+    def convert(value: Any) -> Any:
+        if isinstance(value, enum_class):
+            return value
+        return enum_class(value)
+
+    return convert
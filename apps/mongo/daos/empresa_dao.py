@@ -2,4 +2,6 @@ from apps.mongo.core.base_mongo_dao import BaseMongoDAO
 from apps.mongo.models.empresa import Empresa
 
 
-class EmpresaDAO(BaseMongoDAO[Empresa]): ...
+class EmpresaDAO(BaseMongoDAO[Empresa]):
+    # the cached reads of a company are invalidated only by writes to it
+    cache_scope = "id"
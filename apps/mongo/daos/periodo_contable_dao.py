@@ -1,5 +1,67 @@
+from typing import Any, Optional
+
+from pydantic import BaseModel
+from pymongo import ASCENDING
+
 from apps.mongo.core.base_mongo_dao import BaseMongoDAO
-from apps.mongo.models.periodo_contable import PeriodoContable
+from apps.mongo.core.conditional_write import ConditionalWriteResult
+from apps.mongo.core.projection import Projection
+from apps.mongo.models.periodo_contable import (
+    PeriodoContable,
+    get_razones_financieras_projection,
+)
+from apps.tools.objectid import ObjectId
+
+_ID_PROJECTION = Projection(PeriodoContable, include={"id"})
+
+
+class PeriodoContableDAO(BaseMongoDAO[PeriodoContable]):
+    # periodos are only written through this DAO (validated on insert/update),
+    # re-validating the nested statements on every read is wasted work
+    trusted_reads = True
+    # a write to a periodo only invalidates the cached reads of its company
+    cache_scope = "id_empresa"
+
+    async def set_estado_financiero(
+        self,
+        item_id: ObjectId,
+        field_name: str,
+        value: Optional[BaseModel],
+        *,
+        exists: bool,
+    ) -> ConditionalWriteResult[PeriodoContable]:
+        """set `balance_general` or `estado_resultado` of a periodo in one round trip
+
+        The write is only applied if the statement currently exists
+        (`exists=True`, to update or delete it) or not (`exists=False`, to
+        create it), otherwise the result is `precondition_failed`. Only the
+        id of the periodo is returned.
+        """
+        condition = {field_name: {"$ne": None}} if exists else {field_name: None}
+
+        return await self.update_fields_if(
+            item_id,
+            {field_name: value},
+            condition=condition,
+            projection=_ID_PROJECTION,
+        )
 
+    async def get_razones_financieras(self, **filters: Any) -> list[dict[str, Any]]:
+        """compute `PeriodoContable.get_razones_financieras` inside Mongo
 
-class PeriodoContableDAO(BaseMongoDAO[PeriodoContable]): ...
+        Only the ratios are returned, the financial statements are not read:
+        `[{"_id": ..., "id_empresa": ..., "anio": 2024, "razones": {"liquidez": {...}, ...}}]`
+        sorted by `id_empresa` and `anio`.
+        """
+        pipeline: list[dict[str, Any]] = [
+            {"$match": filters},
+            {"$sort": {"id_empresa": ASCENDING, "anio": ASCENDING}},
+            {
+                "$project": {
+                    "id_empresa": 1,
+                    "anio": 1,
+                    "razones": get_razones_financieras_projection(),
+                }
+            },
+        ]
+        return await self.aggregate(pipeline)
@@ -5,6 +5,7 @@ from typing import Annotated
 from pydantic import Field
 
 from apps.mongo.core.base_mongo_model import BaseMongoModel, mongo_model
+from apps.mongo.core.mongo_index import MongoIndex
 
 
 class StatusCompany(Enum):
@@ -12,7 +13,7 @@ class StatusCompany(Enum):
     INACTIVO = "Inactivo"
 
 
-@mongo_model(collection_name="empresa", schema_version=1)
+@mongo_model(collection_name="empresa", schema_version=1, indexes=[MongoIndex("rfc")])
 class Empresa(BaseMongoModel):
     nombre: str
     rfc: str
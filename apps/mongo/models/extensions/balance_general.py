@@ -1,5 +1,40 @@
 from pydantic import BaseModel
 
+from apps.mongo.core.ratio_expression import RatioExpression, field, safe_div
+
+# Razones de Liquidez
+RAZON_CORRIENTE = safe_div(
+    field("total_activo_circulante"), field("total_pasivo_circulante")
+)
+PRUEBA_ACIDA = safe_div(
+    field("total_activo_circulante") - field("inventarios"),
+    field("total_pasivo_circulante"),
+)
+CAPITAL_NETO_TRABAJO = field("total_activo_circulante") - field(
+    "total_pasivo_circulante"
+)
+
+# Razones de Endeudamiento
+ENDEUDAMIENTO_TOTAL = safe_div(field("total_pasivo"), field("total_activo")) * 100
+ENDEUDAMIENTO_PATRIMONIAL = (
+    safe_div(field("total_pasivo"), field("capital_social_y_utilidades_retenidas"))
+    * 100
+)
+APALANCAMIENTO_FINANCIERO = safe_div(
+    field("total_activo"), field("capital_social_y_utilidades_retenidas")
+)
+
+RAZONES_LIQUIDEZ: dict[str, RatioExpression] = {
+    "razon_corriente": RAZON_CORRIENTE,
+    "prueba_acida": PRUEBA_ACIDA,
+    "capital_neto_trabajo": CAPITAL_NETO_TRABAJO,
+}
+RAZONES_ENDEUDAMIENTO: dict[str, RatioExpression] = {
+    "endeudamiento_total": ENDEUDAMIENTO_TOTAL,
+    "endeudamiento_patrimonial": ENDEUDAMIENTO_PATRIMONIAL,
+    "apalancamiento_financiero": APALANCAMIENTO_FINANCIERO,
+}
+
 
 class BalanceGeneral(BaseModel):
     efectivo_equivalentes: float
@@ -27,41 +62,30 @@ class BalanceGeneral(BaseModel):
     @property
     def razon_corriente(self) -> float:
         """Razón Corriente = Activo Circulante / Pasivo Circulante"""
-        if self.total_pasivo_circulante == 0:
-            return 0.0
-        return self.total_activo_circulante / self.total_pasivo_circulante
+        return RAZON_CORRIENTE.evaluate(self)
 
     @property
     def prueba_acida(self) -> float:
         """Prueba Ácida = (Activo Circulante - Inventarios) / Pasivo Circulante"""
-        if self.total_pasivo_circulante == 0:
-            return 0.0
-        activos_liquidos = self.total_activo_circulante - self.inventarios
-        return activos_liquidos / self.total_pasivo_circulante
+        return PRUEBA_ACIDA.evaluate(self)
 
     @property
     def capital_neto_trabajo(self) -> float:
         """Capital Neto de Trabajo = Activo Circulante - Pasivo Circulante"""
-        return self.total_activo_circulante - self.total_pasivo_circulante
+        return CAPITAL_NETO_TRABAJO.evaluate(self)
 
     # Razones de Endeudamiento
     @property
     def endeudamiento_total(self) -> float:
         """Endeudamiento Total = (Total Pasivo / Total Activo) * 100"""
-        if self.total_activo == 0:
-            return 0.0
-        return (self.total_pasivo / self.total_activo) * 100
+        return ENDEUDAMIENTO_TOTAL.evaluate(self)
 
     @property
     def endeudamiento_patrimonial(self) -> float:
         """Endeudamiento Patrimonial = (Total Pasivo / Capital Contable) * 100"""
-        if self.capital_social_y_utilidades_retenidas == 0:
-            return 0.0
-        return (self.total_pasivo / self.capital_social_y_utilidades_retenidas) * 100
+        return ENDEUDAMIENTO_PATRIMONIAL.evaluate(self)
 
     @property
     def apalancamiento_financiero(self) -> float:
         """Apalancamiento Financiero = Total Activo / Capital Contable"""
-        if self.capital_social_y_utilidades_retenidas == 0:
-            return 0.0
-        return self.total_activo / self.capital_social_y_utilidades_retenidas
+        return APALANCAMIENTO_FINANCIERO.evaluate(self)
@@ -1,5 +1,18 @@
 from pydantic import BaseModel
 
+from apps.mongo.core.ratio_expression import RatioExpression, field, safe_div
+
+# Razones de Rentabilidad
+MARGEN_BRUTO = safe_div(field("utilidad_bruta"), field("ventas_netas")) * 100
+MARGEN_OPERATIVO = safe_div(field("utilidad_operativa"), field("ventas_netas")) * 100
+MARGEN_NETO = safe_div(field("utilidad_neta"), field("ventas_netas")) * 100
+
+RAZONES_RENTABILIDAD: dict[str, RatioExpression] = {
+    "margen_bruto": MARGEN_BRUTO,
+    "margen_operativo": MARGEN_OPERATIVO,
+    "margen_neto": MARGEN_NETO,
+}
+
 
 class EstadoResultados(BaseModel):
     ventas_netas: float
@@ -16,20 +29,14 @@ class EstadoResultados(BaseModel):
     @property
     def margen_bruto(self) -> float:
         """Margen Bruto = (Utilidad Bruta / Ventas Netas) * 100"""
-        if self.ventas_netas == 0:
-            return 0.0
-        return (self.utilidad_bruta / self.ventas_netas) * 100
+        return MARGEN_BRUTO.evaluate(self)
 
     @property
     def margen_operativo(self) -> float:
         """Margen Operativo = (Utilidad Operativa / Ventas Netas) * 100"""
-        if self.ventas_netas == 0:
-            return 0.0
-        return (self.utilidad_operativa / self.ventas_netas) * 100
+        return MARGEN_OPERATIVO.evaluate(self)
 
     @property
     def margen_neto(self) -> float:
         """Margen Neto = (Utilidad Neta / Ventas Netas) * 100"""
-        if self.ventas_netas == 0:
-            return 0.0
-        return (self.utilidad_neta / self.ventas_netas) * 100
+        return MARGEN_NETO.evaluate(self)
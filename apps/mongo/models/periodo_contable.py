@@ -1,9 +1,25 @@
 from typing import Optional
 
+from pymongo import ASCENDING
 
 from apps.mongo.core.base_mongo_model import BaseMongoModel, mongo_model
-from apps.mongo.models.extensions.balance_general import BalanceGeneral
-from apps.mongo.models.extensions.estado_resultados import EstadoResultados
+from apps.mongo.core.mongo_index import MongoIndex
+from apps.mongo.core.ratio_expression import (
+    RatioGroup,
+    expenses,
+    field,
+    requires,
+    safe_div,
+)
+from apps.mongo.models.extensions.balance_general import (
+    RAZONES_ENDEUDAMIENTO,
+    RAZONES_LIQUIDEZ,
+    BalanceGeneral,
+)
+from apps.mongo.models.extensions.estado_resultados import (
+    RAZONES_RENTABILIDAD,
+    EstadoResultados,
+)
 from apps.tools.date import Date
 from apps.tools.objectid import ObjectId
 
@@ -14,7 +30,132 @@ def parse_amount(amount_str) -> float:
     return float(amount_str.replace("$", "").replace(",", "").strip())
 
 
-@mongo_model(collection_name="periodo_contable", schema_version=1)
+# Razones de Actividad (requieren datos de ambos estados)
+ROTACION_INVENTARIOS = requires(
+    safe_div(
+        field("estado_resultado.costo_ventas"),
+        field("balance_general.inventarios"),
+    ),
+    "estado_resultado",
+    "balance_general",
+)
+DIAS_INVENTARIO = safe_div(365, ROTACION_INVENTARIOS)
+ROTACION_CUENTAS_COBRAR = requires(
+    safe_div(
+        field("estado_resultado.ventas_netas"),
+        field("balance_general.cuentas_por_cobrar"),
+    ),
+    "estado_resultado",
+    "balance_general",
+)
+PERIODO_PROMEDIO_COBRO = safe_div(365, ROTACION_CUENTAS_COBRAR)
+ROTACION_CUENTAS_PAGAR = requires(
+    safe_div(
+        field("estado_resultado.costo_ventas"),
+        field("balance_general.cuentas_por_pagar"),
+    ),
+    "estado_resultado",
+    "balance_general",
+)
+PERIODO_PROMEDIO_PAGO = safe_div(365, ROTACION_CUENTAS_PAGAR)
+CICLO_EFECTIVO = DIAS_INVENTARIO + PERIODO_PROMEDIO_COBRO - PERIODO_PROMEDIO_PAGO
+
+# Razón de Cobertura de Intereses
+# Asumiendo que resultado_financieros negativo son gastos financieros
+COBERTURA_INTERESES = requires(
+    safe_div(
+        field("estado_resultado.utilidad_operativa"),
+        expenses(field("estado_resultado.resultado_financieros")),
+        on_zero=float("inf"),  # Sin gastos financieros
+    ),
+    "estado_resultado",
+)
+
+# Razones de Rentabilidad Adicionales
+ROA = requires(
+    safe_div(
+        field("estado_resultado.utilidad_neta"),
+        field("balance_general.total_activo"),
+    )
+    * 100,
+    "estado_resultado",
+    "balance_general",
+)
+ROE = requires(
+    safe_div(
+        field("estado_resultado.utilidad_neta"),
+        field("balance_general.capital_social_y_utilidades_retenidas"),
+    )
+    * 100,
+    "estado_resultado",
+    "balance_general",
+)
+
+# Grupos de get_razones_financieras, en el mismo orden
+RAZONES_FINANCIERAS: list[RatioGroup] = [
+    RatioGroup(
+        "liquidez",
+        {
+            name: ratio.prefixed("balance_general")
+            for name, ratio in RAZONES_LIQUIDEZ.items()
+        },
+        requires=("balance_general",),
+    ),
+    RatioGroup(
+        "endeudamiento",
+        {
+            name: ratio.prefixed("balance_general")
+            for name, ratio in RAZONES_ENDEUDAMIENTO.items()
+        },
+        requires=("balance_general",),
+    ),
+    RatioGroup(
+        "rentabilidad",
+        {
+            name: ratio.prefixed("estado_resultado")
+            for name, ratio in RAZONES_RENTABILIDAD.items()
+        },
+        requires=("estado_resultado",),
+    ),
+    RatioGroup(
+        "actividad",
+        {
+            "rotacion_inventarios": ROTACION_INVENTARIOS,
+            "dias_inventario": DIAS_INVENTARIO,
+            "rotacion_cuentas_cobrar": ROTACION_CUENTAS_COBRAR,
+            "periodo_promedio_cobro": PERIODO_PROMEDIO_COBRO,
+            "rotacion_cuentas_pagar": ROTACION_CUENTAS_PAGAR,
+            "periodo_promedio_pago": PERIODO_PROMEDIO_PAGO,
+            "ciclo_efectivo": CICLO_EFECTIVO,
+        },
+        requires=("estado_resultado", "balance_general"),
+    ),
+    RatioGroup(
+        "rentabilidad_adicional",
+        {"roa": ROA, "roe": ROE},
+        requires=("estado_resultado", "balance_general"),
+    ),
+    RatioGroup(
+        "cobertura",
+        {"cobertura_intereses": COBERTURA_INTERESES},
+        requires=("estado_resultado", "balance_general"),
+    ),
+]
+
+
+def get_razones_financieras_projection() -> dict:
+    """`$project` expression with the same result as `PeriodoContable.get_razones_financieras`"""
+    return {group.name: group.to_mongo() for group in RAZONES_FINANCIERAS}
+
+
+@mongo_model(
+    collection_name="periodo_contable",
+    schema_version=1,
+    indexes=[
+        # get_reporte_final y la validación de duplicados en create_periodo_contable
+        MongoIndex([("id_empresa", ASCENDING), ("anio", ASCENDING)], unique=True),
+    ],
+)
 class PeriodoContable(BaseMongoModel):
     id_empresa: ObjectId
     anio: int
@@ -27,145 +168,62 @@ class PeriodoContable(BaseMongoModel):
     @property
     def rotacion_inventarios(self) -> float:
         """Rotación de Inventarios = Costo de Ventas / Inventario Promedio"""
-        if not self.estado_resultado or not self.balance_general:
-            return 0.0
-        if self.balance_general.inventarios == 0:
-            return 0.0
-        return self.estado_resultado.costo_ventas / self.balance_general.inventarios
+        return ROTACION_INVENTARIOS.evaluate(self)
 
     @property
     def dias_inventario(self) -> float:
         """Días de Inventario = 365 / Rotación de Inventarios"""
-        rotacion = self.rotacion_inventarios
-        if rotacion == 0:
-            return 0.0
-        return 365 / rotacion
+        return DIAS_INVENTARIO.evaluate(self)
 
     @property
     def rotacion_cuentas_cobrar(self) -> float:
         """Rotación de Cuentas por Cobrar = Ventas Netas / Cuentas por Cobrar"""
-        if not self.estado_resultado or not self.balance_general:
-            return 0.0
-        if self.balance_general.cuentas_por_cobrar == 0:
-            return 0.0
-        return (
-            self.estado_resultado.ventas_netas / self.balance_general.cuentas_por_cobrar
-        )
+        return ROTACION_CUENTAS_COBRAR.evaluate(self)
 
     @property
     def periodo_promedio_cobro(self) -> float:
         """Período Promedio de Cobro = 365 / Rotación de Cuentas por Cobrar"""
-        rotacion = self.rotacion_cuentas_cobrar
-        if rotacion == 0:
-            return 0.0
-        return 365 / rotacion
+        return PERIODO_PROMEDIO_COBRO.evaluate(self)
 
     @property
     def rotacion_cuentas_pagar(self) -> float:
         """Rotación de Cuentas por Pagar = Costo de Ventas / Cuentas por Pagar"""
-        if not self.estado_resultado or not self.balance_general:
-            return 0.0
-        if self.balance_general.cuentas_por_pagar == 0:
-            return 0.0
-        return (
-            self.estado_resultado.costo_ventas / self.balance_general.cuentas_por_pagar
-        )
+        return ROTACION_CUENTAS_PAGAR.evaluate(self)
 
     @property
     def periodo_promedio_pago(self) -> float:
         """Período Promedio de Pago = 365 / Rotación de Cuentas por Pagar"""
-        rotacion = self.rotacion_cuentas_pagar
-        if rotacion == 0:
-            return 0.0
-        return 365 / rotacion
+        return PERIODO_PROMEDIO_PAGO.evaluate(self)
 
     @property
     def ciclo_efectivo(self) -> float:
         """Ciclo de Efectivo = Días de Inventario + Período Promedio de Cobro - Período Promedio de Pago"""
-        return (
-            self.dias_inventario
-            + self.periodo_promedio_cobro
-            - self.periodo_promedio_pago
-        )
+        return CICLO_EFECTIVO.evaluate(self)
 
     # Razón de Cobertura de Intereses
     @property
     def cobertura_intereses(self) -> float:
         """Cobertura de Intereses = Utilidad Operativa / Gastos Financieros"""
-        if not self.estado_resultado:
-            return 0.0
-        # Asumiendo que resultado_financieros negativo son gastos financieros
-        gastos_financieros = abs(min(self.estado_resultado.resultado_financieros, 0))
-        if gastos_financieros == 0:
-            return float("inf")  # Sin gastos financieros
-        return self.estado_resultado.utilidad_operativa / gastos_financieros
+        return COBERTURA_INTERESES.evaluate(self)
 
     # Razones de Rentabilidad Adicionales
     @property
     def roa(self) -> float:
         """ROA = (Utilidad Neta / Total Activo) * 100"""
-        if not self.estado_resultado or not self.balance_general:
-            return 0.0
-        if self.balance_general.total_activo == 0:
-            return 0.0
-        return (
-            self.estado_resultado.utilidad_neta / self.balance_general.total_activo
-        ) * 100
+        return ROA.evaluate(self)
 
     @property
     def roe(self) -> float:
         """ROE = (Utilidad Neta / Capital Contable) * 100"""
-        if not self.estado_resultado or not self.balance_general:
-            return 0.0
-        if self.balance_general.capital_social_y_utilidades_retenidas == 0:
-            return 0.0
-        return (
-            self.estado_resultado.utilidad_neta
-            / self.balance_general.capital_social_y_utilidades_retenidas
-        ) * 100
+        return ROE.evaluate(self)
 
     # Método para obtener resumen de todas las razones
     def get_razones_financieras(self) -> dict:
         """Retorna un diccionario con todas las razones financieras calculadas"""
         razones = {}
 
-        # Razones de Liquidez
-        if self.balance_general:
-            razones["liquidez"] = {
-                "razon_corriente": self.balance_general.razon_corriente,
-                "prueba_acida": self.balance_general.prueba_acida,
-                "capital_neto_trabajo": self.balance_general.capital_neto_trabajo,
-            }
-
-            # Razones de Endeudamiento
-            razones["endeudamiento"] = {
-                "endeudamiento_total": self.balance_general.endeudamiento_total,
-                "endeudamiento_patrimonial": self.balance_general.endeudamiento_patrimonial,
-                "apalancamiento_financiero": self.balance_general.apalancamiento_financiero,
-            }
-
-        # Razones de Rentabilidad
-        if self.estado_resultado:
-            razones["rentabilidad"] = {
-                "margen_bruto": self.estado_resultado.margen_bruto,
-                "margen_operativo": self.estado_resultado.margen_operativo,
-                "margen_neto": self.estado_resultado.margen_neto,
-            }
-
-        # Razones combinadas
-        if self.estado_resultado and self.balance_general:
-            razones["actividad"] = {
-                "rotacion_inventarios": self.rotacion_inventarios,
-                "dias_inventario": self.dias_inventario,
-                "rotacion_cuentas_cobrar": self.rotacion_cuentas_cobrar,
-                "periodo_promedio_cobro": self.periodo_promedio_cobro,
-                "rotacion_cuentas_pagar": self.rotacion_cuentas_pagar,
-                "periodo_promedio_pago": self.periodo_promedio_pago,
-                "ciclo_efectivo": self.ciclo_efectivo,
-            }
-
-            razones["rentabilidad_adicional"] = {"roa": self.roa, "roe": self.roe}
-
-            razones["cobertura"] = {"cobertura_intereses": self.cobertura_intereses}
+        for group in RAZONES_FINANCIERAS:
+            if group.applies(self):
+                razones[group.name] = group.evaluate(self)
 
         return razones
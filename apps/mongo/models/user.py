@@ -2,9 +2,12 @@ from typing import Annotated
 
 from pydantic import Field
 from apps.mongo.core.base_mongo_model import BaseMongoModel, mongo_model
+from apps.mongo.core.mongo_index import MongoIndex
 
 
-@mongo_model(collection_name="usuario", schema_version=1)
+@mongo_model(
+    collection_name="usuario", schema_version=1, indexes=[MongoIndex("nom_usuario")]
+)
 class Usuario(BaseMongoModel):
     nom_usuario: str
     contrasenia: str
@@ -1,54 +1,467 @@
+import heapq
+import itertools
+import sys
 import time
-from threading import Thread
+import weakref
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from enum import Enum
+from threading import Condition, RLock, Thread
+from typing import Any, Hashable, Iterable, Optional
+
+from pydantic import BaseModel
+
+from apps.tools.env import env
+
+
+class EvictionPolicy(Enum):
+    LRU = "lru"
+    LFU = "lfu"
+
+
+class CacheStatistics(BaseModel):
+    """
+    Snapshot of the counters of a `CacheMap`.
+
+    Attributes:
+        entries (int): Items currently stored.
+        size_bytes (int): Approximate memory used by the stored values.
+        max_entries (int): Configured maximum of items.
+        max_bytes (int): Configured maximum of memory.
+        hits (int): Reads that found a live item.
+        misses (int): Reads that found nothing or an expired item.
+        evictions (int): Items removed to make room for new ones.
+        expirations (int): Items removed because their TTL passed.
+        invalidations (int): Items removed by `invalidate`, `invalidate_tags` or `clear`.
+    """
+
+    entries: int = 0
+    size_bytes: int = 0
+    max_entries: int
+    max_bytes: int
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+
+
+class CacheBackend(ABC):
+    """
+    Storage of the cached DAO reads.
+
+    `CacheMap` keeps the items in the memory of the process. `SQLiteCache`
+    (see `apps.tools.sqlite_cache`) keeps them in a file shared by every
+    worker of the host, so a hit or an invalidation in one worker is seen by
+    the others. `create_cache_backend` picks one from the environment.
+
+    Code running in the event loop uses the `*_async` methods, the in memory
+    backend answers them directly and `SQLiteCache` in a worker thread.
+
+    A read that may race with a write takes `get_generations` of its tags
+    before querying and passes it to `set`, the result is not stored when one
+    of the tags was invalidated in between, by this process or another one.
+    """
+
+    @abstractmethod
+    def get(self, key) -> Any:
+        """Retrieve an item, None when it is missing or expired."""
+
+    @abstractmethod
+    def set(
+        self,
+        key,
+        value,
+        ttl=None,
+        tags: Iterable[Hashable] = (),
+        generations: Optional[dict] = None,
+    ):
+        """Add an item with an optional TTL and invalidation tags.
+
+        With `generations` (from `get_generations`) the item is not stored
+        when any of those tags was invalidated since.
+        """
+
+    @abstractmethod
+    def get_generations(self, *tags: Hashable) -> dict:
+        """Snapshot of the invalidations of the tags, see `set`."""
+
+    @abstractmethod
+    def invalidate(self, key):
+        """Remove an item."""
+
+    @abstractmethod
+    def invalidate_tags(self, *tags: Hashable):
+        """Remove the items with any of the tags."""
+
+    @abstractmethod
+    def clear(self):
+        """Remove every item."""
+
+    @abstractmethod
+    def statistics(self) -> CacheStatistics: ...
+
+    async def get_async(self, key) -> Any:
+        """`get` from the event loop, backends that block on I/O run it in a thread."""
+        return self.get(key)
+
+    async def set_async(
+        self,
+        key,
+        value,
+        ttl=None,
+        tags: Iterable[Hashable] = (),
+        generations: Optional[dict] = None,
+    ):
+        """`set` from the event loop, backends that block on I/O run it in a thread."""
+        self.set(key, value, ttl, tags, generations)
+
+    async def get_generations_async(self, *tags: Hashable) -> dict:
+        """`get_generations` from the event loop, backends that block on I/O run it in a thread."""
+        return self.get_generations(*tags)
+
+    async def invalidate_async(self, key):
+        """`invalidate` from the event loop, backends that block on I/O run it in a thread."""
+        self.invalidate(key)
+
+    async def invalidate_tags_async(self, *tags: Hashable):
+        """`invalidate_tags` from the event loop, backends that block on I/O run it in a thread."""
+        self.invalidate_tags(*tags)
+
+
+def create_cache_backend() -> CacheBackend:
+    """
+    Build the cache of a DAO from the environment.
+
+    - CACHE_BACKEND: `local` (default) keeps a `CacheMap` per DAO in the
+      memory of the process, `sqlite` shares the file CACHE_SQLITE_PATH
+      (default `finance_api_cache.sqlite` in the temporary directory) between
+      every DAO and every worker of the host.
+
+    The limits come from `get_cache_options`.
+    """
+    backend = (env.get("CACHE_BACKEND") or "local").lower()
+
+    if backend == "sqlite":
+        from apps.tools.sqlite_cache import get_sqlite_cache
+
+        return get_sqlite_cache(env.get("CACHE_SQLITE_PATH") or None)
+    if backend == "local":
+        return CacheMap(**get_cache_options())
+
+    raise ValueError(f"Unknown CACHE_BACKEND: {backend}")
+
+
+def get_cache_options() -> dict[str, Any]:
+    """
+    Build the limits of the DAO caches from the environment.
+
+    - CACHE_MAX_ENTRIES: maximum items per cache (default 1024).
+    - CACHE_MAX_BYTES: approximate maximum memory per cache (default 32 MiB).
+    - CACHE_EVICTION_POLICY: `lru` (default) or `lfu`.
+    """
+    return {
+        "max_entries": int(env.get("CACHE_MAX_ENTRIES") or 1024),
+        "max_bytes": int(env.get("CACHE_MAX_BYTES") or 32 * 1024 * 1024),
+        "eviction_policy": EvictionPolicy(
+            (env.get("CACHE_EVICTION_POLICY") or EvictionPolicy.LRU.value).lower()
+        ),
+    }
+
+
+class ExpirySweeper:
+    """
+    Process wide scheduler that removes the expired items of every `CacheMap`.
+
+    The expiry times are kept in a heap and a single daemon thread sleeps
+    until the next one, so the number of threads does not depend on the
+    number of caches. The caches are referenced weakly and the items are
+    also expired lazily when they are read, the sweeper only frees the
+    memory of the items that are not read again.
+    """
+
+    def __init__(self) -> None:
+        self._condition = Condition()
+        self._heap: list[tuple[float, int, weakref.ref, Hashable]] = []
+        self._counter = itertools.count()
+        self._thread: Optional[Thread] = None
+
+    def schedule(self, cache: "CacheMap", key: Hashable, expiry_time: float) -> None:
+        with self._condition:
+            entry = (expiry_time, next(self._counter), weakref.ref(cache), key)
+            heapq.heappush(self._heap, entry)
+
+            if self._thread is None:
+                self._thread = Thread(
+                    target=self._run, name="cache-expiry-sweeper", daemon=True
+                )
+                self._thread.start()
+            elif self._heap[0] is entry:
+                # the new item expires before the one the thread waits for
+                self._condition.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._heap or self._heap[0][0] > time.time():
+                    timeout = self._heap[0][0] - time.time() if self._heap else None
+                    self._condition.wait(timeout)
+
+                expiry_time, _, cache_ref, key = heapq.heappop(self._heap)
+
+            cache = cache_ref()
+            if cache is not None:
+                cache._expire(key, expiry_time)
+
+
+_sweeper = ExpirySweeper()
+
+
+class CachedValue:
+    """Value cached by a DAO with the time until it is fresh, see `CacheConfig.stale_ttl`"""
+
+    __slots__ = ("value", "fresh_until")
+
+    def __init__(self, value: Any, fresh_until: float) -> None:
+        self.value = value
+        self.fresh_until = fresh_until
+
+    def is_fresh(self) -> bool:
+        return time.time() < self.fresh_until
 
 
 class CacheItem:
-    def __init__(self, value, ttl):
+    def __init__(self, value, ttl, size=0, tags=()):
         self.value = value
         self.expiry_time = time.time() + ttl
+        self.size = size
+        self.tags = frozenset(tags)
+        self.hits = 0
+
 
+class CacheMap(CacheBackend):
+    """
+    Bounded in memory cache with per item TTL and tag invalidation.
 
-class CacheMap:
-    def __init__(self, default_ttl=60):
-        self.cache = {}
+    Safe to use from the event loop and from worker threads, every operation
+    holds the lock of the cache. Expired items are removed when they are read
+    and by the shared `ExpirySweeper`.
+
+    When `max_entries` or `max_bytes` (an approximation of the memory used by
+    the values) is exceeded the least recently used item (`LRU`) or the least
+    used item (`LFU`) is evicted. Items can carry tags, e.g. the collection
+    and the company they were read from, to invalidate only them. Each tag
+    keeps a count of its invalidations for `get_generations`:
+
+    ```python
+    cache.set("empresa.get_by_id.1", empresa, tags={"empresa:1"})
+    cache.invalidate_tags("empresa:1")
+    ```
+    """
+
+    def __init__(
+        self,
+        default_ttl=60,
+        max_entries: int = 1024,
+        max_bytes: int = 32 * 1024 * 1024,
+        eviction_policy: EvictionPolicy = EvictionPolicy.LRU,
+    ):
+        # the item being added is never evicted, a cache must hold at least one
+        if max_entries < 1 or max_bytes < 1:
+            raise ValueError(
+                "A CacheMap needs max_entries and max_bytes of at least 1, "
+                f"got {max_entries} and {max_bytes}"
+            )
+
+        self.cache: OrderedDict[Hashable, CacheItem] = OrderedDict()
         self.default_ttl = default_ttl
-        self.cleanup_interval = 30  # seconds
-        self._start_cleanup_task()
-
-    def _cleanup(self):
-        """Remove expired items from the cache."""
-        current_time = time.time()
-        keys_to_delete = [
-            key for key, item in self.cache.items() if item.expiry_time <= current_time
-        ]
-        for key in keys_to_delete:
-            del self.cache[key]
-
-    def _start_cleanup_task(self):
-        """Start a background thread that cleans up expired items at regular intervals."""
-
-        def cleanup_task():
-            while True:
-                self._cleanup()
-                time.sleep(self.cleanup_interval)
-
-        Thread(target=cleanup_task, daemon=True).start()
-
-    def set(self, key, value, ttl=None):
-        """Add an item to the cache with an optional TTL."""
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.eviction_policy = eviction_policy
+
+        self._lock = RLock()
+        self._tags: dict[Hashable, set[Hashable]] = {}
+        self._generations: dict[Hashable, int] = {}
+        self._size_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+
+    def _expire(self, key, expiry_time: float):
+        """Remove an item whose TTL passed, called by the `ExpirySweeper`."""
+        with self._lock:
+            item = self.cache.get(key)
+            # the item may have been replaced with a new TTL since it was scheduled
+            if item is not None and item.expiry_time == expiry_time:
+                self._remove(key)
+                self._expirations += 1
+
+    def set(
+        self,
+        key,
+        value,
+        ttl=None,
+        tags: Iterable[Hashable] = (),
+        generations: Optional[dict] = None,
+    ):
+        """Add an item to the cache with an optional TTL and invalidation tags."""
         if ttl is None:
             ttl = self.default_ttl
-        self.cache[key] = CacheItem(value, ttl)
+
+        item = CacheItem(value, ttl, get_approximate_size(value), tags)
+        if item.size > self.max_bytes:
+            # it would evict everything else and still not fit
+            self.invalidate(key)
+            return
+
+        with self._lock:
+            if generations is not None and generations != self.get_generations(
+                *generations
+            ):
+                # invalidated while the value was read, it may be stale
+                return
+
+            self._remove(key)
+            self.cache[key] = item
+            self._size_bytes += item.size
+            for tag in item.tags:
+                self._tags.setdefault(tag, set()).add(key)
+
+            _sweeper.schedule(self, key, item.expiry_time)
+
+            while (
+                len(self.cache) > self.max_entries or self._size_bytes > self.max_bytes
+            ):
+                self._remove(self._get_eviction_key(exclude=key))
+                self._evictions += 1
 
     def get(self, key):
         """Retrieve an item from the cache."""
-        item = self.cache.get(key)
-        if item and item.expiry_time > time.time():
-            return item.value
+        with self._lock:
+            item = self.cache.get(key)
+
+            if item is None:
+                self._misses += 1
+                return None
 
-        self.cache.pop(key, None)
-        return None
+            if item.expiry_time <= time.time():
+                self._remove(key)
+                self._expirations += 1
+                self._misses += 1
+                return None
+
+            self.cache.move_to_end(key)
+            item.hits += 1
+            self._hits += 1
+            return item.value
 
     def invalidate(self, key):
         """Remove an item from the cache."""
-        self.cache.pop(key, None)
+        with self._lock:
+            if self._remove(key):
+                self._invalidations += 1
+
+    def invalidate_tags(self, *tags: Hashable) -> int:
+        """Remove the items with any of the tags, returns how many were removed."""
+        with self._lock:
+            for tag in tags:
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+            keys = set().union(*(self._tags.get(tag, ()) for tag in tags))
+            for key in keys:
+                self._remove(key)
+            self._invalidations += len(keys)
+            return len(keys)
+
+    def get_generations(self, *tags: Hashable) -> dict[Hashable, int]:
+        """Snapshot of the invalidations of the tags, see `set`."""
+        with self._lock:
+            return {tag: self._generations.get(tag, 0) for tag in tags}
+
+    def clear(self):
+        """Remove every item from the cache."""
+        with self._lock:
+            self._invalidations += len(self.cache)
+            self.cache.clear()
+            self._tags.clear()
+            self._size_bytes = 0
+
+    def statistics(self) -> CacheStatistics:
+        with self._lock:
+            return CacheStatistics(
+                entries=len(self.cache),
+                size_bytes=self._size_bytes,
+                max_entries=self.max_entries,
+                max_bytes=self.max_bytes,
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                expirations=self._expirations,
+                invalidations=self._invalidations,
+            )
+
+    def _get_eviction_key(self, exclude: Hashable) -> Hashable:
+        """the item to evict, never `exclude` (the item being added)"""
+        if self.eviction_policy == EvictionPolicy.LFU:
+            # ties go to the least recently used
+            return min(
+                (key for key in self.cache if key != exclude),
+                key=lambda key: self.cache[key].hits,
+            )
+        return next(iter(self.cache))
+
+    def _remove(self, key) -> bool:
+        item = self.cache.pop(key, None)
+        if item is None:
+            return False
+
+        self._size_bytes -= item.size
+        for tag in item.tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+        return True
+
+
+# items of a list or tuple measured to estimate the size of the rest
+_SIZE_SAMPLE = 8
+
+
+def get_approximate_size(value: Any, _seen: Optional[set[int]] = None) -> int:
+    """
+    Approximate memory of a value and everything it references (models, lists, dicts).
+
+    Long lists are estimated from a sample of `_SIZE_SAMPLE` evenly spaced
+    items times their length, the documents of a page have a similar shape
+    and walking all of them on every `set` costs more than the read saved.
+    """
+    if _seen is None:
+        _seen = set()
+
+    if id(value) in _seen:
+        return 0
+    _seen.add(id(value))
+
+    size = sys.getsizeof(value)
+
+    if isinstance(value, dict):
+        size += sum(
+            get_approximate_size(key, _seen) + get_approximate_size(item, _seen)
+            for key, item in value.items()
+        )
+    elif isinstance(value, (list, tuple)) and len(value) > _SIZE_SAMPLE:
+        step = len(value) / _SIZE_SAMPLE
+        sample = [value[int(i * step)] for i in range(_SIZE_SAMPLE)]
+        sample_size = sum(get_approximate_size(item, _seen) for item in sample)
+        size += sample_size * len(value) // _SIZE_SAMPLE
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(get_approximate_size(item, _seen) for item in value)
+    elif isinstance(value, BaseModel):
+        size += get_approximate_size(value.__dict__, _seen)
+    elif isinstance(value, CachedValue):
+        size += get_approximate_size(value.value, _seen)
+
+    return size
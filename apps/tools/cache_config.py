@@ -2,21 +2,53 @@ from typing import Optional
 
 
 class CacheConfig:
+    """
+    How a read is cached.
+
+    Attributes:
+        key (Optional[str]): Name of the cached value.
+        use_cache (bool): Read from the cache before going to the database.
+        ttl (int): Seconds the value is fresh.
+        stale_ttl (int): Grace seconds after `ttl` where the stale value is
+            still returned while a single background task refreshes it
+            (stale-while-revalidate). 0 disables it.
+        single_flight (bool): Concurrent misses of the same key wait for one
+            fetch instead of each querying the database.
+        invalidates (list[str]): Keys invalidated by a write.
+
+    ```python
+    await empresa_dao.get_by_id(
+        id_empresa, cache_config=CacheConfig(use_cache=True, ttl=30, stale_ttl=60)
+    )
+    ```
+
+    Attached to an endpoint with `cache_response` it caches the HTTP response
+    instead: `key` groups the cached responses and `invalidates` names the
+    groups evicted by a write endpoint.
+    """
+
+    key: Optional[str]
     use_cache: bool
     ttl: int
+    stale_ttl: int
+    single_flight: bool
     invalidates: list[str]
 
     def __init__(
         self,
-        key: str,
+        key: Optional[str] = None,
         use_cache: bool = False,
         ttl: int = 60,
         invalidates: Optional[list[str]] = None,
+        stale_ttl: int = 0,
+        single_flight: bool = True,
     ):
         if invalidates is None:
             invalidates = []
 
         self.use_cache = use_cache
         self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.single_flight = single_flight
         self.invalidates = invalidates
         self.key = key
@@ -198,6 +198,21 @@ class Date(datetime):
             datetime_obj.fold,
         )
 
+    def __reduce_ex__(self, protocol):
+        # pickle and copy through the components, __new__ does not accept the state of datetime
+        return (
+            self.__class__,
+            (
+                self.year,
+                self.month,
+                self.day,
+                self.hour,
+                self.minute,
+                self.second,
+                self.microsecond,
+            ),
+        )
+
     def __str__(self):
         return self.rfc3339_string
 
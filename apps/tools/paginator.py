@@ -1,6 +1,9 @@
+import base64
+import binascii
 from enum import Enum
-from typing import Any, Callable, Generic, Optional, TypeVar
+from typing import Any, Callable, Generic, Optional, Self, TypeVar
 
+from bson import json_util
 from pydantic import BaseModel
 
 
@@ -9,11 +12,94 @@ class OrderDirection(Enum):
     DESC = "desc"
 
 
+class CountMode(Enum):
+    """
+    How `total_items` is computed when paginating in the database.
+
+    - exact: `count_documents` with the filters of the query.
+    - estimated: collection metadata (`estimated_document_count`) when there are
+      no filters. With filters it counts only up to the end of the next page, so
+      `total_items` is a lower bound and `has_next` stays accurate.
+    """
+
+    EXACT = "exact"
+    ESTIMATED = "estimated"
+
+
+class PaginationCursor(BaseModel):
+    """
+    Position of the last item of a page, used for keyset pagination.
+
+    The token sent to clients is opaque: the cursor dumped with the extended
+    JSON of bson (keeps ObjectId and dates) and encoded in urlsafe base64.
+
+    Attributes:
+        order_by (str): Mongo field the listing is sorted by.
+        direction (int): 1 ascending, -1 descending.
+        value (Any): Value of `order_by` in the last item.
+        last_id (Any): `_id` of the last item, tie breaker for repeated values.
+    """
+
+    order_by: str
+    direction: int
+    value: Any = None
+    last_id: Any
+
+    def encode(self) -> str:
+        dump = json_util.dumps(
+            {"k": self.order_by, "d": self.direction, "v": self.value, "i": self.last_id}
+        )
+        return base64.urlsafe_b64encode(dump.encode("utf-8")).decode("ascii")
+
+    @classmethod
+    def decode(cls, token: str) -> Self:
+        try:
+            dump = base64.urlsafe_b64decode(token.encode("ascii")).decode("utf-8")
+            data = json_util.loads(dump)
+            return cls(
+                order_by=data["k"],
+                direction=data["d"],
+                value=data["v"],
+                last_id=data["i"],
+            )
+        except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError) as e:
+            raise InvalidCursorException(f"Cursor inválido: {token}") from e
+
+    def to_filter(self) -> dict[str, Any]:
+        """Mongo filter for the items after this cursor, sorted by `order_by` and `_id`"""
+        after = "$gt" if self.direction == 1 else "$lt"
+
+        if self.order_by == "_id":
+            return {"_id": {after: self.last_id}}
+
+        if self.value is None:
+            # null sorts before any other value in Mongo
+            same_value = {self.order_by: None, "_id": {after: self.last_id}}
+            if self.direction == 1:
+                return {"$or": [same_value, {self.order_by: {"$ne": None}}]}
+            return same_value
+
+        branches = [
+            {self.order_by: {after: self.value}},
+            {self.order_by: self.value, "_id": {after: self.last_id}},
+        ]
+        if self.direction == -1:
+            # null and missing sort last in descending order, `$lt` never matches them
+            branches.append({self.order_by: None})
+        return {"$or": branches}
+
+
+class InvalidCursorException(ValueError):
+    """Exception raised when a pagination cursor can not be decoded."""
+
+
 class PaginationFilters(BaseModel):
     skip: int
     limit: int
     order_by: Optional[str] = None
     order_direction: OrderDirection = OrderDirection.ASC
+    count_mode: CountMode = CountMode.EXACT
+    cursor: Optional[PaginationCursor] = None
 
 
 class PaginationMetadata(BaseModel):
@@ -24,6 +110,52 @@ class PaginationMetadata(BaseModel):
     current_page: int
     limit: int
     skip: int
+    total_is_estimate: bool = False
+    next_cursor: Optional[str] = None
+
+    @classmethod
+    def from_filters(
+        cls,
+        total_items: int,
+        pagination_filters: PaginationFilters,
+        total_is_estimate: bool = False,
+        next_cursor: Optional[str] = None,
+        has_next: Optional[bool] = None,
+    ) -> "PaginationMetadata":
+        """Build the metadata of a page from the total of items and the filters used to get it.
+
+        `total_pages`, `has_next`, `has_previous` and `current_page` are more accurate when `skip` is a multiple of `limit`.
+        `has_next` can be given when it is known from the query itself (e.g. keyset pagination).
+        """
+        total_pages = (
+            (total_items + pagination_filters.limit - 1) // pagination_filters.limit
+            if pagination_filters.limit
+            else 1
+        )
+        if has_next is None:
+            has_next = (
+                (pagination_filters.skip + pagination_filters.limit < total_items)
+                if pagination_filters.limit
+                else False
+            )
+        has_previous = pagination_filters.skip > 0 or pagination_filters.cursor is not None
+        current_page = (
+            pagination_filters.skip // pagination_filters.limit + 1
+            if pagination_filters.limit
+            else 1
+        )
+
+        return cls(
+            total_items=total_items,
+            total_pages=total_pages,
+            has_next=has_next,
+            has_previous=has_previous,
+            current_page=current_page,
+            limit=pagination_filters.limit,
+            skip=pagination_filters.skip,
+            total_is_estimate=total_is_estimate,
+            next_cursor=next_cursor,
+        )
 
 
 T = TypeVar("T")
@@ -67,32 +199,9 @@ class Paginator(Generic[T]):
 
         page_data = self._items[start:end]
 
-        total_items = len(self._items)
-        total_pages = (
-            (total_items + pagination_filters.limit - 1) // pagination_filters.limit
-            if pagination_filters.limit
-            else 1
-        )
-        has_next = (
-            (pagination_filters.skip + pagination_filters.limit < total_items)
-            if pagination_filters.limit
-            else False
-        )
-        has_previous = pagination_filters.skip > 0
-        current_page = (
-            pagination_filters.skip // pagination_filters.limit + 1
-            if pagination_filters.limit
-            else 1
-        )
-
-        return page_data, PaginationMetadata(
-            total_items=total_items,
-            total_pages=total_pages,
-            has_next=has_next,
-            has_previous=has_previous,
-            current_page=current_page,
-            limit=pagination_filters.limit,
-            skip=pagination_filters.skip,
+        return page_data, PaginationMetadata.from_filters(
+            total_items=len(self._items),
+            pagination_filters=pagination_filters,
         )
 
     def _sort_func(self, order_by: str) -> Callable[..., tuple[bool, Any]]:
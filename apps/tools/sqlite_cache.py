@@ -0,0 +1,375 @@
+import asyncio
+import json
+import os
+import pickle
+import sqlite3
+import tempfile
+import time
+from functools import cache
+from threading import Lock, local
+from typing import Hashable, Iterable, Optional
+
+from apps.tools.cache import (
+    CacheBackend,
+    CacheStatistics,
+    EvictionPolicy,
+    get_cache_options,
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    expiry_time REAL NOT NULL,
+    size INTEGER NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    access_time REAL NOT NULL,
+    generations TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_expiry_time ON entries (expiry_time);
+CREATE TABLE IF NOT EXISTS generations (
+    tag TEXT PRIMARY KEY,
+    generation INTEGER NOT NULL
+);
+"""
+
+# the access time of a hit is only written when it is older than this, most hits stay read only
+_ACCESS_TIME_RESOLUTION = 1.0  # seconds
+
+# writes of the process between two checks of `max_entries` and `max_bytes`
+_LIMITS_CHECK_INTERVAL = 32
+
+
+class SQLiteCache(CacheBackend):
+    """
+    Cache stored in a SQLite file, shared by every process of the host.
+
+    Each uvicorn worker opens the same file, an item cached by one worker is
+    a hit for the others. The values are pickled.
+
+    Tags are invalidated with a generation counter: an item stores the
+    generation of its tags when it is cached and is stale once any of them
+    is incremented, so `invalidate_tags` is one small write no matter how
+    many items have the tag, and it is visible to every worker as soon as
+    it commits. A read passes the generations it saw before querying to
+    `set`, so a result read before an invalidation of another worker is not
+    stored with the generations that follow it. Stale and expired items are
+    deleted when they are read or to make room for new ones. The limits are
+    checked every `_LIMITS_CHECK_INTERVAL` writes of the process, the file
+    can go over them by that many items in between.
+
+    Every call does blocking file I/O, from the event loop use the `*_async`
+    methods, they run it in a worker thread. Values that can not be pickled
+    (e.g. holding a lock or a socket) are not cached; projected models are
+    pickled with their projection, see `get_partial_model`.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        default_ttl=60,
+        max_entries: int = 1024,
+        max_bytes: int = 32 * 1024 * 1024,
+        eviction_policy: EvictionPolicy = EvictionPolicy.LRU,
+    ):
+        self.path = path
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.eviction_policy = eviction_policy
+
+        self._local = local()
+        self._writes = 0
+        # counters of this process, the entries and size are read from the file
+        self._counters_lock = Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+
+        with self._connection() as connection:
+            connection.executescript(_SCHEMA)
+
+    def get(self, key):
+        """Retrieve an item from the cache."""
+        connection = self._connection()
+        row = connection.execute(
+            "SELECT value, expiry_time, access_time, generations FROM entries WHERE key = ?",
+            (str(key),),
+        ).fetchone()
+
+        if row is None:
+            self._count(misses=1)
+            return None
+
+        value, expiry_time, access_time, generations = row
+        now = time.time()
+
+        if expiry_time <= now:
+            self._delete(connection, key)
+            self._count(misses=1, expirations=1)
+            return None
+
+        if self._is_stale(connection, json.loads(generations)):
+            self._delete(connection, key)
+            self._count(misses=1, invalidations=1)
+            return None
+
+        try:
+            result = pickle.loads(value)
+        except Exception:
+            # written by another version of the code
+            self._delete(connection, key)
+            self._count(misses=1)
+            return None
+
+        if self.eviction_policy == EvictionPolicy.LFU:
+            with connection:
+                connection.execute(
+                    "UPDATE entries SET hits = hits + 1, access_time = ? WHERE key = ?",
+                    (now, str(key)),
+                )
+        elif now - access_time > _ACCESS_TIME_RESOLUTION:
+            with connection:
+                connection.execute(
+                    "UPDATE entries SET access_time = ? WHERE key = ?",
+                    (now, str(key)),
+                )
+
+        self._count(hits=1)
+        return result
+
+    def set(
+        self,
+        key,
+        value,
+        ttl=None,
+        tags: Iterable[Hashable] = (),
+        generations: Optional[dict] = None,
+    ):
+        """Add an item to the cache with an optional TTL and invalidation tags.
+
+        With `generations` (from `get_generations`) the item is not stored
+        when any of those tags was invalidated since, by any process.
+        """
+        if ttl is None:
+            ttl = self.default_ttl
+
+        try:
+            data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            # not every value can be shared between processes
+            return
+
+        if len(data) > self.max_bytes:
+            self.invalidate(key)
+            return
+
+        now = time.time()
+        connection = self._connection()
+        with connection:
+            # the write lock is taken before the generations are compared, an
+            # invalidation of another process commits before or after the insert
+            connection.execute("BEGIN IMMEDIATE")
+            current_generations = self._get_generations(
+                connection, [str(tag) for tag in tags]
+            )
+            if generations is not None:
+                snapshot = {
+                    str(tag): generation for tag, generation in generations.items()
+                }
+                if snapshot != self._get_generations(connection, list(snapshot)):
+                    # invalidated while the value was read, it may be stale
+                    return
+                current_generations.update(snapshot)
+
+            connection.execute(
+                "INSERT OR REPLACE INTO entries"
+                " (key, value, expiry_time, size, hits, access_time, generations)"
+                " VALUES (?, ?, ?, ?, 0, ?, ?)",
+                (
+                    str(key),
+                    data,
+                    now + ttl,
+                    len(data),
+                    now,
+                    json.dumps(current_generations),
+                ),
+            )
+            if self._should_enforce_limits():
+                self._enforce_limits(connection, str(key), now)
+
+    def invalidate(self, key):
+        """Remove an item from the cache."""
+        connection = self._connection()
+        if self._delete(connection, key):
+            self._count(invalidations=1)
+
+    def invalidate_tags(self, *tags: Hashable):
+        """Make stale the items with any of the tags, in every process."""
+        connection = self._connection()
+        with connection:
+            connection.executemany(
+                "INSERT INTO generations (tag, generation) VALUES (?, 1)"
+                " ON CONFLICT (tag) DO UPDATE SET generation = generation + 1",
+                [(str(tag),) for tag in tags],
+            )
+
+    def get_generations(self, *tags: Hashable) -> dict[str, int]:
+        """Snapshot of the invalidations of the tags in every process, see `set`."""
+        return self._get_generations(self._connection(), [str(tag) for tag in tags])
+
+    def clear(self):
+        """Remove every item from the cache."""
+        connection = self._connection()
+        with connection:
+            deleted = connection.execute("DELETE FROM entries").rowcount
+        self._count(invalidations=deleted)
+
+    async def get_async(self, key):
+        return await asyncio.to_thread(self.get, key)
+
+    async def set_async(
+        self,
+        key,
+        value,
+        ttl=None,
+        tags: Iterable[Hashable] = (),
+        generations: Optional[dict] = None,
+    ):
+        await asyncio.to_thread(self.set, key, value, ttl, tuple(tags), generations)
+
+    async def get_generations_async(self, *tags: Hashable) -> dict[str, int]:
+        return await asyncio.to_thread(self.get_generations, *tags)
+
+    async def invalidate_async(self, key):
+        await asyncio.to_thread(self.invalidate, key)
+
+    async def invalidate_tags_async(self, *tags: Hashable):
+        await asyncio.to_thread(self.invalidate_tags, *tags)
+
+    def statistics(self) -> CacheStatistics:
+        entries, size_bytes = (
+            self._connection()
+            .execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries")
+            .fetchone()
+        )
+        with self._counters_lock:
+            return CacheStatistics(
+                entries=entries,
+                size_bytes=size_bytes,
+                max_entries=self.max_entries,
+                max_bytes=self.max_bytes,
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                expirations=self._expirations,
+                invalidations=self._invalidations,
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        """connection of the current thread, sqlite3 connections are not shared between threads"""
+        connection: Optional[sqlite3.Connection] = getattr(
+            self._local, "connection", None
+        )
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5.0)
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _get_generations(
+        self, connection: sqlite3.Connection, tags: list[str]
+    ) -> dict[str, int]:
+        generations = dict.fromkeys(tags, 0)
+        if tags:
+            placeholders = ", ".join("?" * len(tags))
+            generations.update(
+                connection.execute(
+                    f"SELECT tag, generation FROM generations WHERE tag IN ({placeholders})",
+                    tags,
+                ).fetchall()
+            )
+        return generations
+
+    def _is_stale(
+        self, connection: sqlite3.Connection, generations: dict[str, int]
+    ) -> bool:
+        current_generations = self._get_generations(connection, list(generations))
+        return current_generations != generations
+
+    def _should_enforce_limits(self) -> bool:
+        with self._counters_lock:
+            self._writes += 1
+            return self._writes % _LIMITS_CHECK_INTERVAL == 1
+
+    def _enforce_limits(
+        self, connection: sqlite3.Connection, new_key: str, now: float
+    ) -> None:
+        expired = connection.execute(
+            "DELETE FROM entries WHERE expiry_time <= ?", (now,)
+        ).rowcount
+
+        entries, size_bytes = connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()
+
+        evicted = 0
+        if entries > self.max_entries or size_bytes > self.max_bytes:
+            order = (
+                "hits, access_time"
+                if self.eviction_policy == EvictionPolicy.LFU
+                else "access_time"
+            )
+            # the item being added is never evicted
+            rows = connection.execute(
+                f"SELECT key, size FROM entries WHERE key != ? ORDER BY {order}",
+                (new_key,),
+            ).fetchall()
+
+            keys_to_delete = []
+            for key, size in rows:
+                if entries <= self.max_entries and size_bytes <= self.max_bytes:
+                    break
+                keys_to_delete.append((key,))
+                entries -= 1
+                size_bytes -= size
+
+            connection.executemany("DELETE FROM entries WHERE key = ?", keys_to_delete)
+            evicted = len(keys_to_delete)
+
+        self._count(expirations=expired, evictions=evicted)
+
+    def _delete(self, connection: sqlite3.Connection, key) -> bool:
+        with connection:
+            return (
+                connection.execute(
+                    "DELETE FROM entries WHERE key = ?", (str(key),)
+                ).rowcount
+                > 0
+            )
+
+    def _count(
+        self,
+        hits: int = 0,
+        misses: int = 0,
+        evictions: int = 0,
+        expirations: int = 0,
+        invalidations: int = 0,
+    ) -> None:
+        with self._counters_lock:
+            self._hits += hits
+            self._misses += misses
+            self._evictions += evictions
+            self._expirations += expirations
+            self._invalidations += invalidations
+
+
+@cache
+def get_sqlite_cache(path: Optional[str] = None) -> SQLiteCache:
+    """The `SQLiteCache` of a file, shared by every DAO of the process"""
+    if path is None:
+        path = os.path.join(tempfile.gettempdir(), "finance_api_cache.sqlite")
+    return SQLiteCache(path, **get_cache_options())